@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# benchmarks/api_stub.py
+# Record/replay stand-in for the API-Sports baseball API.
+#
+#   record      — recording proxy: forwards /games and /odds to the real API
+#                 (needs API_SPORTS_KEY) and appends every response to a fixture file
+#   synthesize  — builds a fixture file from committed daily CSVs, remapped to
+#                 yesterday/today, so benchmarks run without an API key
+#   serve       — replays a fixture file with injected latency and error rates
+#
+# Point the scripts at it with API_SPORTS_BASE_URL=http://127.0.0.1:<port>.
+# GET /__stats returns the request counters.
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import pandas as pd
+import pytz
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from http_cache import cache_key  # noqa: E402
+
+UPSTREAM_URL = "https://v1.baseball.api-sports.io"
+DEFAULT_FIXTURES = "benchmarks/fixtures/responses.jsonl"
+
+eastern = pytz.timezone("US/Eastern")
+utc = pytz.utc
+
+
+# === Fixture file: one {"key", "payload"} JSON object per line ===
+def load_fixtures(path):
+    fixtures = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                fixtures[entry["key"]] = entry["payload"]
+    return fixtures
+
+
+def append_fixture(path, key, payload, lock=threading.Lock()):
+    with lock, open(path, "a") as f:
+        f.write(json.dumps({"key": key, "payload": payload}, separators=(",", ":")) + "\n")
+
+
+def write_fixtures(path, fixtures):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        for key, payload in fixtures.items():
+            f.write(json.dumps({"key": key, "payload": payload}, separators=(",", ":")) + "\n")
+
+
+def empty_response(endpoint, params):
+    return {"get": endpoint, "parameters": params, "errors": [], "results": 0,
+            "paging": {"current": 1, "total": 1}, "response": []}
+
+
+class StubState:
+    def __init__(self, fixtures, latency_ms, jitter_ms, error_rate, fixtures_path, upstream):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.fixtures_path = fixtures_path
+        self.upstream = upstream
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors_injected = 0
+        self.misses = 0
+        self.remaining = 7500
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("x-ratelimit-requests-limit", "7500")
+            self.send_header("x-ratelimit-requests-remaining", str(state.remaining))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            endpoint = parsed.path.strip("/")
+            params = dict(parse_qsl(parsed.query))
+
+            if endpoint == "__stats":
+                with state.lock:
+                    self._send(200, {"requests": state.requests, "errors_injected": state.errors_injected,
+                                     "misses": state.misses})
+                return
+
+            with state.lock:
+                state.requests += 1
+                state.remaining -= 1
+                inject_error = random.random() < state.error_rate
+                if inject_error:
+                    state.errors_injected += 1
+
+            delay = state.latency_ms + random.uniform(-state.jitter_ms, state.jitter_ms)
+            if delay > 0:
+                time.sleep(delay / 1000)
+
+            if endpoint == "status":
+                self._send(200, {"response": {"requests": {"current": 7500 - state.remaining, "limit_day": 7500}}})
+                return
+            if inject_error:
+                self._send(random.choice([429, 500, 503]), {"errors": {"stub": "injected error"}})
+                return
+
+            key = cache_key(endpoint, params)
+            if state.upstream:
+                headers = {"x-apisports-key": os.environ.get("API_SPORTS_KEY", "")}
+                response = requests.get(f"{state.upstream}/{endpoint}", params=params, headers=headers, timeout=30)
+                payload = response.json()
+                if response.ok and not payload.get("errors"):
+                    append_fixture(state.fixtures_path, key, payload)
+                self._send(response.status_code, payload)
+                return
+
+            payload = state.fixtures.get(key)
+            if payload is None:
+                with state.lock:
+                    state.misses += 1
+                payload = empty_response(endpoint, params)
+            self._send(200, payload)
+
+    return Handler
+
+
+def start_server(fixtures, port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 fixtures_path=None, upstream=None):
+    """Start the stub on a background thread. Returns (server, base_url)."""
+    state = StubState(fixtures, latency_ms, jitter_ms, error_rate, fixtures_path, upstream)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# === Synthetic fixtures from committed daily CSVs ===
+def _to_float(value):
+    try:
+        return None if pd.isna(value) else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _odds_entry(game_id, date_iso, row, bookmaker_id):
+    ml_home, ml_away = _to_float(row["moneyline_home"]), _to_float(row["moneyline_away"])
+    total, over, under = _to_float(row["total_line"]), _to_float(row["over_odds"]), _to_float(row["under_odds"])
+    bets = []
+    if ml_home and ml_away:
+        bets.append({"id": 2, "name": "Home/Away", "values": [
+            {"value": "Home", "odd": f"{ml_home:.2f}"}, {"value": "Away", "odd": f"{ml_away:.2f}"}]})
+    if total and over and under:
+        values = []
+        # Alternate lines either side of the consensus, priced away from -110
+        for offset, skew in ((-1.0, 0.35), (-0.5, 0.17), (0.0, 0.0), (0.5, -0.17), (1.0, -0.35)):
+            values.append({"value": f"Over {total + offset}", "odd": f"{max(1.01, over - skew):.2f}"})
+            values.append({"value": f"Under {total + offset}", "odd": f"{max(1.01, under + skew):.2f}"})
+        bets.append({"id": 5, "name": "Over/Under", "values": values})
+    if not bets:
+        return None
+    return {"league": {"id": 1, "name": "MLB"}, "game": {"id": game_id, "date": date_iso},
+            "bookmakers": [{"id": bookmaker_id, "name": "Pinnacle" if bookmaker_id == 4 else "Marathon",
+                            "bets": bets}]}
+
+
+def _game_entry(game_id, date_iso, row, finished):
+    def innings(side):
+        return {str(i): (None if pd.isna(row[f"{side}_{i}"]) else int(row[f"{side}_{i}"])) for i in range(1, 10)}
+
+    scores = {"home": {"hits": None, "errors": None, "innings": {}, "total": None},
+              "away": {"hits": None, "errors": None, "innings": {}, "total": None}}
+    if finished and not pd.isna(row["home_score"]):
+        scores["home"].update(innings=innings("home"), total=int(row["home_score"]))
+        scores["away"].update(innings=innings("away"), total=int(row["away_score"]))
+    return {"id": game_id, "date": date_iso, "league": {"id": 1, "name": "MLB", "season": None},
+            "status": {"long": "Finished" if finished else "Not Started", "short": "FT" if finished else "NS"},
+            "teams": {"home": {"name": row["home_team"]}, "away": {"name": row["away_team"]}},
+            "scores": scores}
+
+
+def synthesize(daily_files, today=None, missing_pinnacle=0.2, missing_all=0.1, seed=7):
+    """
+    Map daily_files[0] onto yesterday and daily_files[1] onto today and build
+    every /games and /odds response the pipeline asks for on those dates.
+    A fraction of games get no Pinnacle odds (Marathon only) or no odds at all,
+    so the fallback and refresh paths are exercised too.
+    """
+    rng = random.Random(seed)
+    today = today or datetime.now(eastern).date()
+    season = datetime.now().year
+    fixtures = {}
+    by_api_date = {}
+    odds_by_api_date = {4: {}, 10: {}}
+
+    for offset, path in zip((-1, 0), daily_files):
+        target = today + timedelta(days=offset)
+        df = pd.read_csv(path)
+        for _, row in df.iterrows():
+            game_id = int(row["game_id"])
+            start = datetime.strptime(str(row["start_time_et"]), "%Y-%m-%d %H:%M:%S").time()
+            et_start = eastern.localize(datetime.combine(target, start))
+            utc_start = et_start.astimezone(utc)
+            date_iso = utc_start.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+            api_date = utc_start.strftime("%Y-%m-%d")
+
+            game = _game_entry(game_id, date_iso, row, finished=offset < 0)
+            game["league"]["season"] = season
+            by_api_date.setdefault(api_date, []).append(game)
+            fixtures[cache_key("games", {"id": game_id})] = {"errors": [], "results": 1, "response": [game]}
+
+            roll = rng.random()
+            for bk_id in (4, 10):
+                has_odds = roll >= missing_all and (bk_id == 10 or roll >= missing_all + missing_pinnacle)
+                entry = _odds_entry(game_id, date_iso, row, bk_id) if has_odds else None
+                key = cache_key("odds", {"game": game_id, "bookmaker": bk_id})
+                fixtures[key] = {"errors": [], "results": int(entry is not None),
+                                 "response": [entry] if entry else []}
+                if entry:
+                    odds_by_api_date[bk_id].setdefault(api_date, []).append(entry)
+
+    for api_date, games in by_api_date.items():
+        fixtures[cache_key("games", {"league": 1, "season": season, "date": api_date})] = {
+            "errors": [], "results": len(games), "response": games}
+    for bk_id, dates in odds_by_api_date.items():
+        for api_date, entries in dates.items():
+            fixtures[cache_key("odds", {"league": 1, "season": season, "date": api_date,
+                                        "bookmaker": bk_id, "page": 1})] = {
+                "errors": [], "results": len(entries), "paging": {"current": 1, "total": 1},
+                "response": entries}
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API-Sports record/replay stub")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Recording proxy in front of the real API")
+    rec.add_argument("--port", type=int, default=8765)
+    rec.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    rec.add_argument("--upstream", default=UPSTREAM_URL)
+
+    syn = sub.add_parser("synthesize", help="Build fixtures from committed daily CSVs")
+    syn.add_argument("yesterday_csv")
+    syn.add_argument("today_csv")
+    syn.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+
+    srv = sub.add_parser("serve", help="Replay a fixture file")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    srv.add_argument("--latency-ms", type=float, default=150.0)
+    srv.add_argument("--jitter-ms", type=float, default=50.0)
+    srv.add_argument("--error-rate", type=float, default=0.0)
+
+    args = parser.parse_args()
+
+    if args.command == "synthesize":
+        fixtures = synthesize([args.yesterday_csv, args.today_csv])
+        write_fixtures(args.fixtures, fixtures)
+        print(f"✅ Wrote {len(fixtures)} synthetic responses to {args.fixtures}")
+        return
+
+    if args.command == "record":
+        if not os.environ.get("API_SPORTS_KEY"):
+            raise ValueError("API_SPORTS_KEY environment variable not set.")
+        os.makedirs(os.path.dirname(args.fixtures) or ".", exist_ok=True)
+        server, base_url = start_server({}, port=args.port, fixtures_path=args.fixtures,
+                                        upstream=args.upstream.rstrip("/"))
+        print(f"🎙️  Recording {args.upstream} → {args.fixtures} at {base_url}")
+    else:
+        fixtures = load_fixtures(args.fixtures)
+        server, base_url = start_server(fixtures, port=args.port, latency_ms=args.latency_ms,
+                                        jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+        print(f"▶️  Replaying {len(fixtures)} responses at {base_url} "
+              f"(latency {args.latency_ms}±{args.jitter_ms} ms, error rate {args.error_rate:.0%})")
+
+    print(f"   export API_SPORTS_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# benchmarks/bench_feature_engineering.py
+# Micro-benchmark: feature_engineering.py section 3 (cumulative season records
+# and streaks) — the old iterrows + groupby.apply version vs
+# calculate_team_records — on a synthetic multi-season wide master. Checks
+# the merged output columns are identical.
+#
+#   python benchmarks/bench_feature_engineering.py [--seasons 10]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+from feature_engineering import calculate_team_records  # noqa: E402
+
+TEAMS = ["ARI", "ATL", "BAL", "BOS", "CHC", "CWS", "CIN", "CLE", "COL", "DET",
+         "HOU", "KCR", "LAA", "LAD", "MIA", "MIL", "MIN", "NYM", "NYY", "ATH",
+         "PHI", "PIT", "SDP", "SFG", "SEA", "STL", "TBR", "TEX", "TOR", "WSH"]
+
+
+def synthetic_master(seasons, games_per_day=15, days=162, seed=0):
+    """Wide master (one row per game): full slates every day, some doubleheaders and postponements."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    game_id = 100000
+    for season in range(2017, 2017 + seasons):
+        opening = pd.Timestamp(f"{season}-03-28")
+        for day in range(days):
+            date = opening + pd.Timedelta(days=day)
+            order = rng.permutation(len(TEAMS))
+            n = games_per_day + (1 if rng.random() < 0.05 else 0)  # occasional doubleheader
+            home = [TEAMS[order[(2 * i) % 30]] for i in range(n)]
+            away = [TEAMS[order[(2 * i + 1) % 30]] for i in range(n)]
+            home_score = rng.integers(0, 12, n).astype(float)
+            away_score = home_score + rng.choice([-3, -2, -1, 1, 2, 3], n)
+            away_score = np.clip(away_score, 0, None)
+            away_score[away_score == home_score] += 1
+            status = np.where(rng.random(n) < 0.02, "Postponed", "Finished")
+            frames.append(pd.DataFrame({
+                "game_id": np.arange(game_id, game_id + n),
+                "game_date": date,
+                "start_time_et": [date + pd.Timedelta(hours=13 + (i % 9)) for i in range(n)],
+                "season": season,
+                "home_team": home,
+                "away_team": away,
+                "home_score": np.where(status == "Finished", home_score, np.nan),
+                "away_score": np.where(status == "Finished", away_score, np.nan),
+                "status": status,
+            }))
+            game_id += n
+    df = pd.concat(frames, ignore_index=True)
+    df["winner"] = np.where(df["home_score"] > df["away_score"], df["home_team"],
+                            np.where(df["away_score"] > df["home_score"], df["away_team"], None))
+    df.loc[df["status"] != "Finished", "winner"] = None
+    df["game_id"] = df["game_id"].astype("Int64")
+    return df
+
+
+def legacy_calculate_team_records(df):
+    """Section 3 as previously written (column selection so groupby.apply still sees 'team' on pandas 3)."""
+    team_games = []
+    for _, row in df.iterrows():
+        team_games.append({
+            'game_id': row['game_id'], 'game_date': row['game_date'], 'season': row['season'],
+            'team': row['home_team'], 'opponent': row['away_team'],
+            'team_score': row['home_score'], 'opponent_score': row['away_score'],
+            'is_winner': (row['winner'] == row['home_team']) if pd.notna(row['winner']) else None,
+            'is_home': True, 'status': row['status']
+        })
+        team_games.append({
+            'game_id': row['game_id'], 'game_date': row['game_date'], 'season': row['season'],
+            'team': row['away_team'], 'opponent': row['home_team'],
+            'team_score': row['away_score'], 'opponent_score': row['home_score'],
+            'is_winner': (row['winner'] == row['away_team']) if pd.notna(row['winner']) else None,
+            'is_home': False, 'status': row['status']
+        })
+    df_team_games = pd.DataFrame(team_games)
+    finished = df_team_games[(df_team_games['status'] == 'Finished') & df_team_games['is_winner'].notna()].copy()
+    finished = finished.sort_values(by=['season', 'team', 'game_date', 'game_id']).reset_index(drop=True)
+
+    def calculate_records_and_streaks(group):
+        wins_count = 0
+        losses_count = 0
+        current_streak = 0
+        results = []
+        for _, row in group.iterrows():
+            if row['is_winner']:
+                wins_count += 1
+                current_streak = current_streak + 1 if current_streak >= 0 else 1
+            else:
+                losses_count += 1
+                current_streak = current_streak - 1 if current_streak <= 0 else -1
+            results.append({
+                'game_id': row['game_id'], 'team': row['team'],
+                'wins_season_cumulative': wins_count,
+                'losses_season_cumulative': losses_count,
+                'win_streak_team_cumulative': current_streak
+            })
+        return pd.DataFrame(results)
+
+    return finished.groupby(['season', 'team'], group_keys=False)[['game_id', 'team', 'is_winner']].apply(
+        calculate_records_and_streaks)
+
+
+def merge_records(df, calculated_records):
+    """The two merges that follow section 3 in engineer_features."""
+    for side in ("home", "away"):
+        df = df.merge(
+            calculated_records.rename(columns={
+                'wins_season_cumulative': f'{side}_wins_season',
+                'losses_season_cumulative': f'{side}_losses_season',
+                'win_streak_team_cumulative': f'{side}_win_streak'
+            }),
+            left_on=['game_id', f'{side}_team'], right_on=['game_id', 'team'], how='left'
+        ).drop(columns=['team'], errors='ignore')
+    return df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="feature_engineering section 3 micro-benchmark")
+    parser.add_argument("--seasons", type=int, default=10)
+    args = parser.parse_args()
+
+    df = synthetic_master(args.seasons)
+    print(f"Synthetic master: {args.seasons} seasons, {len(df):,} games")
+
+    legacy_records, legacy_s = timed(legacy_calculate_team_records, df)
+    records, columnar_s = timed(calculate_team_records, df)
+    legacy_out, legacy_merge_s = timed(merge_records, df, legacy_records)
+    out, merge_s = timed(merge_records, df, records)
+    try:
+        pd.testing.assert_frame_equal(legacy_out, out)
+        match = True
+    except AssertionError as e:
+        print(e)
+        match = False
+    print(f"Merged output identical: {match}")
+
+    print(f"\n{'step':<26} {'legacy (s)':>11} {'columnar (s)':>13} {'speedup':>8}")
+    print(f"{'records + streaks':<26} {legacy_s:>11.2f} {columnar_s:>13.3f} {legacy_s / columnar_s:>7.0f}x")
+    total_legacy, total = legacy_s + legacy_merge_s, columnar_s + merge_s
+    print(f"{'section 3 incl. merges':<26} {total_legacy:>11.2f} {total:>13.3f} {total_legacy / total:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
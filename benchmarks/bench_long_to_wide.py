@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# benchmarks/bench_long_to_wide.py
+# Peak-memory report for historical_data_cleanup's long -> wide conversion:
+# the old whole-frame pass (full load, home/away copies, pd.merge,
+# drop_duplicates over the result, one write) vs the season-at-a-time
+# sort-merge stream, on the real master and on copies with its history
+# repeated 2x, 4x ... (seasons shifted forward, game ids offset). Each run is
+# a fresh subprocess so its peak RSS is its own. Checks both write the same
+# wide rows.
+#
+#   python benchmarks/bench_long_to_wide.py [--scales 1 2 4]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+import master_store as ms  # noqa: E402
+import historical_data_cleanup as hdc  # noqa: E402
+
+MASTER_SUBDIR = os.path.join("data", "master", "master_dataset")
+
+
+def merge_long_to_wide(df):
+    """Reference: the old in-memory conversion (pd.merge + drop_duplicates over everything)."""
+    df['game_date_for_merge'] = pd.to_datetime(df['game_date_et'], errors='coerce', utc=True).dt.date
+    home = df[df['is_home'] == True].copy()
+    away = df[df['is_home'] == False].copy()
+    home = home.rename(columns={c: f'home_{c}' for c in hdc.COLUMNS_TO_RENAME})
+    away = away.rename(columns={c: f'away_{c}' for c in hdc.COLUMNS_TO_RENAME})
+    wide = pd.merge(home, away, on=['game_id', 'game_date_for_merge'], how='inner', suffixes=('_home', '_away'))
+    wide = wide.drop(columns=['is_home_home', 'is_home_away'], errors='ignore')
+    for col in hdc.SHARED_COLUMNS:
+        if f'{col}_away' in wide.columns:
+            wide = wide.drop(columns=[f'{col}_away'])
+            if f'{col}_home' in wide.columns:
+                wide = wide.rename(columns={f'{col}_home': col})
+        elif f'{col}_home' in wide.columns and col not in wide.columns:
+            wide = wide.rename(columns={f'{col}_home': col})
+    wide = wide.drop_duplicates(subset=['game_id', 'game_date_for_merge', 'home_team', 'away_team'], keep='first')
+    return hdc.clean_types(wide.drop(columns=['game_date_for_merge']))
+
+
+def child(mode, root):
+    """Run one conversion in `root` and print its stats as JSON."""
+    os.chdir(root)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "old":
+            ms.write_master(merge_long_to_wide(ms.load_master()))
+        else:
+            hdc.historical_data_cleanup()
+    print(json.dumps({"seconds": time.perf_counter() - start,
+                      "peak_mb": hdc.peak_rss_mb()}))
+
+
+def make_history(long_df, scale, root):
+    """Long master with its history repeated `scale` times, written as a partitioned dataset under root."""
+    years = int(long_df['season'].max() - long_df['season'].min() + 1)
+    copies = []
+    for i in range(scale):
+        shift = years * (scale - 1 - i)
+        copy = long_df.copy()
+        copy['season'] = copy['season'] - shift
+        copy['game_date_et'] = copy['game_date_et'] - pd.DateOffset(years=shift)
+        copy['game_id'] = copy['game_id'] + i * 10_000_000
+        copies.append(copy)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ms.write_master(pd.concat(copies, ignore_index=True), os.path.join(root, MASTER_SUBDIR))
+
+
+def run(mode, root):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, root],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long -> wide conversion peak-memory report")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROOT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    os.chdir(REPO_ROOT)
+    with contextlib.redirect_stdout(io.StringIO()):
+        long_df = ms.load_master()
+
+    print(f"{'history':<9} {'long rows':>10} {'wide rows':>10} {'old peak MB':>12} {'stream peak MB':>15} "
+          f"{'old s':>6} {'stream s':>9} {'match':>6}")
+    for scale in args.scales:
+        results, frames = {}, {}
+        for mode in ("old", "stream"):
+            with tempfile.TemporaryDirectory() as root:
+                make_history(long_df, scale, root)
+                results[mode] = run(mode, root)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    frames[mode] = ms.load_master(master_dir=os.path.join(root, MASTER_SUBDIR), legacy_file="")
+        keys = ['game_id', 'game_date_et', 'home_team', 'away_team']
+        old, new = (frames[m].sort_values(keys).reset_index(drop=True) for m in ("old", "stream"))
+        try:
+            pd.testing.assert_frame_equal(old, new, check_categorical=False)
+            match = True
+        except AssertionError as e:
+            print(e)
+            match = False
+        print(f"{str(scale) + 'x':<9} {len(long_df) * scale:>10,} {len(new):>10,} "
+              f"{results['old']['peak_mb']:>12.0f} {results['stream']['peak_mb']:>15.0f} "
+              f"{results['old']['seconds']:>6.1f} {results['stream']['seconds']:>9.1f} {str(match):>6}")
+
+
+if __name__ == "__main__":
+    main()
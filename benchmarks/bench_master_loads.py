@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# benchmarks/bench_master_loads.py
+# What each consumer reads from the master: the projected / filtered
+# load_master call every script now makes vs the full read they used to do,
+# on the legacy single file and on a partitioned copy of it. Reports rows,
+# bytes read (compressed column chunks after pruning) and load time.
+#
+#   python benchmarks/bench_master_loads.py [--repeat 5]
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+os.chdir(REPO_ROOT)
+import master_store as ms  # noqa: E402
+from standings import MASTER_COLUMNS  # noqa: E402
+from team_form import FORM_INPUT_COLUMNS  # noqa: E402
+from team_ledger import LEDGER_COLUMNS  # noqa: E402
+
+
+def caller_loads(latest_date, latest_season, first_signal_date):
+    """(label, load_master kwargs) for each script's read."""
+    return [
+        ("full read (before)", {}),
+        ("update_master_data ids", {"columns": ["game_id", "game_date_et"]}),
+        ("update_master_data day", {"date_range": (latest_date, latest_date)}),
+        ("update_signal_results", {"columns": ["game_id", "team_abbr", "team_won", "game_date_et"],
+                                   "date_range": (first_signal_date, None)}),
+        ("standings", {"columns": MASTER_COLUMNS}),
+        ("team_ledger", {"columns": LEDGER_COLUMNS}),
+        ("team_form (one season)", {"columns": FORM_INPUT_COLUMNS, "seasons": latest_season}),
+        ("one team, one month", {"teams": "NYY", "date_range": (latest_date.replace(day=1), latest_date)}),
+    ]
+
+
+def measure(kwargs, repeat):
+    """(rows, MB read, best ms) for one load_master call, parsed from its log line."""
+    best = float("inf")
+    for _ in range(repeat):
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            start = time.perf_counter()
+            df = ms.load_master(**kwargs)
+            best = min(best, time.perf_counter() - start)
+    mb = float(log.getvalue().split(" MB read")[0].rsplit(" ", 1)[-1])
+    return len(df), mb, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Master loader projection / pushdown report")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        dates = ms.load_master(columns=["game_date_et", "season"])
+    latest_date = dates["game_date_et"].max().date()
+    loads = caller_loads(latest_date, int(dates["season"].max()), "2026-04-18")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        master_dir = os.path.join(tmp, "master_dataset")
+        with contextlib.redirect_stdout(io.StringIO()):
+            ms.write_master(ms.load_master(), master_dir)
+        layouts = [("legacy file", {}), ("partitioned", {"master_dir": master_dir})]
+        print(f"{'caller':<26} {'layout':<12} {'rows':>7} {'MB read':>8} {'ms':>7}")
+        for label, kwargs in loads:
+            for layout, store in layouts:
+                rows, mb, ms_taken = measure({**kwargs, **store}, args.repeat)
+                print(f"{label:<26} {layout:<12} {rows:>7,} {mb:>8.2f} {ms_taken:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
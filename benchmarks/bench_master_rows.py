@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# benchmarks/bench_master_rows.py
+# Micro-benchmark: the old per-team-row master row construction (template
+# Series copy + field-by-field sets) vs update_master_data.build_master_rows
+# on a catch-up batch built from archived daily files. Also checks the two
+# produce identical rows and end-of-batch team records.
+#
+#   python benchmarks/bench_master_rows.py [--days 30]
+
+import argparse
+import copy
+import glob
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+os.chdir(REPO_ROOT)
+import update_master_data as umd  # noqa: E402
+from master_store import load_master  # noqa: E402
+
+
+def legacy_update_team_stats(team_stats, team_abbr, won):
+    stats = team_stats[team_abbr]
+    if won:
+        stats['wins'] += 1
+        stats['loss_streak'] = 0
+        stats['win_streak'] += 1
+        stats['streak'] = stats['win_streak']
+    else:
+        stats['losses'] += 1
+        stats['win_streak'] = 0
+        stats['loss_streak'] += 1
+        stats['streak'] = -stats['loss_streak']
+    total_games = stats['wins'] + stats['losses']
+    stats['win_pct'] = stats['wins'] / total_games if total_games > 0 else 0.0
+
+
+def legacy_create_master_row(game, team_abbr, opponent_abbr, is_home, team_stats, template_row, date):
+    row = template_row.copy()
+    row['game_id'] = game.get('game_id', '')
+    row['game_date_et'] = pd.to_datetime(date)
+    row['start_time_et'] = game.get('start_time_et', '')
+    row['team_abbr'] = team_abbr
+    row['opponent_abbr'] = opponent_abbr
+    row['is_home'] = is_home
+    if is_home:
+        row['team'] = game.get('home_team', '')
+        row['opponent'] = game.get('away_team', '')
+    else:
+        row['team'] = game.get('away_team', '')
+        row['opponent'] = game.get('home_team', '')
+    row['Wins'] = team_stats['wins']
+    row['Losses'] = team_stats['losses']
+    row['Win_Pct'] = round(team_stats['win_pct'], 3)
+    row['team_streak'] = team_stats['streak']
+    row['Win_Streak'] = team_stats['win_streak']
+    row['Loss_Streak'] = team_stats['loss_streak']
+    row['home_score'] = game.get('home_score', 0)
+    row['away_score'] = game.get('away_score', 0)
+    for inning in range(1, 10):
+        row[f'home_{inning}'] = game.get(f'home_{inning}', 0)
+        row[f'away_{inning}'] = game.get(f'away_{inning}', 0)
+    if is_home:
+        row['h2h_own_odds'] = game.get('moneyline_home', '')
+        row['h2h_opp_odds'] = game.get('moneyline_away', '')
+    else:
+        row['h2h_own_odds'] = game.get('moneyline_away', '')
+        row['h2h_opp_odds'] = game.get('moneyline_home', '')
+    row['Total'] = game.get('total_line', '')
+    row['Over_Price_odds'] = game.get('over_odds', '')
+    row['Under_Price_odds'] = game.get('under_odds', '')
+    row['season'] = umd.CURRENT_SEASON
+    row['merge_key'] = f"{game.get('game_id', '')}_{team_abbr}"
+    try:
+        home_score = float(game.get('home_score', 0) or 0)
+        away_score = float(game.get('away_score', 0) or 0)
+        row['team_won'] = home_score > away_score if is_home else away_score > home_score
+    except (ValueError, TypeError):
+        row['team_won'] = None
+    for col in umd.LEGACY_ODDS_COLS:
+        if col in row.index:
+            row[col] = None
+    return row
+
+
+def legacy_build_master_rows(finished_games, team_mapping, team_stats, template_row, date):
+    """The iterrows loop previously inlined in process_daily_update."""
+    new_rows = []
+    games_processed = 0
+    for _, game in finished_games.iterrows():
+        home_team = umd.map_team_name(game['home_team'], team_mapping)
+        away_team = umd.map_team_name(game['away_team'], team_mapping)
+        if not home_team or not away_team:
+            continue
+        if home_team not in team_stats or away_team not in team_stats:
+            continue
+        try:
+            home_score = float(game.get('home_score', 0))
+            away_score = float(game.get('away_score', 0))
+        except (ValueError, TypeError):
+            continue
+        home_won = home_score > away_score
+        legacy_update_team_stats(team_stats, home_team, home_won)
+        legacy_update_team_stats(team_stats, away_team, not home_won)
+        new_rows.append(legacy_create_master_row(game, home_team, away_team, True, team_stats[home_team], template_row, date))
+        new_rows.append(legacy_create_master_row(game, away_team, home_team, False, team_stats[away_team], template_row, date))
+        games_processed += 1
+    return pd.DataFrame(new_rows).reset_index(drop=True), games_processed
+
+
+def catch_up_batch(days):
+    """The last `days` archived daily files as one slate of finished games."""
+    files = sorted(glob.glob(os.path.join(REPO_ROOT, "data", "archive", "MLB", "*", "MLB_Combined_Odds_Results_*.csv")))[-days:]
+    games = pd.concat([pd.read_csv(f) for f in files], ignore_index=True)
+    return games[games['status'] == 'Finished'].reset_index(drop=True), len(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Master row construction micro-benchmark")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    master_df = load_master()
+    template_row = master_df.iloc[0].copy()
+    team_mapping = umd.load_team_mapping()
+    start_stats = umd.get_team_stats_for_season(master_df, umd.CURRENT_SEASON)
+    games, n_files = catch_up_batch(args.days)
+    date = "2026-01-01"
+    print(f"Catch-up batch: {n_files} daily files, {len(games)} finished games")
+
+    legacy_stats, new_stats = copy.deepcopy(start_stats), copy.deepcopy(start_stats)
+    legacy_df, _ = legacy_build_master_rows(games, team_mapping, legacy_stats, template_row, date)
+    new_df, _ = umd.build_master_rows(games, team_mapping, new_stats, template_row, date)
+    try:
+        pd.testing.assert_frame_equal(legacy_df, new_df)
+        match = legacy_stats == new_stats
+    except AssertionError as e:
+        print(e)
+        match = False
+    print(f"Rows: {len(new_df)} | identical rows and team records: {match}")
+
+    def timed(fn):
+        return min(timeit.repeat(
+            lambda: fn(games, team_mapping, copy.deepcopy(start_stats), template_row, date),
+            number=1, repeat=args.repeat)) * 1000
+
+    legacy = timed(legacy_build_master_rows)
+    columnar = timed(umd.build_master_rows)
+    print(f"\n{'legacy (ms)':>12} {'build_master_rows (ms)':>23} {'speedup':>8}")
+    print(f"{legacy:>12.1f} {columnar:>23.1f} {legacy / columnar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
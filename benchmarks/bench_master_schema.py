@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# benchmarks/bench_master_schema.py
+# Size report: the master as previously stored (object strings, float64
+# innings/odds, dead legacy columns) vs master_store's compact schema —
+# in-memory footprint, parquet size and read time, plus the columns that
+# shrank most. Checks the compact frame holds the same values (odds to
+# float32 precision).
+#
+#   python benchmarks/bench_master_schema.py
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+os.chdir(REPO_ROOT)
+import master_store as ms  # noqa: E402
+
+
+def raw_master():
+    """The master with its stored dtypes, before the compact schema."""
+    if os.path.isdir(ms.MASTER_DIR) and ms._needs_migration(ms._dataset_schema(ms.MASTER_DIR)):
+        return pq.read_table(ms.MASTER_DIR).to_pandas().drop(columns=["month"], errors="ignore")
+    if os.path.exists(ms.LEGACY_MASTER_FILE):
+        return pd.read_parquet(ms.LEGACY_MASTER_FILE)
+    sys.exit("No pre-compact master to compare against (already migrated?)")
+
+
+def same_values(raw, compact):
+    for col in compact.columns:
+        before, after = raw[col], compact[col]
+        if col in ms.ODDS_COLUMNS:
+            before = pd.to_numeric(before, errors="coerce").astype("float32")
+        if not before.astype(object).where(before.notna(), None).equals(after.astype(object).where(after.notna(), None)):
+            print(f"  ❌ {col} differs")
+            return False
+    return True
+
+
+def parquet_stats(table, path):
+    pq.write_table(table, path)
+    start = time.perf_counter()
+    pq.read_table(path).to_pandas()
+    return os.path.getsize(path), time.perf_counter() - start
+
+
+def main():
+    raw = raw_master()
+    compact = ms.apply_schema(raw)
+
+    raw_mem = raw.memory_usage(deep=True, index=False)
+    compact_mem = compact.memory_usage(deep=True, index=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_size, raw_read = parquet_stats(pa.Table.from_pandas(raw, preserve_index=False), os.path.join(tmp, "raw.parquet"))
+        compact_size, compact_read = parquet_stats(ms._to_table(compact), os.path.join(tmp, "compact.parquet"))
+
+    print(f"Master: {len(raw):,} rows | {raw.shape[1]} columns -> {compact.shape[1]} "
+          f"(dropped: {', '.join(c for c in raw.columns if c not in compact.columns) or 'none'})")
+    print(f"Values preserved: {same_values(raw, compact)}")
+    print(f"\n{'':<22} {'before':>10} {'compact':>10} {'ratio':>7}")
+    print(f"{'in memory (MB)':<22} {raw_mem.sum() / 1e6:>10.2f} {compact_mem.sum() / 1e6:>10.2f} "
+          f"{raw_mem.sum() / compact_mem.sum():>6.1f}x")
+    print(f"{'parquet (kB)':<22} {raw_size / 1e3:>10.0f} {compact_size / 1e3:>10.0f} {raw_size / compact_size:>6.1f}x")
+    print(f"{'parquet read (ms)':<22} {raw_read * 1000:>10.1f} {compact_read * 1000:>10.1f} "
+          f"{raw_read / compact_read:>6.1f}x")
+
+    saved = (raw_mem.reindex(compact_mem.index) - compact_mem).sort_values(ascending=False)
+    print(f"\n{'column':<22} {'before':>14} {'compact':>14} {'saved (kB)':>11}")
+    for col in saved.index[:10]:
+        print(f"{col:<22} {str(raw[col].dtype):>14} {str(compact[col].dtype):>14} {saved[col] / 1e3:>11.0f}")
+    print(f"{'(other columns)':<22} {'':>14} {'':>14} {saved.iloc[10:].sum() / 1e3:>11.0f}")
+    for col in raw.columns.difference(compact.columns):
+        print(f"{col + ' (dropped)':<22} {str(raw[col].dtype):>14} {'-':>14} {raw_mem[col] / 1e3:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
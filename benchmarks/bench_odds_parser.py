@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# benchmarks/bench_odds_parser.py
+# Micro-benchmark: the old per-game odds parsing loop vs odds_parser.parse_slate
+# on recorded (or synthesized) per-game odds responses, at a single-slate size
+# and at a season-sized batch, plus flatten_bets (paid only when a fetch is
+# recorded to the snapshot store). Also checks the two parsers agree.
+#
+#   python benchmarks/bench_odds_parser.py [--fixtures recorded.jsonl]
+
+import argparse
+import glob
+import math
+import os
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+from api_stub import load_fixtures, synthesize  # noqa: E402
+from odds_parser import TARGET_ODDS, flatten_bets, parse_slate  # noqa: E402
+
+
+def legacy_parse_game(bets):
+    """The per-game loop previously duplicated in daily_pull_and_enrich.py / refresh_odds.py."""
+    game = {}
+    for bet in bets:
+        if bet["name"] == "Home/Away":
+            for val in bet.get("values", []):
+                opt = val["value"].lower()
+                if opt == "home":
+                    game["moneyline_home"] = float(val["odd"])
+                elif opt == "away":
+                    game["moneyline_away"] = float(val["odd"])
+
+        elif bet["name"] == "Over/Under":
+            totals_by_line = {}
+            for val in bet.get("values", []):
+                try:
+                    parts = val["value"].split(" ")
+                    side = parts[0].lower()
+                    line = float(parts[1])
+                except (IndexError, ValueError):
+                    continue
+                totals_by_line.setdefault(line, {})[side] = float(val["odd"])
+
+            best_line = None
+            best_distance = float("inf")
+            for line, sides in totals_by_line.items():
+                if "over" in sides and "under" in sides:
+                    avg_dist = (abs(sides["over"] - TARGET_ODDS) + abs(sides["under"] - TARGET_ODDS)) / 2
+                    if avg_dist < best_distance:
+                        best_distance = avg_dist
+                        best_line = line
+
+            if best_line is not None:
+                game["total_line"] = best_line
+                game["over_odds"] = totals_by_line[best_line].get("over")
+                game["under_odds"] = totals_by_line[best_line].get("under")
+    return game
+
+
+def legacy_parse_slate(bets_by_game):
+    return {game_id: legacy_parse_game(bets) for game_id, bets in bets_by_game.items()}
+
+
+def recorded_bets(fixtures):
+    """Per-game bets lists from odds?game=&bookmaker= responses."""
+    bets_by_game = {}
+    for key, payload in fixtures.items():
+        if key.startswith("odds?") and "game=" in key and payload.get("response"):
+            entry = payload["response"][0]
+            game_id = (entry.get("game") or {}).get("id") or key
+            bets = (entry.get("bookmakers") or [{}])[0].get("bets")
+            if bets:
+                bets_by_game.setdefault(game_id, bets)
+    return bets_by_game
+
+
+def scale(bets_by_game, n_games):
+    """Repeat the recorded games under fresh ids until there are n_games."""
+    base = list(bets_by_game.values())
+    return {i: base[i % len(base)] for i in range(n_games)}
+
+
+def same_result(a, b):
+    if a.keys() != b.keys():
+        return False
+    for game_id in a:
+        if a[game_id].keys() != b[game_id].keys():
+            return False
+        if any(not math.isclose(float(a[game_id][f]), float(b[game_id][f])) for f in a[game_id]):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Odds parsing micro-benchmark")
+    parser.add_argument("--fixtures", help="Recorded fixture file (default: synthesize from data/daily)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        daily_files = sorted(glob.glob(os.path.join(REPO_ROOT, "data", "daily", "MLB_Combined_Odds_Results_*.csv")))
+        fixtures = synthesize(daily_files[-2:])
+    recorded = recorded_bets(fixtures)
+    print(f"Recorded games with odds: {len(recorded)}")
+
+    print(f"\n{'games':>7} {'legacy (ms)':>12} {'parse_slate (ms)':>17} {'speedup':>8} {'match':>6} "
+          f"{'flatten_bets (ms)':>18}")
+    for n_games in (15, 150, 2430):
+        slate = scale(recorded, n_games)
+        match = same_result(legacy_parse_slate(slate), parse_slate(slate))
+        legacy = min(timeit.repeat(lambda: legacy_parse_slate(slate), number=1, repeat=args.repeat)) * 1000
+        shared = min(timeit.repeat(lambda: parse_slate(slate), number=1, repeat=args.repeat)) * 1000
+        flatten = min(timeit.repeat(lambda: flatten_bets(slate), number=1, repeat=args.repeat)) * 1000
+        print(f"{n_games:>7} {legacy:>12.2f} {shared:>17.2f} {legacy / shared:>7.2f}x {str(match):>6} "
+              f"{flatten:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# benchmarks/bench_pipeline.py
+# End-to-end benchmark: runs daily_pull_and_enrich.py and refresh_odds.py
+# against the replay stub (benchmarks/api_stub.py) in a scratch working
+# directory and reports wall time, API request count and peak RSS per run.
+#
+#   python benchmarks/bench_pipeline.py                       # synthetic fixtures
+#   python benchmarks/bench_pipeline.py --fixtures recorded.jsonl --latency-ms 250
+
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+from api_stub import load_fixtures, start_server, synthesize  # noqa: E402
+
+eastern = pytz.timezone("US/Eastern")
+
+# Each config is run for both scripts; env overrides on top of the stub env
+CONFIGS = {
+    "sequential": {"FETCH_WORKERS": "1", "BULK_ODDS": "0", "BULK_RESULTS": "0"},
+    "concurrent": {"FETCH_WORKERS": "8", "BULK_ODDS": "0", "BULK_RESULTS": "0"},
+    "bulk+concurrent": {"FETCH_WORKERS": "8"},
+}
+
+
+def stub_requests(base_url):
+    return requests.get(f"{base_url}/__stats", timeout=5).json()["requests"]
+
+
+def seed_workdir(workdir, yesterday_csv):
+    """Scratch tree with yesterday's daily file, scores stripped so enrichment has work to do."""
+    os.makedirs(os.path.join(workdir, "data", "daily"), exist_ok=True)
+    yesterday = (datetime.now(eastern) - timedelta(days=1)).strftime("%Y-%m-%d")
+    df = pd.read_csv(yesterday_csv)
+    df["game_date"] = yesterday
+    df["start_time_et"] = yesterday + " " + df["start_time_et"].str.split(" ").str[1]
+    for col in ["home_score", "away_score", "status", "winner", "total_result"] + \
+               [f"{side}_{i}" for side in ("home", "away") for i in range(1, 10)]:
+        df[col] = None
+    df.to_csv(os.path.join(workdir, "data", "daily", f"MLB_Combined_Odds_Results_{yesterday}.csv"), index=False)
+
+
+def run_script(script, workdir, env):
+    """Run one script to completion. Returns (wall_seconds, peak_rss_mb, returncode)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "scripts", script)],
+                            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        print(proc.stderr.read().decode()[-2000:])
+    # ru_maxrss is KiB on Linux
+    return wall, rusage.ru_maxrss / 1024, proc.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark against the API stub")
+    parser.add_argument("--fixtures", help="Recorded fixture file (default: synthesize from data/daily)")
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    args = parser.parse_args()
+
+    daily_files = sorted(glob.glob(os.path.join(REPO_ROOT, "data", "daily", "MLB_Combined_Odds_Results_*.csv")))
+    yesterday_csv, today_csv = daily_files[-2], daily_files[-1]
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        fixtures = synthesize([yesterday_csv, today_csv])
+    print(f"Fixtures: {len(fixtures)} responses | latency {args.latency_ms}±{args.jitter_ms} ms "
+          f"| error rate {args.error_rate:.0%}")
+
+    server, base_url = start_server(fixtures, latency_ms=args.latency_ms,
+                                    jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    results = []
+    try:
+        for name in args.configs:
+            workdir = tempfile.mkdtemp(prefix="mlb-bench-")
+            try:
+                seed_workdir(workdir, yesterday_csv)
+                env = dict(os.environ, API_SPORTS_BASE_URL=base_url, API_SPORTS_KEY="stub",
+                           API_CACHE="0", API_BACKOFF_BASE="0.05", **CONFIGS[name])
+                for script in ("daily_pull_and_enrich.py", "refresh_odds.py"):
+                    before = stub_requests(base_url)
+                    wall, rss, code = run_script(script, workdir, env)
+                    results.append((name, script, wall, stub_requests(base_url) - before, rss, code))
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        server.shutdown()
+
+    print(f"\n{'config':<18} {'script':<26} {'wall (s)':>9} {'requests':>9} {'peak RSS (MB)':>14}")
+    for name, script, wall, n_requests, rss, code in results:
+        flag = "" if code == 0 else f"  ❌ exit {code}"
+        print(f"{name:<18} {script:<26} {wall:>9.2f} {n_requests:>9} {rss:>14.1f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
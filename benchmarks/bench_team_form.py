@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# benchmarks/bench_team_form.py
+# Micro-benchmark: team_form.team_form (cumsum-difference windows over sorted
+# arrays) vs a per-team Python loop over the same rows, per season of the real
+# master and for all seasons at once. Checks both give the same features.
+#
+#   python benchmarks/bench_team_form.py [--windows 5 10]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+os.chdir(REPO_ROOT)
+from master_store import load_master  # noqa: E402
+from standings import game_order  # noqa: E402
+from team_form import FORM_INPUT_COLUMNS, form_columns, team_form  # noqa: E402
+
+
+def _mean(values):
+    values = [v for v in values if pd.notna(v)]
+    return sum(values) / len(values) if values else np.nan
+
+
+def loop_team_form(master_df, windows):
+    """Reference: walk each (season, team) in game order keeping per-game history lists."""
+    rows = game_order(master_df[FORM_INPUT_COLUMNS]).sort_values(['season', 'team_abbr'], kind='stable')
+    out = {}
+    for _, group in rows.groupby(['season', 'team_abbr'], sort=False):
+        history = []
+        venue_history = {True: [], False: []}
+        prev_date = None
+        for idx, row in group.iterrows():
+            is_home = bool(row['is_home'])
+            scored = row['home_score'] if is_home else row['away_score']
+            allowed = row['away_score'] if is_home else row['home_score']
+            won = float(row['team_won']) if pd.notna(row['team_won']) else np.nan
+            feats = {}
+            for n in windows:
+                last = history[-n:]
+                venue_last = venue_history[is_home][-n:]
+                feats[f'runs_scored_last{n}'] = _mean([h[0] for h in last])
+                feats[f'runs_allowed_last{n}'] = _mean([h[1] for h in last])
+                feats[f'run_diff_last{n}'] = _mean([h[0] - h[1] for h in last])
+                feats[f'win_pct_last{n}'] = _mean([h[2] for h in last])
+                feats[f'venue_run_diff_last{n}'] = _mean([h[0] - h[1] for h in venue_last])
+                feats[f'venue_win_pct_last{n}'] = _mean([h[2] for h in venue_last])
+            date = pd.Timestamp(row['game_date_et']).normalize()
+            feats['rest_days'] = float((date - prev_date).days) if prev_date is not None else np.nan
+            out[idx] = feats
+            history.append((scored, allowed, won))
+            venue_history[is_home].append((scored, allowed, won))
+            prev_date = date
+    return pd.DataFrame.from_dict(out, orient='index')[form_columns(windows)].reindex(master_df.index)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling team form micro-benchmark")
+    parser.add_argument("--windows", type=int, nargs="+", default=[5, 10])
+    args = parser.parse_args()
+
+    master_df = load_master(columns=FORM_INPUT_COLUMNS)
+    slices = [(str(season), master_df[master_df['season'] == season]) for season in sorted(master_df['season'].unique())]
+    slices.append(("all seasons", master_df))
+
+    print(f"{'slice':<12} {'rows':>7} {'loop (s)':>9} {'team_form (ms)':>15} {'speedup':>8} {'match':>6}")
+    for label, df in slices:
+        reference, loop_s = timed(loop_team_form, df, args.windows)
+        form, array_s = timed(team_form, df, args.windows)
+        try:
+            pd.testing.assert_frame_equal(reference, form, check_dtype=False)
+            match = True
+        except AssertionError as e:
+            print(e)
+            match = False
+        print(f"{label:<12} {len(df):>7,} {loop_s:>9.2f} {array_s * 1000:>15.1f} {loop_s / array_s:>7.0f}x {str(match):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# benchmarks/bench_team_ledger.py
+# Micro-benchmark: pre-game team state from team_ledger.TeamLedger vs doing it
+# on the master DataFrame — single "team X as of T" lookups (binary search vs
+# boolean filter) and a batched as-of join of every master row (one
+# searchsorted vs game_order + groupby shift). Checks the join matches the
+# shifted post-game columns.
+#
+#   python benchmarks/bench_team_ledger.py [--queries 2000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+os.chdir(REPO_ROOT)
+from master_store import load_master  # noqa: E402
+from standings import game_order, parse_start_times  # noqa: E402
+from team_ledger import LEDGER_COLUMNS, TeamLedger  # noqa: E402
+
+
+def filter_as_of(master_df, start, team, when):
+    """Baseline single lookup: filter the team's earlier games and take the last."""
+    season = pd.Timestamp(when).year
+    earlier = master_df[(master_df['team_abbr'] == team) & (master_df['season'] == season) & (start < when)]
+    if earlier.empty:
+        return {'wins': 0, 'losses': 0, 'streak': 0}
+    last = earlier.loc[start[earlier.index].idxmax()]
+    return {'wins': int(last['Wins']), 'losses': int(last['Losses']), 'streak': int(last['team_streak'])}
+
+
+def shift_join(master_df):
+    """Baseline batched join: pre-game record = previous row's post-game record per team-season."""
+    rows = game_order(master_df).sort_values(['season', 'team_abbr'], kind='stable')
+    by_team = rows.groupby(['season', 'team_abbr'])
+    return pd.DataFrame({
+        'pre_wins': by_team['Wins'].shift().fillna(0),
+        'pre_losses': by_team['Losses'].shift().fillna(0),
+        'pre_streak': by_team['team_streak'].shift().fillna(0),
+        'pre_games': by_team.cumcount(),
+    }).reindex(master_df.index)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-in-time team ledger micro-benchmark")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    master_df = load_master(columns=LEDGER_COLUMNS)
+    ledger, build_s = timed(TeamLedger.build, master_df)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "team_ledger.npz")
+        ledger.save(path)
+        size = os.path.getsize(path)
+        ledger, load_s = timed(TeamLedger.load, path)
+    print(f"Ledger: {len(ledger.seasons)} team-seasons, {len(ledger.times):,} games | "
+          f"build {build_s * 1000:.0f} ms, load {load_s * 1000:.1f} ms, {size / 1e3:.0f} kB on disk")
+
+    # Single lookups at random (team, first pitch) pairs from the master
+    rng = np.random.default_rng(0)
+    start = parse_start_times(master_df['start_time_et']).fillna(pd.to_datetime(master_df['game_date_et']))
+    picks = rng.integers(0, len(master_df), args.queries)
+    queries = [(master_df['team_abbr'].iat[i], start.iat[i]) for i in picks]
+    ledger_states, ledger_s = timed(lambda: [ledger.as_of(team, when) for team, when in queries])
+    n_filter = min(200, args.queries)
+    filter_states, filter_s = timed(lambda: [filter_as_of(master_df, start, team, when) for team, when in queries[:n_filter]])
+    single_match = all({k: a[k] for k in b} == b for a, b in zip(ledger_states, filter_states))
+
+    joined, join_s = timed(ledger.as_of_join, master_df)
+    _, parsed_join_s = timed(ledger.as_of_join, master_df.assign(start_time_et=start))
+    reference, shift_s = timed(shift_join, master_df)
+    try:
+        pd.testing.assert_frame_equal(joined[reference.columns], reference, check_dtype=False)
+        join_match = True
+    except AssertionError as e:
+        print(e)
+        join_match = False
+
+    print(f"\n{'query':<28} {'baseline':>12} {'ledger':>12} {'speedup':>8} {'match':>6}")
+    per_filter, per_ledger = filter_s / n_filter * 1e6, ledger_s / args.queries * 1e6
+    print(f"{'single as_of (µs/query)':<28} {per_filter:>12.0f} {per_ledger:>12.1f} "
+          f"{per_filter / per_ledger:>7.0f}x {str(single_match):>6}")
+    print(f"{'as-of join, all rows (ms)':<28} {shift_s * 1000:>12.1f} {join_s * 1000:>12.1f} "
+          f"{shift_s / join_s:>7.1f}x {str(join_match):>6}")
+    print(f"{'  same, times pre-parsed (ms)':<28} {'':>12} {parsed_join_s * 1000:>12.1f} {shift_s / parsed_join_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
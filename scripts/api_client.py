@@ -0,0 +1,219 @@
+# scripts/api_client.py
+# Shared HTTP client for every script that calls out to the network.
+# One keep-alive Session (connection pool) per process, retries with jittered
+# exponential backoff on 429/5xx, a running count of API-Sports quota read
+# from the rate-limit headers on every response, and an on-disk response
+# cache (see http_cache.py) in front of API-Sports GETs.
+
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import ResponseCache, cache_key, ttl_for
+
+# === Config ===
+API_BASE_URL = os.environ.get("API_SPORTS_BASE_URL", "https://v1.baseball.api-sports.io").rstrip("/")
+DEFAULT_TIMEOUT = 10
+MAX_RETRIES = int(os.environ.get("API_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("API_BACKOFF_BASE", "1.0"))  # seconds
+BACKOFF_MAX = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Endpoints API-Sports doesn't count against the daily quota
+UNCOUNTED_ENDPOINTS = {"status"}
+POOL_SIZE = int(os.environ.get("API_POOL_SIZE", "16"))
+
+# Low-priority work (odds refreshes, re-enrichment) is refused when fewer
+# than this many API-Sports requests are left for the day
+QUOTA_RESERVE = int(os.environ.get("API_QUOTA_RESERVE", "50"))
+
+# API_CACHE=0 disables the response cache; API_OFFLINE=1 (or --offline)
+# serves everything from it and never touches the network
+CACHE_ENABLED = os.environ.get("API_CACHE", "1") != "0"
+OFFLINE = os.environ.get("API_OFFLINE") == "1"
+
+
+class QuotaExhausted(Exception):
+    """Raised when low-priority work would eat into the reserved daily quota."""
+
+
+class CacheMiss(requests.exceptions.RequestException):
+    """Offline mode asked for a response that isn't cached."""
+
+
+class QuotaTracker:
+    """Running view of the API-Sports quota, updated from response headers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.daily_limit = None
+        self.daily_remaining = None
+        self.minute_remaining = None
+        self.requests_made = 0
+        self.retries = 0
+
+    def update(self, headers, counted=True):
+        with self._lock:
+            if counted:
+                self.requests_made += 1
+            limit = headers.get("x-ratelimit-requests-limit")
+            remaining = headers.get("x-ratelimit-requests-remaining")
+            minute_remaining = headers.get("x-ratelimit-remaining")
+            if limit is not None:
+                self.daily_limit = int(limit)
+            if remaining is not None:
+                self.daily_remaining = int(remaining)
+            if minute_remaining is not None:
+                self.minute_remaining = int(minute_remaining)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def set_daily(self, limit, used):
+        with self._lock:
+            self.daily_limit = limit
+            self.daily_remaining = limit - used
+
+    def has_budget(self, needed=1, reserve=QUOTA_RESERVE):
+        # Unknown quota (no response seen yet) is treated as available
+        if self.daily_remaining is None:
+            return True
+        return self.daily_remaining - needed >= reserve
+
+
+quota = QuotaTracker()
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def set_offline(offline=True):
+    """Serve API-Sports responses from the cache only (for deterministic re-runs)."""
+    global OFFLINE
+    OFFLINE = offline
+
+
+def is_offline():
+    return OFFLINE
+
+
+def get_cache():
+    """Process-wide response cache, opened on first use. None when disabled."""
+    global _cache
+    if not (CACHE_ENABLED or OFFLINE):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def get_session():
+    """Process-wide keep-alive Session, sized for the concurrent fetch stages."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, honouring Retry-After when the server sends one."""
+    if retry_after is not None:
+        try:
+            return min(BACKOFF_MAX, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def request(method, url, retries=MAX_RETRIES, **kwargs):
+    """Session request with retries on connection errors, timeouts and 429/5xx."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    session = get_session()
+    for attempt in range(retries + 1):
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == retries:
+                raise
+            quota.record_retry()
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        if url.startswith(API_BASE_URL):
+            endpoint = url[len(API_BASE_URL):].split("?", 1)[0].strip("/")
+            quota.update(response.headers, counted=endpoint not in UNCOUNTED_ENDPOINTS)
+
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            quota.record_retry()
+            time.sleep(backoff_delay(attempt, response.headers.get("Retry-After")))
+            continue
+        return response
+
+
+def api_get(endpoint, params=None, use_cache=True, **kwargs):
+    """GET an API-Sports baseball endpoint and return the decoded JSON body (cached)."""
+    cache = get_cache() if use_cache else None
+    key = cache_key(endpoint, params)
+    if cache is not None:
+        cached = cache.get(key, allow_stale=OFFLINE)
+        if cached is not None:
+            return cached
+    if OFFLINE:
+        raise CacheMiss(f"offline mode: no cached response for {key}")
+
+    headers = {"x-apisports-key": os.environ.get("API_SPORTS_KEY", "")}
+    response = request("GET", f"{API_BASE_URL}/{endpoint.lstrip('/')}",
+                       params=params, headers=headers, **kwargs)
+    response.raise_for_status()
+    payload = response.json()
+    if cache is not None:
+        cache.put(key, payload, ttl_for(endpoint, payload))
+    return payload
+
+
+def refresh_quota():
+    """Read the daily quota from /status, which API-Sports does not count against it."""
+    if OFFLINE:
+        return
+    try:
+        data = api_get("status", use_cache=False)
+        requests_info = (data.get("response") or {}).get("requests") or {}
+        if "limit_day" in requests_info and "current" in requests_info:
+            quota.set_daily(int(requests_info["limit_day"]), int(requests_info["current"]))
+    except Exception as e:
+        print(f"⚠️ Could not read API quota status: {e}")
+
+
+def require_quota(label, needed=1):
+    """
+    Gate for low-priority work. Raises QuotaExhausted if running `needed`
+    more requests would leave fewer than QUOTA_RESERVE for the day.
+    """
+    if quota.daily_remaining is None:
+        refresh_quota()
+    if not quota.has_budget(needed):
+        raise QuotaExhausted(
+            f"{label}: needs ~{needed} requests but only {quota.daily_remaining} left "
+            f"today (reserve={QUOTA_RESERVE})"
+        )
+
+
+def print_api_summary():
+    """End-of-run line for the Actions log: quota use and cache effectiveness."""
+    remaining = quota.daily_remaining if quota.daily_remaining is not None else "?"
+    limit = quota.daily_limit if quota.daily_limit is not None else "?"
+    print(f"📡 API-Sports requests this run: {quota.requests_made} "
+          f"(retries: {quota.retries}) | remaining today: {remaining}/{limit}")
+    if _cache is not None:
+        print(_cache.summary())
@@ -4,6 +4,8 @@ import os
 import shutil
 from datetime import datetime, timedelta
 
+from storage import locked
+
 # === CHANGED: Dynamic year — never needs updating again ===
 CURRENT_YEAR = datetime.now().year
 
@@ -29,7 +31,9 @@ for filename in os.listdir(daily_dir):
             if file_date < cutoff_date:
                 src_path = os.path.join(daily_dir, filename)
                 dest_path = os.path.join(archive_dir, filename)
-                shutil.move(src_path, dest_path)
+                # Under the file's lock so a run still writing it finishes first
+                with locked(src_path):
+                    shutil.move(src_path, dest_path)
                 moved_files.append(filename)
         except Exception as e:
             print(f"⚠️ Could not process {filename}: {e}")
@@ -1,23 +1,38 @@
 # scripts/daily_pull_and_enrich.py
 
 import os
+import argparse
+import time
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import pytz
 
+from api_client import QuotaExhausted, api_get, is_offline, print_api_summary, require_quota, set_offline
+from odds_parser import flatten_bets, parse_bets
+from odds_snapshots import append_snapshot
+from storage import write_csv
+
 # === Config ===
 API_KEY = os.environ.get("API_SPORTS_KEY")
-if not API_KEY:
-    raise ValueError("API_SPORTS_KEY environment variable not set.")
-
-HEADERS = {"x-apisports-key": API_KEY}
 
 # === CHANGED: Dynamic season year ===
 CURRENT_SEASON = datetime.now().year
 
-# === Consensus odds target — decimal equivalent of -110 ===
-TARGET_ODDS = 1.909
+# === Max in-flight API requests per stage (1 = original sequential path) ===
+FETCH_WORKERS = max(1, int(os.environ.get("FETCH_WORKERS", "4")))
+
+# === Bookmakers in priority order — Pinnacle first, Marathon as fallback ===
+BOOKMAKERS = [(4, 'Pinnacle'), (10, 'Marathon')]
+
+# === Bulk mode: one date-scoped query (odds per bookmaker, results from the
+# schedule endpoint) instead of one call per game. Below this many games the
+# per-game path is cheaper. ===
+BULK_ODDS = os.environ.get("BULK_ODDS", "1") != "0"
+BULK_RESULTS = os.environ.get("BULK_RESULTS", "1") != "0"
+BULK_MIN_GAMES = 3
 
 utc = pytz.utc
 eastern = pytz.timezone("US/Eastern")
@@ -35,13 +50,31 @@ def normalize_team_name(name):
 def safe_inning_scores(scores_dict):
     return scores_dict.get("innings", {}) if scores_dict else {}
 
+@contextmanager
+def timed_stage(name):
+    """Log wall time for a pipeline stage so concurrency gains show up in the Actions log."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        print(f"⏱️  {name}: {time.perf_counter() - start:.2f}s (workers={FETCH_WORKERS})")
+
+def fetch_concurrently(fetch_fn, keys):
+    """
+    Run fetch_fn over keys with at most FETCH_WORKERS requests in flight.
+    Returns {key: result} in input order, so callers can apply results in
+    exactly the same order as the sequential path.
+    """
+    keys = list(keys)
+    if FETCH_WORKERS <= 1 or len(keys) <= 1:
+        return {key: fetch_fn(key) for key in keys}
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(keys))) as pool:
+        return dict(zip(keys, pool.map(fetch_fn, keys)))
+
 def fetch_odds_from_bookmaker(game_id, bookmaker_id):
     """Fetch raw bets list from a specific bookmaker. Returns bets list or None."""
     try:
-        odds_url = f"https://v1.baseball.api-sports.io/odds?game={game_id}&bookmaker={bookmaker_id}"
-        response = requests.get(odds_url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        odds_data = response.json()
+        odds_data = api_get("odds", {"game": game_id, "bookmaker": bookmaker_id})
 
         if not odds_data or not odds_data.get("response"):
             return None
@@ -55,68 +88,122 @@ def fetch_odds_from_bookmaker(game_id, bookmaker_id):
         return None
 
 
-def pull_odds_for_game(game_id, game):
-    """Pull and parse odds for a single game. Tries Pinnacle (4) then Marathon (10) as fallback."""
-    # Try Pinnacle first, then Marathon as fallback
-    bets = None
-    bookmaker_used = None
-    for bk_id, bk_name in [(4, 'Pinnacle'), (10, 'Marathon')]:
+def fetch_bets_for_game(game_id):
+    """Network half of pull_odds_for_game: Pinnacle (4) then Marathon (10). Returns (bets, bookmaker_name)."""
+    for bk_id, bk_name in BOOKMAKERS:
         bets = fetch_odds_from_bookmaker(game_id, bk_id)
         if bets:
-            bookmaker_used = bk_name
-            if bk_id != 4:
-                print(f"  ⚠️ Pinnacle unavailable — using {bk_name} for game {game_id}")
-            break
-
-    if not bets:
-        print(f"  ❌ No odds available from any bookmaker for game {game_id}")
-        return False
+            return bets, bk_name
+    return None, None
+
+def api_dates_for(game_date):
+    """API dates are UTC — an ET game date can land on that day or the next."""
+    next_day = datetime.strptime(game_date, "%Y-%m-%d") + timedelta(days=1)
+    return [game_date, next_day.strftime("%Y-%m-%d")]
+
+def fetch_slate_odds(api_date, bookmaker_id):
+    """Bulk odds for every game on an API date from one bookmaker. Returns {game_id: bets}."""
+    slate = {}
+    page = 1
+    try:
+        while True:
+            data = api_get("odds", {"league": 1, "season": CURRENT_SEASON, "date": api_date,
+                                    "bookmaker": bookmaker_id, "page": page})
+            if data.get("errors"):
+                print(f"⚠️ Bulk odds query rejected for {api_date} (bookmaker {bookmaker_id}): {data['errors']}")
+                break
+            for entry in data.get("response") or []:
+                game_id = (entry.get("game") or {}).get("id")
+                bookmakers_data = entry.get("bookmakers")
+                if game_id is None or not bookmakers_data:
+                    continue
+                bets = bookmakers_data[0].get("bets")
+                if bets:
+                    slate[game_id] = bets
+            total_pages = int((data.get("paging") or {}).get("total") or 1)
+            if page >= total_pages:
+                break
+            page += 1
+    except Exception as e:
+        print(f"⚠️ Error fetching bulk odds from bookmaker {bookmaker_id} for {api_date}: {e}")
+    return slate
 
+def fetch_bets_for_slate(games):
+    """
+    Fetch (bets, bookmaker_name) for every game in `games`.
+    Bulk mode pulls each bookmaker's whole slate by date (Pinnacle first, then
+    Marathon only if games are still missing); games absent from both bulk
+    responses fall back to the per-game path.
+    """
+    fetched = {}
+    if BULK_ODDS and len(games) >= BULK_MIN_GAMES:
+        api_dates = sorted({d for g in games.values() for d in api_dates_for(str(g["game_date"]))})
+        for bk_id, bk_name in BOOKMAKERS:
+            pending = [gid for gid in games if gid not in fetched]
+            if not pending:
+                break
+            slate = {}
+            for date_slate in fetch_concurrently(lambda d: fetch_slate_odds(d, bk_id), api_dates).values():
+                slate.update(date_slate)
+            for gid in pending:
+                if gid in slate:
+                    fetched[gid] = (slate[gid], bk_name)
+        print(f"📦 Bulk odds covered {len(fetched)}/{len(games)} games")
+
+    remaining = [gid for gid in games if gid not in fetched]
+    fetched.update(fetch_concurrently(fetch_bets_for_game, remaining))
+    return fetched
+
+def record_odds_snapshot(fetched, games, source):
+    """Append this fetch to the odds history. Never fails the pull."""
     try:
+        table = flatten_bets({gid: bets for gid, (bets, _) in fetched.items() if bets})
+        info = {gid: {"bookmaker": bookmaker, "game_date": str(games[gid]["game_date"]),
+                      "start_time_et": games[gid]["start_time_et"]}
+                for gid, (bets, bookmaker) in fetched.items() if bets}
+        written = append_snapshot(table, info, source)
+        print(f"🗃️  Recorded {written} odds snapshot rows ({source})")
+    except Exception as e:
+        print(f"⚠️ Could not record odds snapshot ({source}): {e}")
 
-        for bet in bets:
-            if bet["name"] == "Home/Away":
-                for val in bet.get("values", []):
-                    opt = val["value"].lower()
-                    if opt == "home":
-                        game["moneyline_home"] = val["odd"]
-                    elif opt == "away":
-                        game["moneyline_away"] = val["odd"]
-
-            elif bet["name"] == "Over/Under":
-                totals_by_line = {}
-                for val in bet.get("values", []):
-                    try:
-                        parts = val["value"].split(" ")
-                        side = parts[0].lower()
-                        line = float(parts[1])
-                    except (IndexError, ValueError):
-                        continue
-                    if line not in totals_by_line:
-                        totals_by_line[line] = {}
-                    totals_by_line[line][side] = float(val["odd"])
-
-                best_line = None
-                best_distance = float("inf")
-                for line, sides in totals_by_line.items():
-                    if "over" in sides and "under" in sides:
-                        avg_dist = (abs(sides["over"] - TARGET_ODDS) +
-                                   abs(sides["under"] - TARGET_ODDS)) / 2
-                        if avg_dist < best_distance:
-                            best_distance = avg_dist
-                            best_line = line
-
-                if best_line is not None:
-                    game["total_line"] = best_line
-                    game["over_odds"] = totals_by_line[best_line].get("over")
-                    game["under_odds"] = totals_by_line[best_line].get("under")
-
-        return True
+def parse_fetched_odds(fetched, games=None, source=None):
+    """
+    Parse every fetched {game_id: (bets, bookmaker_name)} on the slate. Returns
+    {game_id: odds fields}; a game whose bets fail to parse is left out.
+    With `games` and `source`, the fetch is also appended to the odds snapshot store.
+    """
+    parsed = {}
+    for gid, (bets, _) in fetched.items():
+        if not bets:
+            continue
+        try:
+            parsed[gid] = parse_bets(bets)
+        except Exception as e:
+            print(f"⚠️ Error parsing odds for game {gid}: {e}")
+    if games is not None and source:
+        record_odds_snapshot(fetched, games, source)
+    return parsed
 
-    except Exception as e:
-        print(f"⚠️ Error parsing odds for game {game_id}: {e}")
+def pull_odds_for_game(game_id, game, fetched=None, parsed=None):
+    """
+    Pull and parse odds for a single game. Tries Pinnacle (4) then Marathon (10) as fallback.
+    `fetched` is an already-fetched (bets, bookmaker_name) pair and `parsed` the
+    parse_fetched_odds result for the whole slate, from the batch path.
+    """
+    bets, bookmaker_used = fetched if fetched is not None else fetch_bets_for_game(game_id)
+    if bets and bookmaker_used != 'Pinnacle':
+        print(f"  ⚠️ Pinnacle unavailable — using {bookmaker_used} for game {game_id}")
+
+    if not bets:
+        print(f"  ❌ No odds available from any bookmaker for game {game_id}")
         return False
+
+    if parsed is None:
+        parsed = parse_fetched_odds({game_id: (bets, bookmaker_used)})
+    if game_id not in parsed:
         return False
+    game.update(parsed[game_id])
+    return True
 
 def re_enrich_missing_odds(games):
     """
@@ -132,10 +219,19 @@ def re_enrich_missing_odds(games):
         print("✅ No missing odds — all games have complete data")
         return 0
 
+    # Re-enrichment is low priority — at most two odds calls per game
+    try:
+        require_quota("Odds re-enrichment", needed=2 * len(missing))
+    except QuotaExhausted as e:
+        print(f"⏸️ Skipping re-enrichment: {e}")
+        return 0
+
     print(f"🔄 Re-enriching odds for {len(missing)} games with missing data...")
+    fetched = fetch_bets_for_slate(missing)
+    parsed = parse_fetched_odds(fetched, missing, source="re_enrich")
     fixed = 0
     for game_id, game in missing.items():
-        if pull_odds_for_game(game_id, game):
+        if pull_odds_for_game(game_id, game, fetched[game_id], parsed):
             print(f"  ✅ Game {game_id} ({game.get('home_team')} vs {game.get('away_team')}): "
                   f"ML={game.get('moneyline_home')} Total={game.get('total_line')}")
             fixed += 1
@@ -146,24 +242,54 @@ def re_enrich_missing_odds(games):
     print(f"🔄 Re-enrichment complete: {fixed}/{len(missing)} games fixed")
     return fixed
 
+def fetch_game_result(game_id):
+    """Fetch the games?id= payload. Exceptions are returned, not raised, so the
+    caller can report them in game order after a concurrent fetch."""
+    try:
+        return api_get("games", {"id": game_id})
+    except Exception as e:
+        return e
+
+def fetch_results_by_date(api_date):
+    """Bulk: every game on an API date from the schedule endpoint. Returns {game_id: game payload}."""
+    try:
+        data = api_get("games", {"league": 1, "season": CURRENT_SEASON, "date": api_date})
+        return {g["id"]: g for g in data.get("response") or [] if "id" in g}
+    except Exception as e:
+        print(f"⚠️ Error fetching bulk results for {api_date}: {e}")
+        return {}
+
 def enrich_results_for_games(games):
     """Enrich game data with scores and innings for finished games."""
     print(f"Attempting to enrich {len(games)} games...")
     enriched_count = 0
     skipped = []  # CHANGED: track every skip with a reason for visibility
+
+    # Bulk: fetch the one or two dates covering these games and index by id.
+    # Per-id calls only for ids the date responses don't include.
+    bulk = {}
+    if BULK_RESULTS and len(games) >= BULK_MIN_GAMES:
+        api_dates = sorted({d for g in games.values() for d in api_dates_for(str(g["game_date"]))})
+        for date_results in fetch_concurrently(fetch_results_by_date, api_dates).values():
+            bulk.update(date_results)
+        print(f"📦 Bulk results covered {sum(gid in bulk for gid in games)}/{len(games)} games")
+    fetched = fetch_concurrently(fetch_game_result, [gid for gid in games if gid not in bulk])
+
     for game_id, game in games.items():
         try:
-            url = f"https://v1.baseball.api-sports.io/games?id={game_id}"
-            response = requests.get(url, headers=HEADERS, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            if game_id in bulk:
+                g = bulk[game_id]
+            else:
+                data = fetched[game_id]
+                if isinstance(data, Exception):
+                    raise data
 
-            if not data or not data.get("response"):
-                print(f"⚠️ No API response for game {game_id} ({game.get('home_team','?')} vs {game.get('away_team','?')}) — skipping")
-                skipped.append((game_id, "no_api_response"))
-                continue
+                if not data or not data.get("response"):
+                    print(f"⚠️ No API response for game {game_id} ({game.get('home_team','?')} vs {game.get('away_team','?')}) — skipping")
+                    skipped.append((game_id, "no_api_response"))
+                    continue
 
-            g = data["response"][0]
+                g = data["response"][0]
 
             status = g["status"]["long"]
             if status != "Finished":
@@ -227,11 +353,8 @@ def pull_games_and_odds(target_date):
 
     for api_date in api_dates:
         # CHANGED: Dynamic season year
-        url = f"https://v1.baseball.api-sports.io/games?league=1&season={CURRENT_SEASON}&date={api_date}"
         try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = api_get("games", {"league": 1, "season": CURRENT_SEASON, "date": api_date})
 
             if not data or not data.get("response"):
                 print(f"⚠️ No API response for date {api_date}.")
@@ -270,9 +393,11 @@ def pull_games_and_odds(target_date):
             print(f"❌ Unexpected error for {api_date}: {e}")
 
     # Pull odds for all games using shared function
+    fetched = fetch_bets_for_slate(games)
+    parsed = parse_fetched_odds(fetched, games, source="initial_pull")
     odds_success = 0
     for game_id, game in games.items():
-        if pull_odds_for_game(game_id, game):
+        if pull_odds_for_game(game_id, game, fetched[game_id], parsed):
             odds_success += 1
 
     print(f"📊 Odds pulled for {odds_success}/{len(games)} games")
@@ -282,19 +407,31 @@ def pull_games_and_odds(target_date):
 # === MAIN EXECUTION LOGIC ===
 # =========================================================================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily MLB games + odds pull and enrichment")
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve every API response from the local cache (no network)")
+    args = parser.parse_args()
+    if args.offline:
+        set_offline()
+    if not API_KEY and not is_offline():
+        raise ValueError("API_SPORTS_KEY environment variable not set.")
+
     today_date_str = datetime.now(eastern).strftime("%Y-%m-%d")
     yesterday_date_str = (datetime.now(eastern) - timedelta(days=1)).strftime("%Y-%m-%d")
 
     print(f"\n--- Running Daily Automated Pull for {today_date_str} ---")
     print(f"🗓️  Season: {CURRENT_SEASON}")
+    print(f"🧵 Fetch workers: {FETCH_WORKERS}")
 
     # --- Step 1: Pull today's games and odds ---
-    today_games = pull_games_and_odds(today_date_str)
-    enrich_results_for_games(today_games)
+    with timed_stage("Pull today's games and odds"):
+        today_games = pull_games_and_odds(today_date_str)
+    with timed_stage("Enrich today's results"):
+        enrich_results_for_games(today_games)
 
     today_filename = f"data/daily/MLB_Combined_Odds_Results_{today_date_str}.csv"
     if today_games:
-        pd.DataFrame(today_games.values()).to_csv(today_filename, index=False)
+        write_csv(pd.DataFrame(today_games.values()), today_filename)
         print(f"\n✅ Saved today's file: {today_filename}")
     else:
         print(f"\n⚠️ No games found for today ({today_date_str}). Skipping save.")
@@ -309,13 +446,15 @@ if __name__ == "__main__":
             game_map = {g["game_id"]: g for g in yesterday_games_list if "game_id" in g}
 
             # CHANGED: Re-enrich missing odds from yesterday first
-            re_enrich_missing_odds(game_map)
+            with timed_stage("Re-enrich yesterday's odds"):
+                re_enrich_missing_odds(game_map)
 
             # Then enrich scores for finished games
-            enrich_results_for_games(game_map)
+            with timed_stage("Enrich yesterday's results"):
+                enrich_results_for_games(game_map)
 
             final_df = pd.DataFrame(game_map.values())
-            final_df.to_csv(yesterday_filename, index=False)
+            write_csv(final_df, yesterday_filename)
             print(f"✅ Updated yesterday's file: {yesterday_filename}")
         except pd.errors.EmptyDataError:
             print(f"⚠️ Yesterday's file is empty. Skipping.")
@@ -327,10 +466,12 @@ if __name__ == "__main__":
     # --- Step 3: CHANGED: Re-enrich today's odds if any were missing at pull time ---
     if today_games and os.path.exists(today_filename):
         print(f"\n🔄 Checking today's file for missing odds...")
-        fixed = re_enrich_missing_odds(today_games)
+        with timed_stage("Re-enrich today's odds"):
+            fixed = re_enrich_missing_odds(today_games)
         if fixed > 0:
-            pd.DataFrame(today_games.values()).to_csv(today_filename, index=False)
+            write_csv(pd.DataFrame(today_games.values()), today_filename)
             print(f"✅ Saved today's file with re-enriched odds: {today_filename}")
 
+    print_api_summary()
     print("\n--- Daily Pull and Enrichment Script Complete ---")
 
@@ -1,32 +1,121 @@
 # scripts/feature_engineering.py
 
+import argparse
 import pandas as pd
-import os
 import numpy as np
 
-# === Config ===
-MASTER_FILE = "data/master/master_template.parquet"
-# This script will save the enhanced master file back to the same path.
-# If you prefer to save it as a new file (e.g., 'enhanced_master.parquet'),
-# change this path.
-
-print("\n--- Starting Feature Engineering Script ---")
-
-if not os.path.exists(MASTER_FILE):
-    print(f"❌ Error: Master file not found at {MASTER_FILE}. Cannot perform feature engineering.")
-    exit() # Exit if master file doesn't exist
-
-try:
-    df = pd.read_parquet(MASTER_FILE)
-    print(f"✅ Master file loaded successfully. Rows: {len(df)}")
+from master_store import MASTER_DIR, load_master, master_exists, partition_keys, replace_partitions, write_master
 
+# === Config ===
+# The enhanced master is written back over the partitioned master dataset
+# (see master_store.py). By default only rows still missing features are
+# computed (incremental); --full recomputes history, --verify runs both and
+# compares.
+
+RECORD_COLUMNS = ['home_wins_season', 'home_losses_season', 'home_win_streak',
+                  'away_wins_season', 'away_losses_season', 'away_win_streak']
+FEATURE_COLUMNS = ['home_run_differential', 'away_run_differential', 'moneyline_bet_result',
+                   'home_moneyline_bet_result', 'away_moneyline_bet_result', 'total_bet_result'] + RECORD_COLUMNS
+
+
+def calculate_team_records(df, seed=None):
+    """
+    Cumulative season W/L and streak (positive = wins, negative = losses) after
+    each finished game, per team: one row per (game_id, team) with
+    wins_season_cumulative, losses_season_cumulative, win_streak_team_cumulative,
+    ordered by season, team, game_date, game_id.
+
+    Column-wise: melt each game into home and away team-games, grouped cumsums
+    for the record, and run-length encoding of results for the streak.
+
+    seed: optional team_state() frame — records continue from each (season, team)'s
+    last known state instead of 0-0.
+    """
+    # Each game appears twice (once for home, once for away)
+    has_winner = df['winner'].notna()
+    team_games = pd.concat([
+        pd.DataFrame({
+            'game_id': df['game_id'],
+            'game_date': df['game_date'],
+            'season': df['season'],
+            'team': df[team_col],
+            'is_winner': (df['winner'] == df[team_col]).where(has_winner),
+            'status': df['status'],
+        })
+        for team_col in ('home_team', 'away_team')
+    ], ignore_index=True)
+
+    # Finished games with a winner defined; groupby drops missing season/team keys, so do the same
+    team_games = team_games[
+        (team_games['status'] == 'Finished') &
+        team_games['is_winner'].notna() &
+        team_games['season'].notna() &
+        team_games['team'].notna()
+    ]
+    team_games = team_games.sort_values(by=['season', 'team', 'game_date', 'game_id'], kind='stable').reset_index(drop=True)
+
+    won = team_games['is_winner'].astype(bool).to_numpy()
+    by_team = team_games.groupby(['season', 'team'], sort=False)
+    wins = pd.Series(won, index=team_games.index).groupby([team_games['season'], team_games['team']], sort=False).cumsum()
+    games_played = by_team.cumcount() + 1
+
+    # Streak = signed length of the current run of identical results
+    first_game = (games_played == 1).to_numpy()
+    new_run = first_game | np.r_[True, won[1:] != won[:-1]]
+    run_id = np.cumsum(new_run)
+    run_length = pd.Series(run_id).groupby(run_id).cumcount().to_numpy() + 1
+
+    records = pd.DataFrame({
+        'game_id': team_games['game_id'],
+        'team': team_games['team'],
+        'wins_season_cumulative': wins.to_numpy(dtype='int64'),
+        'losses_season_cumulative': (games_played - wins).to_numpy(dtype='int64'),
+        'win_streak_team_cumulative': np.where(won, run_length, -run_length),
+    })
+    if seed is None or seed.empty or records.empty:
+        return records
+
+    # Continue from the seed: offset W/L; the first run extends a streak of the same sign
+    start = seed.reindex(pd.MultiIndex.from_arrays([team_games['season'], team_games['team']]))
+    start = start.fillna(0).astype('int64').to_numpy()
+    seed_wins, seed_losses, seed_streak = start[:, 0], start[:, 1], start[:, 2]
+    in_first_run = run_id == pd.Series(run_id).groupby([team_games['season'], team_games['team']]).transform('first').to_numpy()
+    carried = np.where(in_first_run & (won == (seed_streak > 0)) & (seed_streak != 0), seed_streak, 0)
+    records['wins_season_cumulative'] += seed_wins
+    records['losses_season_cumulative'] += seed_losses
+    records['win_streak_team_cumulative'] += carried
+    return records
+
+
+def team_state(df):
+    """
+    Last known (wins, losses, streak) per (season, team) from rows that already
+    have records, plus the (game_date, game_id) they were taken at.
+    """
+    sides = []
+    for side in ('home', 'away'):
+        part = df[['season', f'{side}_team', 'game_date', 'game_id',
+                   f'{side}_wins_season', f'{side}_losses_season', f'{side}_win_streak']]
+        part.columns = ['season', 'team', 'game_date', 'game_id', 'wins', 'losses', 'streak']
+        sides.append(part[part['wins'].notna()])
+    state = pd.concat(sides, ignore_index=True)
+    state = state.sort_values(['season', 'team', 'game_date', 'game_id'], kind='stable')
+    return state.drop_duplicates(['season', 'team'], keep='last').set_index(['season', 'team'])[
+        ['wins', 'losses', 'streak', 'game_date', 'game_id']]
+
+
+def prepare_games(df):
+    """Typed and sorted by date, first pitch and game_id — the order every feature is computed in."""
     # Ensure correct data types and sorting for calculations
     df['game_date'] = pd.to_datetime(df['game_date'])
     df['start_time_et'] = pd.to_datetime(df['start_time_et'])
     df['game_id'] = pd.to_numeric(df['game_id'], errors='coerce').astype('Int64') # Use nullable integer
     df = df.sort_values(by=['game_date', 'start_time_et', 'game_id']).reset_index(drop=True)
     print("Data sorted by date and game ID.")
+    return df
+
 
+def add_run_differential(df):
     # --- 1. Calculate Run Differential ---
     print("Calculating Run Differential...")
     # Run differential from the home team's perspective
@@ -34,7 +123,10 @@ try:
     # Run differential from the away team's perspective
     df['away_run_differential'] = df['away_score'] - df['home_score']
     print("Run Differential calculated.")
+    return df
 
+
+def add_bet_results(df):
     # --- 2. Calculate Betting Results ---
     print("Calculating Betting Results (Moneyline and Over/Under)...")
 
@@ -89,95 +181,16 @@ try:
     else:
         print("No finished games with total line data to process.")
     print("Betting Results calculated.")
+    return df
+
 
+def add_team_records(df, seed=None):
+    """Merge cumulative season records onto the home and away side of each game (seed: see calculate_team_records)."""
     # --- 3. Calculate Win/Loss Records and Win Streaks for Each Team for Each Season ---
     print("Calculating Win/Loss Records and Win Streaks...")
+    calculated_records = calculate_team_records(df, seed)
 
-    # Create a temporary DataFrame where each game appears twice (once for home, once for away)
-    # This simplifies per-team calculations
-    team_games = []
-
-    for _, row in df.iterrows():
-        # Home team perspective
-        team_games.append({
-            'game_id': row['game_id'],
-            'game_date': row['game_date'],
-            'season': row['season'],
-            'team': row['home_team'],
-            'opponent': row['away_team'],
-            'team_score': row['home_score'],
-            'opponent_score': row['away_score'],
-            'is_winner': (row['winner'] == row['home_team']) if pd.notna(row['winner']) else None,
-            'is_home': True,
-            'status': row['status']
-        })
-        # Away team perspective
-        team_games.append({
-            'game_id': row['game_id'],
-            'game_date': row['game_date'],
-            'season': row['season'],
-            'team': row['away_team'],
-            'opponent': row['home_team'],
-            'team_score': row['away_score'],
-            'opponent_score': row['home_score'],
-            'is_winner': (row['winner'] == row['away_team']) if pd.notna(row['winner']) else None,
-            'is_home': False,
-            'status': row['status']
-        })
-
-    df_team_games = pd.DataFrame(team_games)
-    # Filter for games that are finished and have a winner defined
-    df_team_games_finished = df_team_games[
-        (df_team_games['status'] == 'Finished') &
-        df_team_games['is_winner'].notna()
-    ].copy()
-
-    # Sort again for cumulative calculations
-    df_team_games_finished = df_team_games_finished.sort_values(
-        by=['season', 'team', 'game_date', 'game_id']
-    ).reset_index(drop=True)
-
-    # Initialize columns
-    df_team_games_finished['wins'] = 0
-    df_team_games_finished['losses'] = 0
-    df_team_games_finished['win_streak'] = 0 # Positive for win streak, negative for loss streak
-
-    # Group by season and team to calculate cumulative records and streaks
-    def calculate_records_and_streaks(group):
-        wins_count = 0
-        losses_count = 0
-        current_streak = 0
-        results = []
-
-        for _, row in group.iterrows():
-            if row['is_winner']: # Team won
-                wins_count += 1
-                if current_streak >= 0:
-                    current_streak += 1
-                else: # Was on a loss streak, now won
-                    current_streak = 1
-            else: # Team lost
-                losses_count += 1
-                if current_streak <= 0:
-                    current_streak -= 1
-                else: # Was on a win streak, now lost
-                    current_streak = -1
-
-            results.append({
-                'game_id': row['game_id'],
-                'team': row['team'],
-                'wins_season_cumulative': wins_count,
-                'losses_season_cumulative': losses_count,
-                'win_streak_team_cumulative': current_streak
-            })
-        return pd.DataFrame(results)
-
-    # Apply the function to each team within each season
-    if not df_team_games_finished.empty:
-        print("Applying cumulative win/loss/streak calculations...")
-        # Use .copy() to avoid SettingWithCopyWarning
-        calculated_records = df_team_games_finished.groupby(['season', 'team'], group_keys=False).apply(calculate_records_and_streaks).copy()
-
+    if not calculated_records.empty:
         # Merge these cumulative stats back to the main df.
         # This will require merging twice (once for home team, once for away team)
         # to ensure home_team_wins, away_team_wins etc are correct per game row.
@@ -208,12 +221,135 @@ try:
         print("Win/Loss Records and Win Streaks calculated and merged.")
     else:
         print("No finished games to calculate win/loss records and streaks for.")
-
-    # --- Save the Enhanced Master File ---
-    print(f"\nSaving enhanced master file to: {MASTER_FILE}")
-    df.to_parquet(MASTER_FILE, index=False)
-    print(f"✅ Enhanced master file saved. New total rows: {len(df)}")
-    print("\n--- Feature Engineering Script Complete ---")
-
-except Exception as e:
-    print(f"❌ An error occurred during feature engineering: {e}")
+    return df
+
+
+def engineer_features(df):
+    """Run differential, bet results and cumulative team records for a wide (one row per game) master."""
+    # Full rebuild: recompute every feature from scratch
+    df = df.drop(columns=FEATURE_COLUMNS, errors='ignore')
+    df = prepare_games(df)
+    df = add_run_differential(df)
+    df = add_bet_results(df)
+    return add_team_records(df)
+
+
+def _record_dtypes(df):
+    """Record columns as a full rebuild leaves them: int64 when complete, float64 when any are missing."""
+    for col in RECORD_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('int64' if df[col].notna().all() else 'float64')
+    return df
+
+
+def engineer_features_incremental(df):
+    """
+    Compute features only for rows still missing them, with cumulative records
+    seeded from each team's last known state. Falls back to a full rebuild when
+    features were never computed or a pending game predates a team's last
+    recorded one. Returns (df, pending row mask or None after a full rebuild).
+    """
+    if any(col not in df.columns for col in FEATURE_COLUMNS):
+        print("No stored features — running full rebuild.")
+        return engineer_features(df), None
+
+    df = prepare_games(df)
+    has_winner = (df['status'] == 'Finished') & df['winner'].notna()
+    needs_records = has_winner & (df['home_wins_season'].isna() | df['away_wins_season'].isna())
+    # Rows without scores (postponed, not yet played) have nothing to compute
+    has_scores = df['home_score'].notna() & df['away_score'].notna()
+    pending = (has_scores & df['home_run_differential'].isna()) | needs_records
+    if not pending.any():
+        print("✅ All rows already have features — nothing to do.")
+        return df, pending
+
+    done, todo = df[~pending], df[pending].drop(columns=FEATURE_COLUMNS)
+    seed = team_state(done)
+
+    # Records only chain correctly if every new game comes after the team's last recorded one
+    finished = todo[has_winner[pending]]
+    for side in ('home', 'away'):
+        last = seed.reindex(pd.MultiIndex.from_arrays([finished['season'], finished[f'{side}_team']]))
+        game_key = list(zip(finished['game_date'], finished['game_id']))
+        seed_key = list(zip(last['game_date'], last['game_id']))
+        if any(pd.notna(s_date) and (g_date, g_id) < (s_date, s_id)
+               for (g_date, g_id), (s_date, s_id) in zip(game_key, seed_key)):
+            print("⚠️ A pending game predates recorded history — running full rebuild.")
+            return engineer_features(df), None
+
+    print(f"Incremental: computing features for {pending.sum()} of {len(df)} rows "
+          f"(seeded from {len(seed)} team-seasons)")
+    todo = add_run_differential(todo)
+    todo = add_bet_results(todo)
+    todo = add_team_records(todo.reset_index(), seed[['wins', 'losses', 'streak']]).set_index('index')
+    todo.index.name = None
+
+    df = pd.concat([done, todo.reindex(columns=df.columns)]).sort_index()
+    return _record_dtypes(df), pending
+
+
+def features_equal(incremental, full):
+    """Incremental and full outputs hold the same values (missing markers aside)."""
+    def normalized(df):
+        # An all-missing column reads back as NaN from one path and None from the other
+        df = df.reset_index(drop=True).astype(object)
+        return df.where(df.notna(), None)
+
+    try:
+        pd.testing.assert_frame_equal(normalized(incremental), normalized(full), check_dtype=False)
+        return True
+    except AssertionError as e:
+        print(f"❌ Incremental and full results differ:\n{e}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature engineering for the master dataset")
+    parser.add_argument("--full", action="store_true", help="Recompute features for every row")
+    parser.add_argument("--verify", action="store_true",
+                        help="Run incremental and full, compare, and don't save")
+    args = parser.parse_args()
+
+    print("\n--- Starting Feature Engineering Script ---")
+
+    if not master_exists():
+        print(f"❌ Error: Master dataset not found at {MASTER_DIR}. Cannot perform feature engineering.")
+        return # Exit if master file doesn't exist
+
+    try:
+        df = load_master()
+        print(f"✅ Master file loaded successfully. Rows: {len(df)}")
+
+        if args.verify:
+            incremental, _ = engineer_features_incremental(df.copy())
+            full = engineer_features(df)
+            if features_equal(incremental, full):
+                print("✅ Incremental result matches full rebuild.")
+            return
+
+        if args.full:
+            df, pending = engineer_features(df), None
+        else:
+            df, pending = engineer_features_incremental(df)
+            if pending is not None and not pending.any():
+                return
+
+        # --- Save the Enhanced Master File ---
+        if pending is None:
+            print(f"\nSaving enhanced master dataset to: {MASTER_DIR}")
+            write_master(df)
+        else:
+            # Only the season/month partitions holding new rows are rewritten
+            keys = partition_keys(df)
+            touched = pd.MultiIndex.from_frame(keys[pending.to_numpy()]).unique()
+            partitions = replace_partitions(df[pd.MultiIndex.from_frame(keys).isin(touched)])
+            print(f"\nSaved {len(partitions)} partition(s): {', '.join(partitions)}")
+        print(f"✅ Enhanced master file saved. New total rows: {len(df)}")
+        print("\n--- Feature Engineering Script Complete ---")
+
+    except Exception as e:
+        print(f"❌ An error occurred during feature engineering: {e}")
+
+
+if __name__ == "__main__":
+    main()
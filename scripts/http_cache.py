@@ -0,0 +1,131 @@
+# scripts/http_cache.py
+# Persistent on-disk cache for API-Sports responses, used by api_client.api_get.
+# Keyed by endpoint + normalized params (never the API key). Finished games and
+# closed odds never expire; schedules and live odds get short TTLs. Size-bounded
+# with least-recently-used eviction. Overlapping runs share the file through
+# SQLite's own locking (writers wait up to 30s for each other).
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+# === Config ===
+CACHE_PATH = os.environ.get("API_CACHE_PATH", "data/cache/http_cache.sqlite")
+CACHE_MAX_BYTES = int(os.environ.get("API_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+# TTLs in seconds. None = never expires, 0 = never cached.
+SCHEDULE_TTL = 20 * 60
+LIVE_ODDS_TTL = 5 * 60
+FINAL_STATUSES = {"Finished", "Cancelled"}
+
+
+def cache_key(endpoint, params):
+    """Normalized key: endpoint plus params sorted by name, values as strings."""
+    query = "&".join(f"{k}={params[k]}" for k in sorted(params or {}))
+    return f"{endpoint.strip('/')}?{query}"
+
+
+def _started(iso_date, now):
+    try:
+        return datetime.fromisoformat(iso_date.replace("Z", "+00:00")) <= now
+    except (AttributeError, ValueError):
+        return False
+
+
+def ttl_for(endpoint, payload):
+    """Per-endpoint TTL, decided from the response itself."""
+    if payload.get("errors"):
+        return 0
+    entries = payload.get("response")
+    endpoint = endpoint.strip("/")
+
+    if endpoint == "games":
+        if entries and all((g.get("status") or {}).get("long") in FINAL_STATUSES for g in entries):
+            return None
+        return SCHEDULE_TTL
+
+    if endpoint == "odds":
+        # Odds are closed once every game in the response has started
+        now = datetime.now(timezone.utc)
+        if entries and all(_started((e.get("game") or {}).get("date"), now) for e in entries):
+            return None
+        return LIVE_ODDS_TTL
+
+    return 0
+
+
+class ResponseCache:
+    """SQLite-backed response store. Safe to share across fetch threads."""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key, allow_stale=False):
+        """Cached payload for key, or None. allow_stale ignores expiry (offline mode)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (not allow_stale and row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, payload, ttl):
+        if ttl == 0:
+            return
+        body = json.dumps(payload, separators=(",", ":"))
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, stored_at, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, body, len(body), now, expires_at, now),
+            )
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self.stores += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache is back under 90% of its cap."""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return (f"🗄️  HTTP cache: {self.hits} hits / {self.misses} misses ({hit_rate:.0%}) | "
+                f"{self.stores} stored, {self.evictions} evicted | "
+                f"{self._total_bytes / 1024 / 1024:.1f} MB on disk")
@@ -0,0 +1,175 @@
+# scripts/key_index.py
+# Key index of the master dataset: one entry per master row with its
+# game_id, merge_key ("{game_id}_{team_abbr}"), season and game date, kept
+# sorted so "is this game / row already in the master?" is a binary search
+# per new row instead of a scan of every game_id. update_master_data reads
+# the latest date and existing games from here and updates it right after
+# writing rows.
+#
+#   data/master/key_index.npz   (rebuilt whenever the master's row count changes)
+#
+#   python scripts/key_index.py rebuild
+#   python scripts/key_index.py 776012 [776013 ...]   # which of these games are in the master
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from master_store import count_rows, load_master
+from storage import atomic_path
+
+KEY_INDEX_FILE = "data/master/key_index.npz"
+INDEX_COLUMNS = ['game_id', 'team_abbr', 'season', 'game_date_et']
+
+
+def merge_keys(game_ids, team_abbrs):
+    """merge_key of each (game_id, team_abbr) — the same string update_master_data writes."""
+    return np.char.add(np.char.add(np.asarray(game_ids, dtype=np.int64).astype(str), "_"),
+                       np.asarray(team_abbrs).astype(str))
+
+
+def _as_game_ids(values):
+    """game_ids as int64 (-1 where missing or not a number)."""
+    return pd.to_numeric(pd.Series(values), errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _contains(sorted_values, values):
+    i = np.searchsorted(sorted_values, values)
+    return sorted_values[np.minimum(i, len(sorted_values) - 1)] == values if len(sorted_values) else \
+        np.zeros(len(values), dtype=bool)
+
+
+class KeyIndex:
+    """Master rows' keys sorted by (game_id, team_abbr); see has_games(), has_keys(), rows_for()."""
+
+    def __init__(self, game_ids, teams, seasons, game_dates, keys, key_order, master_rows):
+        self.game_ids = game_ids
+        self.teams = teams
+        self.seasons = seasons
+        self.game_dates = game_dates
+        self.keys = keys
+        self.key_order = key_order
+        self.master_rows = int(master_rows)
+
+    @classmethod
+    def from_rows(cls, rows, master_rows):
+        rows = rows[rows['game_id'].notna() & rows['team_abbr'].notna()]
+        game_ids = rows['game_id'].to_numpy(dtype=np.int64)
+        teams = rows['team_abbr'].to_numpy(dtype=str)  # numpy sizes the field to the longest code
+        order = np.lexsort((teams, game_ids))
+        game_ids, teams = game_ids[order], teams[order]
+        keys = merge_keys(game_ids, teams)
+        return cls(
+            game_ids=game_ids,
+            teams=teams,
+            seasons=rows['season'].to_numpy(dtype=np.int16)[order],
+            game_dates=pd.to_datetime(rows['game_date_et']).to_numpy(dtype='datetime64[D]')[order],
+            keys=keys,
+            key_order=np.argsort(keys, kind='stable'),
+            master_rows=master_rows,
+        )
+
+    @classmethod
+    def build(cls, master_df):
+        """Index of every master row with a game_id and team."""
+        return cls.from_rows(master_df[INDEX_COLUMNS], len(master_df))
+
+    def latest_date(self):
+        return pd.Timestamp(self.game_dates.max()) if len(self.game_dates) else None
+
+    def has_games(self, game_ids):
+        """Boolean array: which of game_ids already have rows in the master."""
+        return _contains(self.game_ids, _as_game_ids(game_ids))
+
+    def has_keys(self, keys):
+        """Boolean array: which merge_keys already exist in the master."""
+        return _contains(self.keys[self.key_order], np.asarray(keys).astype(str))
+
+    def rows_for(self, game_ids):
+        """(game_id, team_abbr, season, game_date_et) of the master rows for game_ids."""
+        wanted = np.unique(_as_game_ids(game_ids))
+        lo = np.searchsorted(self.game_ids, wanted, side='left')
+        hi = np.searchsorted(self.game_ids, wanted, side='right')
+        i = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)]).astype(np.int64) if len(wanted) else \
+            np.array([], dtype=np.int64)
+        return pd.DataFrame({'game_id': self.game_ids[i], 'team_abbr': self.teams[i],
+                             'season': self.seasons[i].astype(np.int64),
+                             'game_date_et': pd.to_datetime(self.game_dates[i]).astype('datetime64[ns]')})
+
+    def update(self, rows, master_rows):
+        """
+        Index rows just written to the master (master_rows = new total): entries
+        for their game_ids are replaced, so the same call covers appends and upserts.
+        """
+        rows = rows[INDEX_COLUMNS].assign(game_id=_as_game_ids(rows['game_id']))
+        kept = ~np.isin(self.game_ids, rows['game_id'].to_numpy())
+        current = pd.DataFrame({'game_id': self.game_ids[kept], 'team_abbr': self.teams[kept],
+                                'season': self.seasons[kept], 'game_date_et': self.game_dates[kept]})
+        updated = KeyIndex.from_rows(pd.concat([current, rows], ignore_index=True), master_rows)
+        self.__dict__.update(updated.__dict__)
+        return self
+
+    def save(self, path=KEY_INDEX_FILE):
+        """Write via a temp file + rename so readers never see a half-written index."""
+        with atomic_path(path) as tmp, open(tmp, "wb") as f:
+            np.savez_compressed(f, game_ids=self.game_ids, teams=self.teams, seasons=self.seasons,
+                                game_dates=self.game_dates, keys=self.keys, key_order=self.key_order,
+                                master_rows=self.master_rows)
+
+    @classmethod
+    def load(cls, path=KEY_INDEX_FILE):
+        with np.load(path) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+
+def load_key_index(path=KEY_INDEX_FILE, master_rows=None):
+    """The saved index, rebuilt from the master first if missing or stale."""
+    master_rows = count_rows() if master_rows is None else master_rows
+    if os.path.exists(path):
+        try:
+            index = KeyIndex.load(path)
+            if index.master_rows == master_rows:
+                return index
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not read key index {path}: {e}")
+    print("🔁 Key index missing or stale — rebuilding from master")
+    return rebuild(path)
+
+
+def record_written_rows(rows, master_rows, previous_rows, path=KEY_INDEX_FILE):
+    """
+    Call right after writing rows to the master (appended, or replacing the
+    rows of their games). previous_rows = the master's row count before the
+    write. An index that wasn't current before is left for the next run to rebuild.
+    """
+    try:
+        index = KeyIndex.load(path) if os.path.exists(path) else None
+    except (OSError, ValueError, KeyError):
+        index = None
+    if index is None or index.master_rows != previous_rows:
+        print("⚠️ Key index not current — it will be rebuilt on the next run")
+        return
+    index.update(rows, master_rows).save(path)
+    print(f"🔑 Key index updated: {len(index.keys):,} keys")
+
+
+def rebuild(path=KEY_INDEX_FILE):
+    index = KeyIndex.build(load_master(columns=INDEX_COLUMNS))
+    index.save(path)
+    print(f"💾 Rebuilt {path}: {len(index.keys):,} keys, {len(np.unique(index.game_ids)):,} games")
+    return index
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "rebuild":
+        rebuild()
+    elif len(sys.argv) >= 2:
+        index = load_key_index()
+        for game_id, found in zip(sys.argv[1:], index.has_games(sys.argv[1:])):
+            rows = index.rows_for([game_id]) if found else None
+            print(f"🔑 {game_id}: " + (", ".join(f"{r.team_abbr} ({r.game_date_et:%Y-%m-%d})" for r in rows.itertuples())
+                                      if found else "not in master"))
+    else:
+        print("Usage: python scripts/key_index.py rebuild | <GAME_ID> [GAME_ID ...]")
@@ -4,10 +4,14 @@
 
 import os
 import json
-import requests
 from datetime import datetime, timedelta
 import pytz
 
+from api_client import request
+from signal_store import SIGNALS_DATASET, replace_day
+from storage import locked, write_json
+from update_signal_results import mark_pending
+
 eastern = pytz.timezone("US/Eastern")
 now_et = datetime.now(eastern)
 
@@ -34,7 +38,7 @@ if os.path.exists(output_path) and os.environ.get("FORCE_LOCK") != "1":
 BACKEND_URL = os.environ.get("BACKEND_URL", "https://strikes-and-downs.onrender.com")
 
 print(f"Fetching signals from {BACKEND_URL}/api/signals/{target_date}")
-resp = requests.get(f"{BACKEND_URL}/api/signals/{target_date}", timeout=120)
+resp = request("GET", f"{BACKEND_URL}/api/signals/{target_date}", timeout=120)
 resp.raise_for_status()
 data = resp.json()
 
@@ -55,8 +59,13 @@ output = {
     } for g in t1_signals],
 }
 
-with open(output_path, "w") as f:
-    json.dump(output, f, indent=2)
+# CHANGED: the JSON and the store change together, atomically, under the signals lock
+with locked(SIGNALS_DATASET):
+    write_json(output, output_path, dataset=SIGNALS_DATASET, indent=2)
+    # CHANGED: the signal store holds every lock; the JSON above is its per-day export
+    replace_day(output)
+    # CHANGED: a (re)locked day needs its results backfilled again
+    mark_pending(os.path.basename(output_path))
 
 for s in output["signals"]:
     print(f"  T1: {s['away_team']} @ {s['home_team']} | signal={s['signal_team']} | score={s['consensus_score']}")
@@ -71,11 +80,11 @@ if SAD_TOKEN:
     sad_headers = {"Authorization": "token " + SAD_TOKEN, "Accept": "application/vnd.github.v3+json"}
     file_content = b64.b64encode(json.dumps(output, indent=2).encode()).decode()
     # Check if file exists
-    check = requests.get(sad_url, headers=sad_headers)
+    check = request("GET", sad_url, headers=sad_headers)
     payload = {"message": f"Lock signals {target_date}", "content": file_content}
     if check.status_code == 200:
         payload["sha"] = check.json()["sha"]
-    push = requests.put(sad_url, headers=sad_headers, json=payload)
+    push = request("PUT", sad_url, headers=sad_headers, json=payload)
     if push.status_code in (200, 201):
         print(f"Pushed signals to strikes-and-downs repo")
     else:
@@ -0,0 +1,439 @@
+# scripts/master_store.py
+# Storage for the master dataset. The master lives as a hive-partitioned
+# parquet dataset
+#   data/master/master_dataset/season=YYYY/month=MM/*.parquet
+# so the daily update only writes one small fragment for the new rows instead
+# of rewriting every season. Every script reads and writes the master through
+# this module; `compact` merges fragments once they pile up. Writes hold the
+# "master" dataset lock (storage.py) and readers a shared one, so a reader
+# never sees a partition half-replaced.
+#
+#   python scripts/master_store.py migrate     # master_template.parquet -> dataset
+#   python scripts/master_store.py compact     # merge fragments per partition
+#   python scripts/master_store.py info
+
+import functools
+import operator
+import os
+import shutil
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from storage import atomic_path, locked
+
+MASTER_DIR = "data/master/master_dataset"
+LEGACY_MASTER_FILE = "data/master/master_template.parquet"
+# Lock name for the dataset (storage.locked)
+MASTER_DATASET = "master"
+
+# Row order of the old monolithic file — load_master() returns rows in this order
+MASTER_SORT = ["season", "team_abbr", "game_date_et"]
+
+PARTITIONING = ds.partitioning(pa.schema([("season", pa.int64()), ("month", pa.int8())]), flavor="hive")
+
+# === Compact schema ===
+# Enforced on every write and restored on read. season stays int64 to match
+# the partition key. Columns not listed pass through unchanged.
+INNING_COLUMNS = [f'{side}_{inning}' for inning in range(1, 10) for side in ('home', 'away')]
+ODDS_COLUMNS = ['h2h_own_odds', 'h2h_opp_odds', 'Total', 'Over_Price_odds', 'Under_Price_odds',
+                'Run_Line_odds', 'Spread_Price_odds', 'Opp_Spread_Price_odds']
+MASTER_DTYPES = {
+    'Wins': 'int16', 'Losses': 'int16',
+    'team_streak': 'int8', 'Win_Streak': 'int8', 'Loss_Streak': 'int8',
+    'home_score': 'Int8', 'away_score': 'Int8', 'is_home_odds': 'Int8',
+    **{col: 'Int8' for col in INNING_COLUMNS},
+    **{col: 'float32' for col in ODDS_COLUMNS},
+}
+# Held as pandas categoricals in memory (parquet dictionary-encodes them on disk)
+CATEGORY_COLUMNS = ['team', 'team_abbr', 'opponent', 'opponent_abbr', 'team_abbr_odds', 'opponent_abbr_odds']
+# Legacy columns that are null in every row
+DROPPED_COLUMNS = ['commence_time']
+
+
+def apply_schema(df):
+    """df with master columns coerced to the compact schema ('' and other junk in numeric columns -> NA)."""
+    df = df.drop(columns=DROPPED_COLUMNS, errors="ignore")
+    for col, dtype in MASTER_DTYPES.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        if dtype[0] == "i" and values.isna().any():
+            dtype = dtype.capitalize()  # keep missing values rather than fail
+        df[col] = values.astype(dtype)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Categories in sorted order so sorting by the column stays alphabetical
+                df[col] = values.cat.reorder_categories(sorted(values.cat.categories))
+            else:
+                df[col] = values.astype("category")
+    return df
+
+
+def _needs_migration(schema):
+    """True when stored fragments predate the compact schema."""
+    expected = {"int16": pa.int16(), "int8": pa.int8(), "Int8": pa.int8(), "float32": pa.float32()}
+    return (any(col in schema.names for col in DROPPED_COLUMNS) or
+            any(col in schema.names and schema.field(col).type != expected[dtype]
+                for col, dtype in MASTER_DTYPES.items()))
+
+
+def master_exists(master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    return os.path.isdir(master_dir) or os.path.exists(legacy_file)
+
+
+def _fragment_name():
+    # Timestamped names keep fragments in append order when listed
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+
+
+def _partition_months(df):
+    date_col = "game_date_et" if "game_date_et" in df.columns else "game_date"
+    return pd.to_datetime(df[date_col], errors="coerce").dt.month.fillna(0).astype(int)
+
+
+def partition_keys(df):
+    """(season, month) partition of each row, as a DataFrame aligned with df."""
+    return pd.DataFrame({"season": df["season"].astype(int), "month": _partition_months(df)}, index=df.index)
+
+
+def _fragments(master_dir):
+    for root, _, files in os.walk(master_dir):
+        for f in files:
+            if f.endswith(".parquet"):
+                yield os.path.join(root, f)
+
+
+def _dataset_schema(master_dir):
+    """
+    Schema of the stored rows — every fragment's schema unified (all-null columns
+    and int/float differences widen), or None for an empty store.
+    """
+    schemas = [pq.read_schema(path).remove_metadata() for path in sorted(_fragments(master_dir))]
+    return pa.unify_schemas(schemas, promote_options="permissive") if schemas else None
+
+
+def _to_table(df, schema=None):
+    """DataFrame -> arrow Table; with a schema, coerce columns so every fragment matches it."""
+    if schema is None:
+        categories = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+        df = df.astype({col: df[col].cat.categories.dtype for col in categories})
+        return pa.Table.from_pandas(df, preserve_index=False)
+    df = df.reindex(columns=schema.names)
+    fields = []
+    for field in schema:
+        col = df[field.name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            df[field.name] = col = col.astype(col.cat.categories.dtype)
+        if pa.types.is_null(field.type):
+            # Never had a value so far — take whatever type the new rows bring
+            field = pa.field(field.name, pa.array(col, from_pandas=True).type)
+        elif pa.types.is_floating(field.type) or pa.types.is_integer(field.type):
+            if not pd.api.types.is_numeric_dtype(col) or pd.api.types.is_bool_dtype(col):
+                df[field.name] = col = pd.to_numeric(col.replace("", None), errors="coerce")
+            if pa.types.is_integer(field.type) and col.isna().any() and not pd.api.types.is_extension_array_dtype(col):
+                field = pa.field(field.name, pa.float64())
+        elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            df[field.name] = col.map(lambda v: None if v is None or v != v else str(v))
+        fields.append(field)
+    return pa.Table.from_pandas(df, schema=pa.schema(fields), preserve_index=False)
+
+
+def _write_partitions(df, master_dir, schema=None):
+    """Write df as one new fragment in each (season, month) partition it touches."""
+    df = apply_schema(df)
+    written = []
+    keys = partition_keys(df)
+    for (season, month), part in df.groupby([keys["season"], keys["month"]], sort=True):
+        partition = os.path.join(master_dir, f"season={season}", f"month={month:02d}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, _fragment_name())
+        with atomic_path(path) as tmp:
+            pq.write_table(_to_table(part, schema), tmp)
+        written.append(path)
+    return written
+
+
+def count_rows(master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """Row count of the master from parquet footers, without reading any data."""
+    with locked(MASTER_DATASET, shared=True):
+        if not os.path.isdir(master_dir):
+            return pq.read_metadata(legacy_file).num_rows if os.path.exists(legacy_file) else 0
+        return sum(pq.read_metadata(path).num_rows for path in _fragments(master_dir))
+
+
+def master_seasons(master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """Seasons present in the master (from partition names; no data read)."""
+    if not os.path.isdir(master_dir):
+        return sorted(pq.read_table(legacy_file, columns=["season"])["season"].unique().to_pylist())
+    return sorted(int(name.split("=", 1)[1]) for name in os.listdir(master_dir) if name.startswith("season="))
+
+
+def _filter_expression(schema, seasons=None, date_range=None, teams=None, partitioned=True):
+    """
+    (pyarrow filter, columns it reads) for load_master. On the partitioned
+    dataset season/month bounds prune whole partitions.
+    """
+    conditions, filter_columns = [], set()
+    if seasons is not None:
+        conditions.append(ds.field("season").isin([int(s) for s in np.atleast_1d(seasons)]))
+        filter_columns.add("season")
+    if date_range is not None:
+        date_col = "game_date_et" if "game_date_et" in schema.names else "game_date"
+        filter_columns.add(date_col)
+        start, end = (pd.Timestamp(d) if d is not None else None for d in date_range)
+        season, month = ds.field("season"), ds.field("month")
+        if start is not None:
+            conditions.append(ds.field(date_col) >= pa.scalar(start, type=schema.field(date_col).type))
+            if partitioned:
+                conditions.append((season > start.year) | ((season == start.year) & (month >= start.month)))
+        if end is not None:
+            conditions.append(ds.field(date_col) <= pa.scalar(end, type=schema.field(date_col).type))
+            if partitioned:
+                conditions.append((season < end.year) | ((season == end.year) & (month <= end.month)))
+    if teams is not None:
+        conditions.append(ds.field("team_abbr").isin(list(np.atleast_1d(teams))))
+        filter_columns.add("team_abbr")
+    return (functools.reduce(operator.and_, conditions) if conditions else None), filter_columns
+
+
+def _bytes_read(dataset, expr, columns):
+    """Compressed size of the column chunks a scan touches (after partition and row-group pruning)."""
+    total = 0
+    for fragment in dataset.get_fragments(filter=expr):
+        if expr is not None:
+            fragment = fragment.subset(expr, schema=dataset.schema)
+        metadata = fragment.metadata
+        for row_group in fragment.row_groups:
+            chunks = metadata.row_group(row_group.id)
+            total += sum(chunks.column(i).total_compressed_size for i in range(chunks.num_columns)
+                         if columns is None or chunks.column(i).path_in_schema in columns)
+    return total
+
+
+def _master_dataset(master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """(pyarrow dataset over the master, whether it is the partitioned layout)."""
+    if not os.path.isdir(master_dir):
+        return ds.dataset(legacy_file, format="parquet"), False
+    # Fragments are read in path order, so a stable sort keeps append order among ties
+    schema = _dataset_schema(master_dir)
+    if "month" not in schema.names:
+        schema = schema.append(pa.field("month", pa.int8()))
+    return ds.dataset(sorted(_fragments(master_dir)), format="parquet", schema=schema,
+                      partitioning=PARTITIONING, partition_base_dir=master_dir), True
+
+
+def master_schema(master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """Stored schema of the master (no data read)."""
+    schema = _master_dataset(master_dir, legacy_file)[0].schema
+    return schema.remove(schema.get_field_index("month")) if "month" in schema.names else schema
+
+
+def iter_master_seasons(columns=None, master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """
+    Yield (season, pyarrow Table) one season at a time, in the compact schema
+    (categories as plain strings) and no particular row order — for passes
+    that stream the master in arrow without holding all of it.
+    """
+    with locked(MASTER_DATASET, shared=True):
+        dataset, partitioned = _master_dataset(master_dir, legacy_file)
+        needs_compact = _needs_migration(dataset.schema)
+        for season in master_seasons(master_dir, legacy_file):
+            expr, _ = _filter_expression(dataset.schema, seasons=season, partitioned=partitioned)
+            table = dataset.to_table(columns=columns, filter=expr)
+            if "month" in table.column_names:
+                table = table.drop_columns(["month"])
+            if needs_compact:
+                # Not migrated yet — coerce the way load_master does
+                table = _to_table(apply_schema(table.to_pandas()))
+            yield season, table
+
+
+def load_master(columns=None, seasons=None, date_range=None, teams=None,
+                master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """
+    Read the master as one DataFrame, in MASTER_SORT order, reading only what
+    the filters need:
+      columns     columns to return (default all)
+      seasons     season or list of seasons
+      date_range  (start, end) game dates, inclusive; either end may be None
+      teams       team_abbr or list of them
+    Falls back to the legacy single-file master until it has been migrated.
+    Logs the caller, bytes read and load time.
+    """
+    started = time.perf_counter()
+    with locked(MASTER_DATASET, shared=True):
+        dataset, partitioned = _master_dataset(master_dir, legacy_file)
+        expr, filter_columns = _filter_expression(dataset.schema, seasons, date_range, teams, partitioned)
+
+        wanted = None
+        if columns is not None:
+            # Sort keys are needed to restore row order; dropped again below
+            wanted = list(dict.fromkeys(list(columns) + [c for c in MASTER_SORT if c in dataset.schema.names]))
+        table = dataset.to_table(columns=wanted, filter=expr)
+    df = apply_schema(table.to_pandas())
+    df = df.drop(columns=["month"], errors="ignore")
+    sort_cols = [c for c in MASTER_SORT if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+
+    # Bytes include the filter columns, which are read to evaluate the predicate
+    read_columns = None if wanted is None else set(wanted) | filter_columns
+    caller = sys._getframe(1)
+    print(f"📥 load_master ← {os.path.splitext(os.path.basename(caller.f_code.co_filename))[0]}.{caller.f_code.co_name}: "
+          f"{len(df):,} rows × {df.shape[1]} cols, {_bytes_read(dataset, expr, read_columns) / 1e6:.2f} MB read "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return df
+
+
+def append_master(new_df, master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """Add rows to the master, writing only new fragments. Returns the fragment paths."""
+    with locked(MASTER_DATASET):
+        if not os.path.isdir(master_dir) and os.path.exists(legacy_file):
+            migrate(master_dir, legacy_file)
+        return _write_partitions(new_df, master_dir, _dataset_schema(master_dir))
+
+
+def write_master(df, master_dir=MASTER_DIR):
+    """
+    Replace the whole master (feature engineering / cleanup passes that
+    rewrite every row). Written beside the live dataset and swapped in.
+    """
+    tmp_dir = f"{master_dir}.tmp-{uuid.uuid4().hex[:8]}"
+    # One schema for every partition, inferred from the whole (compacted) frame
+    df = apply_schema(df)
+    with locked(MASTER_DATASET):
+        try:
+            _write_partitions(df, tmp_dir, _to_table(df).schema.remove_metadata())
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        _swap_in(tmp_dir, master_dir)
+
+
+def write_master_stream(frames, master_dir=MASTER_DIR):
+    """
+    Replace the whole master from an iterable of DataFrames (e.g. one season
+    at a time), so only one piece is in memory at once. Each piece is coerced
+    to the schema written so far. Returns the number of rows written.
+    """
+    tmp_dir = f"{master_dir}.tmp-{uuid.uuid4().hex[:8]}"
+    rows, schema = 0, None
+    with locked(MASTER_DATASET):
+        try:
+            for df in frames:
+                if len(df):
+                    written = _write_partitions(df, tmp_dir, schema)
+                    schemas = ([schema] if schema else []) + [pq.read_schema(p).remove_metadata() for p in written]
+                    schema = pa.unify_schemas(schemas, promote_options="permissive")
+                    rows += len(df)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        if rows:
+            _swap_in(tmp_dir, master_dir)
+    return rows
+
+
+def _swap_in(tmp_dir, master_dir):
+    """Move a freshly written dataset into place, then drop the old one."""
+    old_dir = f"{master_dir}.old-{uuid.uuid4().hex[:8]}"
+    if os.path.isdir(master_dir):
+        os.rename(master_dir, old_dir)
+    os.rename(tmp_dir, master_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def replace_partitions(df, master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """
+    Rewrite only the (season, month) partitions df has rows for — df must hold
+    every row of those partitions. Returns the partitions rewritten.
+    """
+    df = apply_schema(df)
+    rewritten = []
+    keys = partition_keys(df)
+    with locked(MASTER_DATASET):
+        if not os.path.isdir(master_dir) and os.path.exists(legacy_file):
+            migrate(master_dir, legacy_file)
+        schema = _dataset_schema(master_dir)
+        for (season, month), part in df.groupby([keys["season"], keys["month"]], sort=True):
+            partition = os.path.join(master_dir, f"season={season}", f"month={month:02d}")
+            os.makedirs(partition, exist_ok=True)
+            old = sorted(f for f in os.listdir(partition) if f.endswith(".parquet"))
+            # The new file takes the first old file's name in one rename, then the rest go
+            with atomic_path(os.path.join(partition, old[0] if old else _fragment_name())) as tmp:
+                pq.write_table(_to_table(part, schema), tmp)
+            for f in old[1:]:
+                os.remove(os.path.join(partition, f))
+            rewritten.append(os.path.relpath(partition, master_dir))
+    return rewritten
+
+
+def migrate(master_dir=MASTER_DIR, legacy_file=LEGACY_MASTER_FILE):
+    """
+    One-time conversion of master_template.parquet into the partitioned dataset,
+    or of a dataset written before the compact schema.
+    """
+    with locked(MASTER_DATASET):
+        if os.path.isdir(master_dir):
+            if not _needs_migration(_dataset_schema(master_dir)):
+                print(f"✅ {master_dir} already uses the compact schema — nothing to migrate")
+                return
+            df = load_master(master_dir=master_dir)
+            write_master(df, master_dir)
+            print(f"📦 Rewrote {len(df):,} rows of {master_dir} with the compact schema")
+            return
+        df = pd.read_parquet(legacy_file)
+        write_master(df, master_dir)
+        os.remove(legacy_file)
+    print(f"📦 Migrated {len(df):,} rows from {legacy_file} to {master_dir}")
+
+
+def compact(master_dir=MASTER_DIR):
+    """Merge each partition's fragments into one file (rows and order unchanged)."""
+    if not os.path.isdir(master_dir):
+        return
+    with locked(MASTER_DATASET):
+        schema = _dataset_schema(master_dir)
+        for root, _, files in sorted(os.walk(master_dir)):
+            fragments = sorted(f for f in files if f.endswith(".parquet"))
+            if len(fragments) < 2:
+                continue
+            merged = pa.concat_tables([pq.read_table(os.path.join(root, f)).cast(schema) for f in fragments])
+            # Keep the earliest fragment's name so the merged file still lists first
+            with atomic_path(os.path.join(root, fragments[0])) as tmp:
+                pq.write_table(merged, tmp)
+            for f in fragments[1:]:
+                os.remove(os.path.join(root, f))
+            print(f"🗜️  {os.path.relpath(root, master_dir)}: {len(fragments)} fragments → 1 ({merged.num_rows} rows)")
+
+
+def info(master_dir=MASTER_DIR):
+    if not os.path.isdir(master_dir):
+        print(f"📁 No dataset at {master_dir} (legacy file: {os.path.exists(LEGACY_MASTER_FILE)})")
+        return
+    paths = list(_fragments(master_dir))
+    partitions = {os.path.dirname(p) for p in paths}
+    size = sum(os.path.getsize(p) for p in paths)
+    print(f"📁 {master_dir}: {len(partitions)} partitions, {len(paths)} fragments, {size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    commands = {"migrate": migrate, "compact": compact, "info": info}
+    if len(sys.argv) == 2 and sys.argv[1] in commands:
+        commands[sys.argv[1]]()
+    else:
+        print("Usage: python scripts/master_store.py [migrate|compact|info]")
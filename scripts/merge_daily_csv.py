@@ -0,0 +1,70 @@
+# scripts/merge_daily_csv.py
+# git merge driver for the daily CSVs (see .gitattributes). Workflow runs
+# each start from their own checkout; when one pushes after another has
+# already updated the same day's file (the odds scheduler filling odds while
+# the daily pull fills scores), push_data.sh rebases onto the newer commit and
+# git calls this to merge the two versions cell by cell on game_id instead of
+# line by line. Cells compare as raw text, so untouched values are written
+# back exactly as they were.
+#
+#   git config merge.daily-csv.driver "python scripts/merge_daily_csv.py %O %A %B"
+#
+# Exits non-zero (left as a conflict) when a file can't be merged by key.
+
+import sys
+
+import pandas as pd
+
+KEY = "game_id"
+
+
+def read_csv_text(path, columns=None):
+    """Every cell as the string in the file ("" when empty). An empty file -> no rows."""
+    try:
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=columns if columns is not None else [KEY], dtype=str)
+
+
+def merge_changes(base, ours, theirs, key=KEY):
+    """
+    Three-way merge of keyed rows: the cells `ours` changed since `base` are
+    applied onto `theirs`; rows only `ours` added are appended. Everything
+    else keeps theirs. A cell both sides changed takes ours.
+    """
+    base, ours, theirs = (df.set_index(key) for df in (base, ours, theirs))
+    if not (base.index.is_unique and ours.index.is_unique and theirs.index.is_unique):
+        raise ValueError(f"Can't merge on non-unique {key}")
+    merged = theirs.copy()
+    shared = ours.index.intersection(theirs.index)
+    before = base.reindex(index=shared, columns=ours.columns)
+    for col in ours.columns:
+        mine = ours.loc[shared, col]
+        changed = mine != before[col]
+        if col not in merged.columns:
+            merged[col] = ""
+        merged[col] = merged[col].where(~changed.reindex(merged.index, fill_value=False),
+                                        mine.reindex(merged.index))
+    added = ours.loc[ours.index.difference(theirs.index).difference(base.index)]
+    return pd.concat([merged, added]).reset_index()
+
+
+def main(base_path, current_path, other_path):
+    """git's %O %A %B: the result replaces %A (during a rebase: the upstream file)."""
+    current = read_csv_text(current_path)
+    other = read_csv_text(other_path, current.columns)
+    base = read_csv_text(base_path, other.columns)
+    merged = merge_changes(base, other, current)
+    merged.to_csv(current_path, index=False)
+    print(f"🔀 Merged {len(merged)} rows of {current_path} on {KEY}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python scripts/merge_daily_csv.py BASE CURRENT OTHER")
+        sys.exit(2)
+    try:
+        main(*sys.argv[1:])
+    except Exception as e:
+        print(f"❌ Could not merge {sys.argv[2]}: {e}")
+        sys.exit(1)
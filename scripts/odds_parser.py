@@ -0,0 +1,86 @@
+# scripts/odds_parser.py
+# Shared odds parsing for daily_pull_and_enrich.py and refresh_odds.py.
+# parse_bets picks one game's moneylines and consensus total line from a
+# bookmaker "bets" list; flatten_bets turns a slate's bets into the row table
+# the odds snapshot store keeps.
+
+import numpy as np
+import pandas as pd
+
+# === Consensus odds target — decimal equivalent of -110 ===
+TARGET_ODDS = 1.909
+
+ODDS_FIELDS = ["moneyline_home", "moneyline_away", "total_line", "over_odds", "under_odds"]
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def parse_bets(bets, target_odds=TARGET_ODDS):
+    """
+    One game's bets list -> {field: value} holding only the fields found.
+    Moneyline: last Home/Away value for each side, as the API's raw string.
+    Total: the line with both sides priced whose average distance from
+    target_odds is smallest; ties go to the line listed first.
+    """
+    game = {}
+    for bet in bets or []:
+        if bet["name"] == "Home/Away":
+            for val in bet.get("values", []):
+                opt = val["value"].lower()
+                if opt == "home":
+                    game["moneyline_home"] = val["odd"]
+                elif opt == "away":
+                    game["moneyline_away"] = val["odd"]
+
+        elif bet["name"] == "Over/Under":
+            totals_by_line = {}
+            for val in bet.get("values", []):
+                try:
+                    parts = val["value"].split(" ")
+                    side = parts[0].lower()
+                    line = float(parts[1])
+                except (IndexError, ValueError):
+                    continue
+                totals_by_line.setdefault(line, {})[side] = float(val["odd"])
+
+            best_line = None
+            best_distance = float("inf")
+            for line, sides in totals_by_line.items():
+                if "over" in sides and "under" in sides:
+                    avg_dist = (abs(sides["over"] - target_odds) + abs(sides["under"] - target_odds)) / 2
+                    if avg_dist < best_distance:
+                        best_distance = avg_dist
+                        best_line = line
+
+            if best_line is not None:
+                game["total_line"] = best_line
+                game["over_odds"] = totals_by_line[best_line]["over"]
+                game["under_odds"] = totals_by_line[best_line]["under"]
+    return game
+
+
+def parse_slate(bets_by_game, target_odds=TARGET_ODDS):
+    """{game_id: bets} -> {game_id: {field: value}} holding only the fields found for each game."""
+    return {game_id: parse_bets(bets, target_odds) for game_id, bets in bets_by_game.items()}
+
+
+def flatten_bets(bets_by_game):
+    """
+    {game_id: bets list} -> one row per bet value:
+    game_id, market ("Home/Away", "Over/Under", ...), side, line, odd.
+    'Over 8.5' -> side 'over', line 8.5; 'Home' -> side 'home', line NaN.
+    """
+    rows = []
+    for game_id, bets in bets_by_game.items():
+        for bet in bets or []:
+            for val in bet.get("values", []):
+                parts = str(val.get("value", "")).split(" ")
+                rows.append((game_id, bet.get("name"), parts[0].lower(),
+                             _to_float(parts[1]) if len(parts) > 1 else np.nan, _to_float(val.get("odd"))))
+    return pd.DataFrame(rows, columns=["game_id", "market", "side", "line", "odd"]).astype(
+        {"line": "float64", "odd": "float64"})
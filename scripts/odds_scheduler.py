@@ -0,0 +1,196 @@
+# scripts/odds_scheduler.py
+# Long-running, game-time-aware odds refresher. Replaces fixed-time refresh
+# runs: loads today's daily CSV once, keeps it warm in memory, and polls only
+# games still missing odds — more often as first pitch gets closer — until
+# every game is complete or has started. Changes are flushed to disk in
+# batches rather than after every poll.
+#
+#   python scripts/odds_scheduler.py                       # live
+#   python scripts/odds_scheduler.py --max-hours 5.5       # bounded (Actions job)
+#   python scripts/odds_scheduler.py --dry-run --start "2026-08-21 09:00" --offline
+
+import argparse
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+
+from api_client import QuotaExhausted, is_offline, print_api_summary, require_quota, set_offline
+from odds_parser import ODDS_FIELDS
+from refresh_odds import find_daily_file, missing_odds_mask, refresh_missing_odds
+from storage import write_csv
+
+eastern = pytz.timezone("US/Eastern")
+
+# === Poll cadence by time to first pitch: (minutes to start under, poll every N minutes) ===
+POLL_SCHEDULE = [
+    (30, 5),
+    (120, 15),
+    (360, 30),
+    (float("inf"), 90),
+]
+# Games due within this window are pulled forward into the current poll
+# (must stay below the shortest interval above)
+COALESCE_WINDOW = timedelta(minutes=2)
+
+# === Batch flushes: write the CSV once this many games changed, or this often ===
+FLUSH_EVERY_GAMES = 5
+FLUSH_INTERVAL = timedelta(minutes=30)
+
+
+class SystemClock:
+    def now(self):
+        return datetime.now(eastern)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class DryRunClock:
+    """Simulated clock: sleep() advances time instantly, so a whole day runs in seconds."""
+
+    def __init__(self, start):
+        self._now = start
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self._now += timedelta(seconds=seconds)
+
+
+def poll_interval(minutes_to_start):
+    for threshold, every in POLL_SCHEDULE:
+        if minutes_to_start < threshold:
+            return timedelta(minutes=every)
+    return timedelta(minutes=POLL_SCHEDULE[-1][1])
+
+
+class OddsScheduler:
+    def __init__(self, filename, clock, dry_run=False, deadline=None):
+        self.filename = filename
+        self.clock = clock
+        self.dry_run = dry_run
+        self.deadline = deadline
+        self.df = pd.read_csv(filename)
+        self.start_times = self.df["start_time_et"].map(
+            lambda s: eastern.localize(datetime.strptime(str(s), "%Y-%m-%d %H:%M:%S")))
+        # Every incomplete game is due immediately
+        self.next_poll = {idx: clock.now() for idx in self.df.index}
+        self.dirty = set()
+        self.last_flush = clock.now()
+        self.polls = 0
+
+    def pollable(self, now):
+        """Rows still missing odds whose first pitch is in the future."""
+        missing = missing_odds_mask(self.df)
+        return [idx for idx in self.df.index[missing] if self.start_times[idx] > now]
+
+    def poll(self, due, now):
+        missing = self.df.loc[due]
+        print(f"\n⏰ {now.strftime('%H:%M')} ET — polling {len(due)} game(s) missing odds")
+        before = self.df.loc[due, ODDS_FIELDS].copy()
+        refresh_missing_odds(self.df, missing, source=None if self.dry_run else "scheduler")
+        self.polls += 1
+        # Any odds that changed need writing — a game can stay incomplete (moneyline posted, no total yet)
+        after = self.df.loc[due, ODDS_FIELDS]
+        unchanged = ((after == before) | (after.isna() & before.isna())).all(axis=1)
+        self.dirty.update(after.index[~unchanged])
+        for idx in due:
+            minutes_to_start = (self.start_times[idx] - now).total_seconds() / 60
+            self.next_poll[idx] = now + poll_interval(minutes_to_start)
+
+    def flush(self, force=False):
+        now = self.clock.now()
+        if not self.dirty or not (force or len(self.dirty) >= FLUSH_EVERY_GAMES
+                                  or now - self.last_flush >= FLUSH_INTERVAL):
+            return
+        if self.dry_run:
+            print(f"💾 [dry-run] would write {len(self.dirty)} updated game(s) to {self.filename}")
+        else:
+            write_csv(self.df, self.filename)
+            print(f"💾 Flushed {len(self.dirty)} updated game(s) to {self.filename}")
+        self.dirty.clear()
+        self.last_flush = now
+
+    def run(self):
+        try:
+            while self.step():
+                pass
+        finally:
+            # Always persist what we have — including on SIGTERM / Ctrl-C
+            self.flush(force=True)
+            print(f"🏁 Scheduler done after {self.polls} poll(s)")
+
+    def step(self):
+        """One scheduler tick: poll due games or sleep until the next one is due. False when finished."""
+        now = self.clock.now()
+        pending = self.pollable(now)
+        if not pending:
+            print("✅ No games left to poll — all complete or started")
+            return False
+        if self.deadline and now >= self.deadline:
+            print(f"⏹️ Reached deadline {self.deadline.strftime('%H:%M')} ET with {len(pending)} game(s) pending")
+            return False
+
+        due = [idx for idx in pending if self.next_poll[idx] <= now + COALESCE_WINDOW]
+        if due:
+            try:
+                require_quota("Scheduled odds poll", needed=2 * len(due))
+            except QuotaExhausted as e:
+                print(f"⏸️ Stopping scheduler: {e}")
+                return False
+            self.poll(due, now)
+            self.flush()
+            return True
+
+        # Sleep until the next poll is due, or the next first pitch drops a game from the pending set
+        wake = min(self.next_poll[idx] for idx in pending)
+        wake = min([wake] + [self.start_times[idx] for idx in pending])
+        if self.deadline:
+            wake = min(wake, self.deadline)
+        self.clock.sleep(max(1.0, (wake - now).total_seconds()))
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game-time-aware odds refresh scheduler")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Simulated clock; no CSV or snapshot writes")
+    parser.add_argument("--start", help="Dry-run start time, ET (YYYY-MM-DD HH:MM)")
+    parser.add_argument("--max-hours", type=float, help="Stop after this many hours")
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve every API response from the local cache (no network)")
+    args = parser.parse_args()
+
+    if args.offline:
+        set_offline()
+    if not os.environ.get("API_SPORTS_KEY") and not is_offline():
+        raise ValueError("API_SPORTS_KEY environment variable not set.")
+
+    if args.dry_run:
+        start = eastern.localize(datetime.strptime(args.start, "%Y-%m-%d %H:%M")) if args.start \
+            else datetime.now(eastern)
+        clock = DryRunClock(start)
+    else:
+        clock = SystemClock()
+
+    now = clock.now()
+    print(f"🗓️  Odds scheduler starting | ET: {now.strftime('%Y-%m-%d %H:%M')}{' (dry-run)' if args.dry_run else ''}")
+    filename, _ = find_daily_file(now)
+    if not filename:
+        return
+
+    deadline = now + timedelta(hours=args.max_hours) if args.max_hours else None
+    # Treat SIGTERM (job timeout / cancellation) like Ctrl-C so the final flush runs
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    OddsScheduler(filename, clock, dry_run=args.dry_run, deadline=deadline).run()
+    print_api_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# scripts/odds_snapshots.py
+# Append-only odds history. Every odds fetch (initial pull, re-enrichment,
+# refreshes) adds one small parquet fragment per game date under
+#   data/odds_snapshots/game_date=YYYY-MM-DD/
+# so a write costs O(new rows) and never rewrites earlier prices. Rows hold
+# every bet value fetched (all total lines, not just the consensus one),
+# keyed by game_id, bookmaker and market. Appends and compaction hold the
+# "odds_snapshots" dataset lock (storage.py); readers take it shared.
+#
+#   python scripts/odds_snapshots.py compact [YYYY-MM-DD ...]   # merge fragments
+
+import os
+import sys
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytz
+
+from storage import atomic_path, locked
+
+SNAPSHOT_DIR = "data/odds_snapshots"
+SNAPSHOT_DATASET = "odds_snapshots"
+eastern = pytz.timezone("US/Eastern")
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("fetched_at", pa.timestamp("us", tz="UTC")),
+    ("game_id", pa.int64()),
+    ("start_time_utc", pa.timestamp("us", tz="UTC")),
+    ("bookmaker", pa.string()),
+    ("market", pa.string()),
+    ("side", pa.string()),
+    ("line", pa.float64()),
+    ("odd", pa.float64()),
+    ("source", pa.string()),
+])
+KEY_COLUMNS = ["game_id", "bookmaker", "market", "side", "line"]
+
+
+def _start_time_utc(start_time_et):
+    try:
+        naive = datetime.strptime(str(start_time_et), "%Y-%m-%d %H:%M:%S")
+        return eastern.localize(naive).astimezone(pytz.utc)
+    except ValueError:
+        return None
+
+
+def append_snapshot(table, games, source, fetched_at=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Append one fetch to the store.
+    table: odds_parser.flatten_bets output for the fetch.
+    games: {game_id: {"bookmaker", "game_date", "start_time_et"}} for the games in table.
+    Returns the number of rows written.
+    """
+    if table.empty:
+        return 0
+    fetched_at = pd.Timestamp(fetched_at or datetime.now(pytz.utc))
+    info = pd.DataFrame.from_dict(games, orient="index")
+    info.index.name = "game_id"
+    info = info.reset_index()
+    info["game_id"] = info["game_id"].astype("int64")
+    info["start_time_utc"] = pd.to_datetime(info["start_time_et"].map(_start_time_utc), utc=True)
+
+    rows = table.assign(game_id=table["game_id"].astype("int64")).merge(
+        info[["game_id", "bookmaker", "game_date", "start_time_utc"]], on="game_id", how="inner")
+    rows["fetched_at"] = fetched_at
+    rows["source"] = source
+
+    written = 0
+    with locked(SNAPSHOT_DATASET):
+        for game_date, part in rows.groupby("game_date", sort=True):
+            partition = os.path.join(snapshot_dir, f"game_date={game_date}")
+            fragment = pa.Table.from_pandas(part[SNAPSHOT_SCHEMA.names], schema=SNAPSHOT_SCHEMA, preserve_index=False)
+            name = f"{fetched_at.strftime('%Y%m%dT%H%M%S')}-{source}-{uuid.uuid4().hex[:8]}.parquet"
+            with atomic_path(os.path.join(partition, name)) as tmp:
+                pq.write_table(fragment, tmp)
+            written += len(part)
+    return written
+
+
+def load_snapshots(game_ids=None, game_dates=None, columns=None, snapshot_dir=SNAPSHOT_DIR):
+    """Read snapshot rows, pruning partitions by game_date and filtering by game_id."""
+    if not os.path.isdir(snapshot_dir):
+        return pd.DataFrame(columns=SNAPSHOT_SCHEMA.names + ["game_date"])
+    expr = None
+    if game_dates is not None:
+        expr = ds.field("game_date").isin([str(d) for d in game_dates])
+    if game_ids is not None:
+        id_expr = ds.field("game_id").isin([int(g) for g in game_ids])
+        expr = id_expr if expr is None else expr & id_expr
+    with locked(SNAPSHOT_DATASET, shared=True):
+        dataset = ds.dataset(snapshot_dir, format="parquet", partitioning="hive")
+        df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+    if "game_date" in df.columns:
+        df["game_date"] = df["game_date"].astype(str)
+    return df
+
+
+def latest_as_of(as_of, game_ids=None, game_dates=None, snapshot_dir=SNAPSHOT_DIR):
+    """Latest price for every (game, bookmaker, market, side, line) fetched at or before `as_of`."""
+    as_of = pd.Timestamp(as_of)
+    if as_of.tzinfo is None:
+        as_of = as_of.tz_localize("UTC")
+    df = load_snapshots(game_ids, game_dates, snapshot_dir=snapshot_dir)
+    df = df[df["fetched_at"] <= as_of]
+    return (df.sort_values("fetched_at", kind="stable")
+            .drop_duplicates(KEY_COLUMNS, keep="last")
+            .reset_index(drop=True))
+
+
+def opening_closing(game_ids=None, game_dates=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    First and last price per (game, bookmaker, market, side, line). Closing
+    only counts fetches made before first pitch. Columns: KEY_COLUMNS plus
+    opening_odd, opening_at, closing_odd, closing_at.
+    """
+    df = load_snapshots(game_ids, game_dates, snapshot_dir=snapshot_dir)
+    df = df[df["start_time_utc"].isna() | (df["fetched_at"] <= df["start_time_utc"])]
+    df = df.sort_values("fetched_at", kind="stable")
+    grouped = df.groupby(KEY_COLUMNS, dropna=False, sort=False)
+    opening = grouped[["odd", "fetched_at"]].first().rename(columns={"odd": "opening_odd", "fetched_at": "opening_at"})
+    closing = grouped[["odd", "fetched_at"]].last().rename(columns={"odd": "closing_odd", "fetched_at": "closing_at"})
+    return opening.join(closing).reset_index()
+
+
+def compact(game_dates=None, snapshot_dir=SNAPSHOT_DIR):
+    """Merge each partition's fragments into one file (rows and order unchanged)."""
+    if not os.path.isdir(snapshot_dir):
+        return
+    partitions = sorted(p for p in os.listdir(snapshot_dir) if p.startswith("game_date="))
+    if game_dates:
+        partitions = [p for p in partitions if p.split("=", 1)[1] in set(game_dates)]
+    for partition in partitions:
+        path = os.path.join(snapshot_dir, partition)
+        with locked(SNAPSHOT_DATASET):
+            fragments = sorted(f for f in os.listdir(path) if f.endswith(".parquet"))
+            if len(fragments) < 2:
+                continue
+            merged = pa.concat_tables([pq.read_table(os.path.join(path, f), schema=SNAPSHOT_SCHEMA) for f in fragments])
+            merged = merged.sort_by([("fetched_at", "ascending")])
+            with atomic_path(os.path.join(path, f"compacted-{uuid.uuid4().hex[:8]}.parquet")) as tmp:
+                pq.write_table(merged, tmp)
+            for f in fragments:
+                os.remove(os.path.join(path, f))
+        print(f"🗜️  {partition}: {len(fragments)} fragments → 1 ({merged.num_rows} rows)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "compact":
+        compact(sys.argv[2:] or None)
+    else:
+        print("Usage: python scripts/odds_snapshots.py compact [YYYY-MM-DD ...]")
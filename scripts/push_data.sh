@@ -0,0 +1,47 @@
+#!/usr/bin/env bash
+# scripts/push_data.sh
+# Commit step shared by the data workflows (daily-run, lock-signals,
+# odds-refresh). Each run works in its own checkout, so other runs may have
+# pushed while it ran. Its changes are committed on top of the commit it
+# checked out, then rebased onto the current main and pushed, retrying if
+# yet another push lands in between. Daily CSVs edited by both sides are
+# merged cell by cell (scripts/merge_daily_csv.py); any other conflict fails
+# the job instead of overwriting the other run's data.
+#
+#   scripts/push_data.sh "Automated daily data update"
+
+set -euo pipefail
+
+MESSAGE="$1"
+ATTEMPTS=5
+
+git config user.name "github-actions[bot]"
+git config user.email "41898282+github-actions[bot]@users.noreply.github.com"
+git config merge.daily-csv.name "Daily CSV merge on game_id"
+git config merge.daily-csv.driver "python scripts/merge_daily_csv.py %O %A %B"
+
+git add -A
+if git diff --cached --quiet; then
+  echo "✅ No data changes to push"
+  exit 0
+fi
+git commit -q -m "$MESSAGE"
+
+for attempt in $(seq 1 "$ATTEMPTS"); do
+  git fetch -q origin main
+  if ! git rebase origin/main; then
+    echo "❌ Changes conflict with data another run pushed — not pushing:"
+    git diff --name-only --diff-filter=U
+    git rebase --abort
+    exit 1
+  fi
+  if git push origin HEAD:main; then
+    echo "📤 Pushed (attempt $attempt)"
+    exit 0
+  fi
+  echo "🔁 main moved during the push — retrying"
+  sleep $((attempt * 5))
+done
+
+echo "❌ Could not push after $ATTEMPTS attempts"
+exit 1
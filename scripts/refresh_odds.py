@@ -1,139 +1,103 @@
 # scripts/refresh_odds.py
-# Lightweight script — only refreshes odds for today's daily CSV
-# Runs at 11 AM ET and 2 PM ET to catch late-posting Pinnacle lines
+# Lightweight script — only refreshes odds for today's daily CSV (one-shot).
+# Scheduled refreshes run through odds_scheduler.py instead.
+# odds_scheduler.py reuses find_daily_file / refresh_missing_odds for its
+# game-time-aware polling.
 
 import os
-import requests
+import argparse
 import pandas as pd
 from datetime import datetime, timedelta
 import pytz
 
-API_KEY = os.environ.get("API_SPORTS_KEY")
-if not API_KEY:
-    raise ValueError("API_SPORTS_KEY environment variable not set.")
+from api_client import QuotaExhausted, is_offline, print_api_summary, require_quota, set_offline
+from daily_pull_and_enrich import fetch_bets_for_game, fetch_concurrently, parse_fetched_odds
+from storage import write_csv
 
-HEADERS = {"x-apisports-key": API_KEY}
-TARGET_ODDS = 1.909
 eastern = pytz.timezone("US/Eastern")
 
-# Check both today ET and yesterday ET to handle UTC/ET boundary
-now_et = datetime.now(eastern)
-candidate_dates = [
-    now_et.strftime("%Y-%m-%d"),
-    (now_et - timedelta(days=1)).strftime("%Y-%m-%d")
-]
-
-print(f"🔄 Odds refresh running | UTC: {datetime.utcnow().strftime('%Y-%m-%d %H:%M')} | ET: {now_et.strftime('%Y-%m-%d %H:%M')}")
-
-# Find the most recent daily file that exists
-filename = None
-today = None
-for date in candidate_dates:
-    candidate = f"data/daily/MLB_Combined_Odds_Results_{date}.csv"
-    if os.path.exists(candidate):
-        filename = candidate
-        today = date
-        print(f"📁 Found daily file: {candidate}")
-        break
-
-if not filename:
+def find_daily_file(now_et):
+    """Most recent daily file for today ET or yesterday ET (UTC/ET boundary). Returns (filename, date)."""
+    candidate_dates = [
+        now_et.strftime("%Y-%m-%d"),
+        (now_et - timedelta(days=1)).strftime("%Y-%m-%d")
+    ]
+    for date in candidate_dates:
+        candidate = f"data/daily/MLB_Combined_Odds_Results_{date}.csv"
+        if os.path.exists(candidate):
+            print(f"📁 Found daily file: {candidate}")
+            return candidate, date
     print(f"⚠️ No daily file found for {candidate_dates} — skipping")
-    exit(0)
-
-df = pd.read_csv(filename)
-
-# Find games with missing moneyline OR total
-missing = df[df['moneyline_home'].isna() | df['total_line'].isna()]
-
-if len(missing) == 0:
-    print(f"✅ All odds present for {today} — nothing to refresh")
-    exit(0)
-
-print(f"🔄 Found {len(missing)} games with missing odds — refreshing...")
-
-def fetch_bets(game_id, bookmaker_id):
-    """Fetch bets list from a bookmaker. Returns bets list or None."""
-    try:
-        url = f"https://v1.baseball.api-sports.io/odds?game={game_id}&bookmaker={bookmaker_id}"
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        data = response.json()
-        if not data.get("response"):
-            return None
-        bookmakers = data["response"][0].get("bookmakers")
-        if not bookmakers:
-            return None
-        return bookmakers[0].get("bets")
-    except Exception as e:
-        print(f"  ⚠️ Error from bookmaker {bookmaker_id} for game {game_id}: {e}")
-        return None
-
-for idx, row in missing.iterrows():
-    game_id = int(row['game_id'])
-    try:
-        # Try Pinnacle first, Marathon as fallback
-        bets = None
-        bookmaker_used = None
-        for bk_id, bk_name in [(4, 'Pinnacle'), (10, 'Marathon')]:
-            bets = fetch_bets(game_id, bk_id)
-            if bets:
-                bookmaker_used = bk_name
-                if bk_id != 4:
-                    print(f"  ⚠️ Pinnacle unavailable — using {bk_name} for game {game_id}")
-                break
-
+    return None, None
+
+def missing_odds_mask(df):
+    """Games with missing moneyline OR total."""
+    return df['moneyline_home'].isna() | df['total_line'].isna()
+
+def refresh_missing_odds(df, missing, source="refresh"):
+    """
+    Re-fetch odds for the `missing` rows of df and write them into df in place.
+    `source` labels the odds snapshot rows (None skips recording). Returns games fetched.
+    """
+    # Same per-game fetch (Pinnacle first, Marathon as fallback) and parse as the daily pull
+    games = {int(row.game_id): {"game_date": row.game_date, "start_time_et": row.start_time_et}
+             for row in missing.itertuples()}
+    fetched = fetch_concurrently(fetch_bets_for_game, games)
+    parsed = parse_fetched_odds(fetched, games, source)
+
+    found = 0
+    for idx, row in missing.iterrows():
+        game_id = int(row['game_id'])
+        bets, bookmaker_used = fetched.get(game_id, (None, None))
         if not bets:
             print(f"  ❌ No odds from any bookmaker for game {game_id}")
             continue
+        found += 1
+        if bookmaker_used != 'Pinnacle':
+            print(f"  ⚠️ Pinnacle unavailable — using {bookmaker_used} for game {game_id}")
+        for field, value in parsed.get(game_id, {}).items():
+            df.at[idx, field] = float(value)
+        print(f"  ✅ {row['home_team']} vs {row['away_team']}: "
+              f"ML={df.at[idx, 'moneyline_home']} Total={df.at[idx, 'total_line']}")
+    return found
 
-        data = {"response": [{"bookmakers": [{"bets": bets}]}]}
+def main():
+    parser = argparse.ArgumentParser(description="Refresh missing odds in today's daily CSV")
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve every API response from the local cache (no network)")
+    if parser.parse_args().offline:
+        set_offline()
 
-        if not data.get("response"):
-            print(f"  ⚠️ {row['home_team']} vs {row['away_team']}: still no odds available")
-            continue
+    if not os.environ.get("API_SPORTS_KEY") and not is_offline():
+        raise ValueError("API_SPORTS_KEY environment variable not set.")
 
-        bookmakers = data["response"][0].get("bookmakers", [])
-        if not bookmakers:
-            print(f"  ⚠️ {row['home_team']} vs {row['away_team']}: no bookmakers returned")
-            continue
+    now_et = datetime.now(eastern)
+    print(f"🔄 Odds refresh running | UTC: {datetime.utcnow().strftime('%Y-%m-%d %H:%M')} | ET: {now_et.strftime('%Y-%m-%d %H:%M')}")
 
-        bets = bookmakers[0].get("bets", [])
-
-        for bet in bets:
-            if bet["name"] == "Home/Away":
-                for val in bet.get("values", []):
-                    if val["value"].lower() == "home":
-                        df.at[idx, "moneyline_home"] = float(val["odd"])
-                    elif val["value"].lower() == "away":
-                        df.at[idx, "moneyline_away"] = float(val["odd"])
-
-            elif bet["name"] == "Over/Under":
-                totals = {}
-                for val in bet.get("values", []):
-                    try:
-                        parts = val["value"].split(" ")
-                        side = parts[0].lower()
-                        line = float(parts[1])
-                        if line not in totals:
-                            totals[line] = {}
-                        totals[line][side] = float(val["odd"])
-                    except (IndexError, ValueError):
-                        continue
-
-                valid = [(l, s) for l, s in totals.items() if "over" in s and "under" in s]
-                if valid:
-                    best_line = min(
-                        valid,
-                        key=lambda x: (abs(x[1]["over"] - TARGET_ODDS) + abs(x[1]["under"] - TARGET_ODDS)) / 2
-                    )[0]
-                    df.at[idx, "total_line"] = best_line
-                    df.at[idx, "over_odds"] = totals[best_line]["over"]
-                    df.at[idx, "under_odds"] = totals[best_line]["under"]
+    filename, today = find_daily_file(now_et)
+    if not filename:
+        return
 
-        print(f"  ✅ {row['home_team']} vs {row['away_team']}: "
-              f"ML={df.at[idx, 'moneyline_home']} Total={df.at[idx, 'total_line']}")
+    df = pd.read_csv(filename)
+    missing = df[missing_odds_mask(df)]
+
+    if len(missing) == 0:
+        print(f"✅ All odds present for {today} — nothing to refresh")
+        return
+
+    # Refreshes are low priority — don't burn the reserve the daily pull depends on
+    try:
+        require_quota("Odds refresh", needed=2 * len(missing))
+    except QuotaExhausted as e:
+        print(f"⏸️ Skipping refresh: {e}")
+        return
+
+    print(f"🔄 Found {len(missing)} games with missing odds — refreshing...")
+    refresh_missing_odds(df, missing)
 
-    except Exception as e:
-        print(f"  ❌ Error for game {game_id}: {e}")
+    write_csv(df, filename)
+    print_api_summary()
+    print(f"\n✅ Odds refresh complete — {today} updated")
 
-df.to_csv(filename, index=False)
-print(f"\n✅ Odds refresh complete — {today} updated")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# scripts/signal_analytics.py
+# Signal performance cube. Every settled signal is joined to its team's
+# h2h_own_odds in the master (the decimal price it would have paid, one unit
+# staked) and, where the odds snapshot store has pre-game prices for the
+# game, to the closing moneyline for CLV. Aggregates are additive sums per
+# slice — all, month, tier, score_bucket, venue (home/away), team — kept up to
+# date incrementally: a run only adds signals that are new or changed since
+# the last one (subtracting their old version), so dashboards read the cube
+# instead of recomputing it. A signal's CLV is fixed when it is folded in;
+# --rebuild picks up odds snapshots recorded after that.
+#
+#   data/signals/signal_facts.parquet   one joined row per settled signal
+#   data/signals/signal_cube.parquet    (slice, key) → signals, wins, units, hit_rate, roi, avg_clv
+#
+# A run holds the "signal_cube" lock (storage.py) from reading the facts to
+# writing the cube, so two runs can't fold the same signals in twice.
+#
+#   python scripts/signal_analytics.py [--rebuild]
+#   python scripts/signal_analytics.py show [SLICE]
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from master_store import load_master
+from odds_snapshots import opening_closing
+from signal_store import KEY_COLUMNS, SCORE_BINS, SIGNALS_DIR, load_signals
+from storage import locked, write_parquet
+
+FACTS_FILE = os.path.join(SIGNALS_DIR, "signal_facts.parquet")
+CUBE_FILE = os.path.join(SIGNALS_DIR, "signal_cube.parquet")
+CUBE_DATASET = "signal_cube"
+
+# slice name -> fact column it groups by (None: one row over every signal)
+SLICES = {"all": None, "month": "month", "tier": "tier", "score_bucket": "score_bucket",
+          "venue": "venue", "team": "signal_team"}
+FACT_COLUMNS = KEY_COLUMNS + ["result", "month", "tier", "score_bucket", "venue",
+                              "price", "units", "closing_price", "clv"]
+SUM_COLUMNS = ["signals", "wins", "priced", "units", "clv_signals", "clv_sum"]
+
+
+def _read(path, columns):
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    return pd.DataFrame(columns=columns)
+
+
+def _write(df, path):
+    write_parquet(df, path, dataset=CUBE_DATASET, index=False)
+
+
+def closing_prices(game_ids, game_dates):
+    """Last pre-game moneyline per (game_id, side) across bookmakers, from odds snapshots."""
+    close = opening_closing(game_ids=game_ids, game_dates=game_dates)
+    close = close[close["market"] == "Home/Away"].sort_values("closing_at", kind="stable")
+    close = close.drop_duplicates(["game_id", "side"], keep="last")
+    return close.set_index(["game_id", "side"])["closing_odd"]
+
+
+def build_facts(signals):
+    """Joined fact rows for settled signals (store rows with a W/L result)."""
+    facts = signals[KEY_COLUMNS + ["result", "tier", "consensus_score", "home_team"]].copy()
+    facts["game"] = pd.to_numeric(facts["game_id"], errors="coerce")
+    facts = facts[facts["game"].notna()].astype({"game": "int64"})
+    if facts.empty:
+        return pd.DataFrame(columns=FACT_COLUMNS)
+
+    # Master odds are float32; round back to the quoted decimal price
+    master_df = load_master(columns=["game_id", "team_abbr", "h2h_own_odds"],
+                            date_range=(facts["date"].min(), None))
+    prices = (master_df.drop_duplicates(["game_id", "team_abbr"], keep="last")
+              .assign(game_id=lambda d: d["game_id"].astype("int64"), team_abbr=lambda d: d["team_abbr"].astype(str))
+              .set_index(["game_id", "team_abbr"])["h2h_own_odds"].astype("float64").round(3))
+    facts["price"] = prices.reindex(pd.MultiIndex.from_arrays([facts["game"], facts["signal_team"]])).to_numpy()
+
+    facts["month"] = facts["date"].str[:7]
+    facts["tier"] = facts["tier"].astype(str)
+    facts["score_bucket"] = pd.cut(facts["consensus_score"], SCORE_BINS).astype(str)
+    facts["venue"] = np.where(facts["signal_team"] == facts["home_team"], "home", "away")
+    won = (facts["result"] == "W").to_numpy()
+    facts["units"] = np.where(won, facts["price"] - 1, -1.0)
+    facts.loc[facts["price"].isna(), "units"] = np.nan
+
+    closing = closing_prices(facts["game"].unique(), facts["date"].unique())
+    facts["closing_price"] = closing.reindex(pd.MultiIndex.from_arrays([facts["game"], facts["venue"]])).to_numpy()
+    facts["clv"] = facts["price"] / facts["closing_price"] - 1
+    return facts[FACT_COLUMNS].reset_index(drop=True)
+
+
+def aggregate(facts):
+    """Additive sums per (slice, key)."""
+    parts = []
+    for name, column in SLICES.items():
+        key = pd.Series("all", index=facts.index) if column is None else facts[column].astype(str)
+        grouped = facts.assign(win=facts["result"] == "W").groupby(key)
+        sums = pd.DataFrame({
+            "signals": grouped.size(),
+            "wins": grouped["win"].sum(),
+            "priced": grouped["units"].count(),
+            "units": grouped["units"].sum(),
+            "clv_signals": grouped["clv"].count(),
+            "clv_sum": grouped["clv"].sum(),
+        })
+        sums.index = pd.MultiIndex.from_product([[name], sums.index], names=["slice", "key"])
+        parts.append(sums)
+    sums = pd.concat(parts).astype("float64") if parts and len(facts) else \
+        pd.DataFrame(columns=SUM_COLUMNS, index=pd.MultiIndex.from_tuples([], names=["slice", "key"]), dtype="float64")
+    return sums
+
+
+def finish_cube(sums):
+    """Drop emptied cells and derive hit rate, ROI (units per priced signal) and average CLV."""
+    sums = sums[sums["signals"] > 0]
+    cube = sums.astype({"signals": "int64", "wins": "int64", "priced": "int64", "clv_signals": "int64"})
+    cube = cube.assign(hit_rate=sums["wins"] / sums["signals"],
+                       roi=sums["units"] / sums["priced"].replace(0, np.nan),
+                       avg_clv=sums["clv_sum"] / sums["clv_signals"].replace(0, np.nan))
+    return cube.reset_index()
+
+
+@locked(CUBE_DATASET)
+def update(rebuild=False):
+    """Fold new / changed settled signals into the facts and cube; returns the cube."""
+    signals = load_signals()
+    settled = signals[signals["result"].isin(["W", "L"])]
+    facts = _read(FACTS_FILE, FACT_COLUMNS) if not rebuild else pd.DataFrame(columns=FACT_COLUMNS)
+    cube = _read(CUBE_FILE, ["slice", "key"] + SUM_COLUMNS) if not rebuild else pd.DataFrame(columns=["slice", "key"] + SUM_COLUMNS)
+
+    # A stored fact is stale when its signal's result changed or the signal is gone (re-lock)
+    current = settled.set_index(KEY_COLUMNS)["result"]
+    stored = facts.set_index(KEY_COLUMNS)["result"]
+    stale = (current.reindex(stored.index) != stored).to_numpy()
+    fresh = settled[~pd.MultiIndex.from_frame(settled[KEY_COLUMNS]).isin(stored.index[~stale])]
+    print(f"Signals: {len(settled)} settled | {len(fresh)} new or changed, {int(stale.sum())} stale fact(s)")
+    if fresh.empty and not stale.any() and os.path.exists(CUBE_FILE) and not rebuild:
+        return cube
+
+    added = build_facts(fresh)
+    removed = facts[stale]
+    sums = cube.set_index(["slice", "key"])[SUM_COLUMNS].astype("float64")
+    delta = aggregate(added).sub(aggregate(removed), fill_value=0)
+    sums = sums.add(delta, fill_value=0)
+    facts = pd.concat([facts[~stale], added], ignore_index=True).sort_values(KEY_COLUMNS, kind="stable")
+
+    cube = finish_cube(sums).sort_values(["slice", "key"], kind="stable").reset_index(drop=True)
+    _write(facts.reset_index(drop=True), FACTS_FILE)
+    _write(cube, CUBE_FILE)
+    print(f"✅ Signal cube: {len(cube)} cells from {len(facts)} signals "
+          f"({int(facts['price'].notna().sum())} priced, {int(facts['clv'].notna().sum())} with CLV) → {CUBE_FILE}")
+    return cube
+
+
+def show(slice_name=None):
+    cube = _read(CUBE_FILE, ["slice", "key"] + SUM_COLUMNS)
+    if slice_name:
+        cube = cube[cube["slice"] == slice_name]
+    columns = ["slice", "key", "signals", "wins", "hit_rate", "priced", "units", "roi", "clv_signals", "avg_clv"]
+    print(cube[columns].to_string(index=False, float_format="{:.3f}".format))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signal performance cube (hit rate, units, ROI, CLV)")
+    parser.add_argument("command", nargs="?", default="update", choices=["update", "show"])
+    parser.add_argument("slice", nargs="?", help="show: only this slice (" + ", ".join(SLICES) + ")")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute facts and cube from scratch")
+    args = parser.parse_args()
+    if args.command == "show":
+        show(args.slice)
+    else:
+        update(args.rebuild)
@@ -0,0 +1,169 @@
+# scripts/signal_store.py
+# Columnar store of every locked T1 signal — one parquet file,
+#   data/signals/signals.parquet
+# one row per (date, game_id, signal_team), sorted by date so date-range reads
+# skip row groups on their min/max statistics. lock_signals.py replaces a
+# day's rows when it locks, update_signal_results.py upserts results; the
+# per-day signals_YYYY-MM-DD.json files the strikes-and-downs repo reads are
+# exported from here. Season-wide questions are a single scan:
+#   load_signals(date_range=("2026-01-01", "2026-12-31"))
+#
+# A missing store is built from the per-day JSON on first use. Which days
+# still need their results backfilled is tracked by update_signal_results.py
+# in data/signals/results_manifest.json, not here. Every write — the parquet store and the JSON —
+# holds the "signals" dataset lock (storage.py).
+#
+#   python scripts/signal_store.py import            # rebuild from the per-day JSON
+#   python scripts/signal_store.py summary [SEASON]  # hit rate by team / score
+
+import glob
+import json
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from storage import atomic_path, locked, write_json
+
+SIGNALS_DIR = "data/signals"
+SIGNALS_FILE = os.path.join(SIGNALS_DIR, "signals.parquet")
+SIGNALS_DATASET = "signals"
+
+# Per-signal fields, in the order the per-day JSON lists them
+SIGNAL_FIELDS = ["game_id", "game_date", "home_team", "away_team", "signal_team",
+                 "consensus_score", "tier", "result"]
+SIGNAL_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("locked_at", pa.string()),
+    ("game_id", pa.string()),
+    ("game_date", pa.string()),
+    ("home_team", pa.string()),
+    ("away_team", pa.string()),
+    ("signal_team", pa.string()),
+    ("consensus_score", pa.float64()),
+    ("tier", pa.int64()),
+    ("result", pa.string()),
+])
+KEY_COLUMNS = ["date", "game_id", "signal_team"]
+ROW_GROUP_SIZE = 1024
+
+SCORE_BINS = [-float("inf"), 0.5, 1.0, 1.5, 2.0, 3.0, float("inf")]
+
+
+def json_path(date, json_dir=SIGNALS_DIR):
+    return os.path.join(json_dir, f"signals_{date}.json")
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def day_rows(data):
+    """Store rows for one per-day lock document (the JSON layout)."""
+    rows = pd.DataFrame([{f: sig.get(f) for f in SIGNAL_FIELDS} for sig in data.get("signals", [])],
+                        columns=SIGNAL_FIELDS)
+    rows.insert(0, "date", data["date"])
+    rows.insert(1, "locked_at", data.get("locked_at"))
+    return rows[SIGNAL_SCHEMA.names]
+
+
+def _to_table(df):
+    return pa.Table.from_pandas(df[SIGNAL_SCHEMA.names], schema=SIGNAL_SCHEMA, preserve_index=False)
+
+
+def _write(df, path):
+    """Sort by date (keeping each day's signal order) and replace the file via temp + rename."""
+    df = df.sort_values("date", kind="stable").reset_index(drop=True)
+    with locked(SIGNALS_DATASET), atomic_path(path) as tmp:
+        pq.write_table(_to_table(df), tmp, row_group_size=ROW_GROUP_SIZE)
+    return df
+
+
+def import_json(json_dir=SIGNALS_DIR, path=SIGNALS_FILE):
+    """(Re)build the store from every per-day JSON file."""
+    frames = []
+    for p in sorted(glob.glob(os.path.join(json_dir, "signals_*.json"))):
+        with open(p) as f:
+            frames.append(day_rows(json.load(f)))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SIGNAL_SCHEMA.names)
+    df = _write(df.drop_duplicates(KEY_COLUMNS, keep="last"), path)
+    print(f"📦 Signal store built from {len(frames)} JSON file(s): {len(df)} signals → {path}")
+    return df
+
+
+def load_signals(columns=None, date_range=None, path=SIGNALS_FILE, json_dir=SIGNALS_DIR):
+    """Read the store, optionally one inclusive (start, end) date range (either end may be None)."""
+    if not os.path.exists(path):
+        import_json(json_dir, path)
+    expr = None
+    if date_range is not None:
+        start, end = date_range
+        if start is not None:
+            expr = ds.field("date") >= _day(start)
+        if end is not None:
+            end_expr = ds.field("date") <= _day(end)
+            expr = end_expr if expr is None else expr & end_expr
+    table = ds.dataset(path, format="parquet", schema=SIGNAL_SCHEMA).to_table(columns=columns, filter=expr)
+    return table.to_pandas()
+
+
+def upsert_signals(rows, path=SIGNALS_FILE, json_dir=SIGNALS_DIR):
+    """Insert rows; one with the same (date, game_id, signal_team) as a stored row replaces it in place."""
+    with locked(SIGNALS_DATASET):
+        combined = pd.concat([load_signals(path=path, json_dir=json_dir), rows[SIGNAL_SCHEMA.names]], ignore_index=True)
+        first_seen = combined.groupby(KEY_COLUMNS, sort=False, dropna=False).ngroup()
+        combined = combined.assign(_order=first_seen).drop_duplicates(KEY_COLUMNS, keep="last")
+        return _write(combined.sort_values("_order", kind="stable").drop(columns="_order"), path)
+
+
+def replace_day(data, path=SIGNALS_FILE, json_dir=SIGNALS_DIR):
+    """Store a (re)lock: the day's rows become exactly the signals in `data`."""
+    with locked(SIGNALS_DATASET):
+        stored = load_signals(path=path, json_dir=json_dir)
+        stored = stored[stored["date"] != data["date"]]
+        return _write(pd.concat([stored, day_rows(data)], ignore_index=True), path)
+
+
+def export_json(dates, df=None, json_dir=SIGNALS_DIR, path=SIGNALS_FILE):
+    """Write the per-day JSON for `dates` from the store; returns the paths written."""
+    dates = sorted({_day(d) for d in dates})
+    if df is None:
+        df = load_signals(date_range=(dates[0], dates[-1]), path=path, json_dir=json_dir) if dates else None
+    written = []
+    for date in dates:
+        day = df[df["date"] == date]
+        if day.empty:
+            continue
+        # Pending signals keep "result": null, as the backfill has always written them
+        signals = [{f: rec[f] for f in SIGNAL_FIELDS} for rec in _to_table(day).to_pylist()]
+        data = {"date": date, "locked_at": day["locked_at"].iat[0], "t1_count": len(signals), "signals": signals}
+        out = json_path(date, json_dir)
+        write_json(data, out, dataset=SIGNALS_DATASET, indent=2)
+        written.append(out)
+    return written
+
+
+def summary(season=None, path=SIGNALS_FILE):
+    """Settled signals' hit rate by signal_team and by consensus_score band."""
+    date_range = (f"{season}-01-01", f"{season}-12-31") if season else None
+    df = load_signals(columns=["signal_team", "consensus_score", "result"], date_range=date_range, path=path)
+    df = df[df["result"].isin(["W", "L"])].assign(win=lambda d: d["result"] == "W")
+    print(f"Settled signals{f' ({season})' if season else ''}: {len(df)} | hit rate {df['win'].mean():.1%}")
+    for label, key in [("signal_team", df["signal_team"]),
+                       ("consensus_score", pd.cut(df["consensus_score"], SCORE_BINS))]:
+        table = df.groupby(key, observed=True)["win"].agg(signals="size", hit_rate="mean")
+        if label == "signal_team":
+            table = table.sort_values("signals", ascending=False)
+        print(f"\nBy {label}:\n{table.to_string(float_format='{:.3f}'.format)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "import":
+        import_json()
+    elif len(sys.argv) >= 2 and sys.argv[1] == "summary":
+        summary(int(sys.argv[2]) if len(sys.argv) >= 3 else None)
+    else:
+        print("Usage: python scripts/signal_store.py import | summary [SEASON]")
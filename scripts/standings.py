@@ -0,0 +1,191 @@
+# scripts/standings.py
+# Materialized team standings kept next to the master dataset:
+#   data/master/standings.json
+# One record per (season, team) with the post-game record and streak after
+# that team's latest game, plus the last game_id applied. update_master_data
+# reads season state from here instead of scanning the master, and updates it
+# (atomically) right after appending rows.
+#
+#   python scripts/standings.py verify     # recompute from the master and diff
+#   python scripts/standings.py rebuild
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+from master_store import load_master
+from storage import atomic_path
+
+STANDINGS_FILE = "data/master/standings.json"
+
+STAT_COLUMNS = {
+    'wins': 'Wins',
+    'losses': 'Losses',
+    'win_pct': 'Win_Pct',
+    'streak': 'team_streak',
+    'win_streak': 'Win_Streak',
+    'loss_streak': 'Loss_Streak',
+}
+MASTER_COLUMNS = ['season', 'team_abbr', 'game_id', 'game_date_et', 'start_time_et'] + list(STAT_COLUMNS.values())
+
+
+def parse_start_times(start_time_et):
+    """start_time_et strings -> datetimes (NaT when unparseable)."""
+    # The master holds two start_time_et formats: 2022–2025 rows "3/27/25 22:10", newer rows ISO
+    start = pd.to_datetime(start_time_et, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    return start.fillna(pd.to_datetime(start_time_et, format='%m/%d/%y %H:%M', errors='coerce'))
+
+
+def game_order(rows):
+    """Sort rows by date, then first pitch, then game_id — doubleheader games share a date."""
+    start = parse_start_times(rows['start_time_et'])
+    return (rows.assign(_date=pd.to_datetime(rows['game_date_et']), _start=start)
+            .sort_values(['_date', '_start', 'game_id'], kind='stable', na_position='first')
+            .drop(columns=['_date', '_start']))
+
+
+def _records(rows):
+    """{season: {team: record}} from each (season, team)'s last row in game order."""
+    latest = game_order(rows).drop_duplicates(['season', 'team_abbr'], keep='last')
+    seasons = {}
+    for row in latest.itertuples(index=False):
+        record = {key: getattr(row, col) for key, col in STAT_COLUMNS.items()}
+        record = {key: (0 if pd.isna(v) else float(v) if key == 'win_pct' else int(v)) for key, v in record.items()}
+        record['last_game_id'] = int(row.game_id)
+        record['last_game_date'] = pd.Timestamp(row.game_date_et).strftime('%Y-%m-%d')
+        seasons.setdefault(str(int(row.season)), {})[row.team_abbr] = record
+    return seasons
+
+
+def compute_standings(master_df):
+    """Standings recomputed from master rows."""
+    rows = master_df[master_df['team_abbr'].notna()][MASTER_COLUMNS]
+    last = game_order(rows).iloc[-1] if len(rows) else None
+    return {
+        'master_rows': len(master_df),
+        'last_game_id': int(last['game_id']) if last is not None else None,
+        'seasons': _records(rows),
+    }
+
+
+def load_standings(path=STANDINGS_FILE):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read standings snapshot {path}: {e}")
+        return None
+
+
+def save_standings(standings, path=STANDINGS_FILE):
+    """Write via a temp file + rename so readers never see a half-written snapshot."""
+    standings = dict(standings, updated_at=datetime.now(pytz.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+    with atomic_path(path) as tmp, open(tmp, "w") as f:
+        json.dump(standings, f, indent=2, sort_keys=True)
+
+
+def apply_rows(standings, new_rows, master_rows):
+    """Fold freshly appended master rows into the snapshot (their stats are post-game)."""
+    rows = new_rows[new_rows['team_abbr'].notna()][MASTER_COLUMNS]
+    for season, teams in _records(rows).items():
+        standings['seasons'].setdefault(season, {}).update(teams)
+    if len(rows):
+        standings['last_game_id'] = int(game_order(rows).iloc[-1]['game_id'])
+    standings['master_rows'] = master_rows
+    return standings
+
+
+def record_appended_rows(new_rows, master_rows, path=STANDINGS_FILE):
+    """
+    Call right after appending new_rows to the master (master_rows = new total).
+    A snapshot that wasn't current before the append is left for the next run to rebuild.
+    """
+    standings = load_standings(path)
+    if standings is None or standings.get('master_rows') != master_rows - len(new_rows):
+        print("⚠️ Standings snapshot not current — it will be rebuilt on the next run")
+        return
+    save_standings(apply_rows(standings, new_rows, master_rows), path)
+    print(f"🏆 Standings snapshot updated (last game_id {standings['last_game_id']})")
+
+
+def record_rewritten_rows(team_rows, master_rows, previous_rows, path=STANDINGS_FILE):
+    """
+    Call right after rewriting master rows in place (an upsert). team_rows holds
+    each affected team's season rows through its latest game, with the new
+    records; previous_rows / master_rows are the master's row count before / after.
+    """
+    standings = load_standings(path)
+    if standings is None or standings.get('master_rows') != previous_rows:
+        print("⚠️ Standings snapshot not current — it will be rebuilt on the next run")
+        return
+    rows = team_rows[team_rows['team_abbr'].notna()][MASTER_COLUMNS]
+    for season, teams in _records(rows).items():
+        standings['seasons'].setdefault(season, {}).update(teams)
+    standings['master_rows'] = master_rows
+    save_standings(standings, path)
+    print(f"🏆 Standings snapshot updated for {rows['team_abbr'].nunique()} team(s)")
+
+
+def season_team_stats(master_rows, season, path=STANDINGS_FILE):
+    """
+    Team state for `season` in update_master_data's team_stats shape: every team
+    ever seen starts at 0-0, then gets its record for this season. Read from the
+    snapshot when it matches the master's row count (master_rows); otherwise
+    rebuilt from the master and saved.
+    """
+    standings = load_standings(path)
+    if standings is None or standings.get('master_rows') != master_rows:
+        print("🔁 Standings snapshot missing or stale — recomputing from master")
+        standings = compute_standings(load_master(columns=MASTER_COLUMNS))
+        save_standings(standings, path)
+
+    all_teams = sorted({team for teams in standings['seasons'].values() for team in teams})
+    team_stats = {team: {'wins': 0, 'losses': 0, 'win_pct': 0.0, 'streak': 0, 'win_streak': 0, 'loss_streak': 0}
+                  for team in all_teams}
+    for team, record in standings['seasons'].get(str(season), {}).items():
+        team_stats[team] = {key: record[key] for key in STAT_COLUMNS}
+    return team_stats
+
+
+def verify(path=STANDINGS_FILE):
+    """Recompute standings from the master and diff them against the snapshot. True when equal."""
+    stored = load_standings(path)
+    if stored is None:
+        print(f"❌ No standings snapshot at {path}")
+        return False
+    fresh = compute_standings(load_master(columns=MASTER_COLUMNS))
+    diffs = []
+    for key in ('master_rows', 'last_game_id'):
+        if stored.get(key) != fresh[key]:
+            diffs.append(f"{key}: snapshot={stored.get(key)} master={fresh[key]}")
+    for season in sorted(set(stored['seasons']) | set(fresh['seasons'])):
+        old, new = stored['seasons'].get(season, {}), fresh['seasons'].get(season, {})
+        for team in sorted(set(old) | set(new)):
+            if old.get(team) != new.get(team):
+                diffs.append(f"{season} {team}: snapshot={old.get(team)} master={new.get(team)}")
+    for line in diffs:
+        print(f"  ❌ {line}")
+    print(f"{'✅ Standings snapshot matches master' if not diffs else f'❌ {len(diffs)} difference(s)'}")
+    return not diffs
+
+
+def rebuild(path=STANDINGS_FILE):
+    master_df = load_master(columns=MASTER_COLUMNS)
+    standings = compute_standings(master_df)
+    save_standings(standings, path)
+    print(f"💾 Rebuilt {path}: {sum(len(t) for t in standings['seasons'].values())} team-seasons")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "verify":
+        sys.exit(0 if verify() else 1)
+    elif len(sys.argv) == 2 and sys.argv[1] == "rebuild":
+        rebuild()
+    else:
+        print("Usage: python scripts/standings.py [verify|rebuild]")
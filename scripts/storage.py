@@ -0,0 +1,122 @@
+# scripts/storage.py
+# Shared write path for everything under data/:
+#
+#   atomic writes   every file is written to a temp file beside its target,
+#                   fsynced and renamed over it — readers see the old file or
+#                   the new one, never half of one, and a crash leaves the old
+#                   file in place
+#   dataset locks   locked(dataset) takes an advisory flock on
+#                   data/.locks/<dataset>.lock around a multi-file write;
+#                   reentrant within a process, shared for multi-file reads
+#
+# The locks only guard processes sharing one working tree (e.g. a local
+# odds_scheduler.py run alongside a manual daily pull). Each workflow run has
+# its own runner and checkout; runs are reconciled when they push, by
+# scripts/push_data.sh.
+#
+# A dataset is a name covering files that change together ("master",
+# "signals", "odds_snapshots") or, for standalone files, the file's path.
+
+import fcntl
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+LOCK_DIR = "data/.locks"
+LOCK_TIMEOUT = 15 * 60
+LOCK_POLL = 0.2
+
+# dataset -> [lock file, depth, exclusive] for locks this process holds
+_held = {}
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+def _lock_path(dataset, lock_dir=LOCK_DIR):
+    name = os.path.normpath(dataset).replace(os.sep, "__")
+    return os.path.join(lock_dir, f"{name}.lock")
+
+
+def _acquire(f, mode, dataset, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fcntl.flock(f, mode | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"Timed out after {timeout:.0f}s waiting for the {dataset} lock")
+            time.sleep(LOCK_POLL)
+
+
+@contextmanager
+def locked(dataset, shared=False, timeout=LOCK_TIMEOUT, lock_dir=LOCK_DIR):
+    """Hold the dataset's lock for the with-block (shared for readers)."""
+    held = _held.get(dataset)
+    if held is not None:
+        if not shared and not held[2]:
+            # Upgrading a shared hold in place (flock may let another writer in between)
+            _acquire(held[0], fcntl.LOCK_EX, dataset, timeout)
+            held[2] = True
+        held[1] += 1
+        try:
+            yield
+        finally:
+            held[1] -= 1
+        return
+
+    os.makedirs(lock_dir, exist_ok=True)
+    f = open(_lock_path(dataset, lock_dir), "a")
+    try:
+        _acquire(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX, dataset, timeout)
+        _held[dataset] = [f, 1, not shared]
+        try:
+            yield
+        finally:
+            del _held[dataset]
+    finally:
+        f.close()  # releases the flock
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yields a temp path beside `path`; write the file there. On a clean exit it
+    is fsynced and renamed over `path`; on an error it is removed.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        yield tmp
+        os.chmod(tmp, 0o644)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_json(obj, path, dataset=None, **kwargs):
+    """json.dump `obj` to `path` atomically, under the dataset's lock (default: the file's own)."""
+    with locked(dataset or path), atomic_path(path) as tmp:
+        with open(tmp, "w") as f:
+            json.dump(obj, f, **kwargs)
+
+
+def write_parquet(df, path, dataset=None, **kwargs):
+    with locked(dataset or path), atomic_path(path) as tmp:
+        df.to_parquet(tmp, **kwargs)
+
+
+def write_csv(df, path, dataset=None, **kwargs):
+    kwargs.setdefault("index", False)
+    with locked(dataset or path), atomic_path(path) as tmp:
+        df.to_csv(tmp, **kwargs)
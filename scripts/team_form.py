@@ -0,0 +1,129 @@
+# scripts/team_form.py
+# Rolling "form" features over the long-format master (one row per team-game):
+# last-N runs scored / allowed, run differential and win pct, the same at the
+# game's venue (home games for home rows, road games for away rows), and rest
+# days. Every value describes the team entering the game — only its earlier
+# games of the same season count — so they can sit next to the odds without
+# leaking the result.
+#
+# Windows are computed on arrays: rows sorted by (season, team, game order),
+# one cumulative sum per stat, and each trailing window is the difference of
+# two cumsum entries. No per-team Python loops.
+#
+#   python scripts/team_form.py [--season 2026] [--windows 5 10]
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from master_store import load_master, master_seasons
+from standings import game_order
+
+FORM_WINDOWS = (5, 10)
+FORM_INPUT_COLUMNS = ['season', 'team_abbr', 'game_id', 'game_date_et', 'start_time_et',
+                      'is_home', 'home_score', 'away_score', 'team_won']
+
+
+def form_columns(windows=FORM_WINDOWS):
+    """Output columns of team_form() for the given windows."""
+    columns = []
+    for n in windows:
+        columns += [f'runs_scored_last{n}', f'runs_allowed_last{n}', f'run_diff_last{n}', f'win_pct_last{n}',
+                    f'venue_run_diff_last{n}', f'venue_win_pct_last{n}']
+    return columns + ['rest_days']
+
+
+def _group_starts(*keys):
+    """Index of the first row of each row's group, for rows already sorted by keys."""
+    n = len(keys[0])
+    new_group = np.zeros(n, dtype=bool)
+    new_group[:1] = True
+    for key in keys:
+        new_group[1:] |= key[1:] != key[:-1]
+    return np.maximum.accumulate(np.where(new_group, np.arange(n), 0))
+
+
+def _trailing_mean(values, group_start, window):
+    """
+    Mean of values[lo:i] for each row i, lo = max(i - window, start of i's group):
+    the previous `window` rows of the group. NaN values are skipped; NaN when
+    the window holds no values (a team's first game).
+    """
+    valid = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    i = np.arange(len(values))
+    lo = np.maximum(i - window, group_start)
+    n = counts[i] - counts[lo]
+    return np.where(n > 0, (sums[i] - sums[lo]) / np.maximum(n, 1), np.nan)
+
+
+def team_form(master_df, windows=FORM_WINDOWS):
+    """
+    Form features for every master row, aligned with master_df's index
+    (columns: form_columns(windows)). Runs and run differential are per-game
+    averages over the window.
+    """
+    rows = game_order(master_df[FORM_INPUT_COLUMNS]).sort_values(['season', 'team_abbr'], kind='stable')
+    season = rows['season'].to_numpy()
+    team = rows['team_abbr'].to_numpy()
+    is_home = rows['is_home'].astype(bool).to_numpy()
+    home_score = rows['home_score'].to_numpy(dtype=float)
+    away_score = rows['away_score'].to_numpy(dtype=float)
+    scored = np.where(is_home, home_score, away_score)
+    allowed = np.where(is_home, away_score, home_score)
+    won = pd.to_numeric(rows['team_won'], errors='coerce').to_numpy(dtype=float)
+    run_diff = scored - allowed
+
+    features = {}
+    start = _group_starts(season, team)
+    # Venue splits: the same windows over the (season, team, is_home) sub-sequences
+    venue_order = np.lexsort((np.arange(len(rows)), is_home, start))
+    venue_start = _group_starts(start[venue_order], is_home[venue_order])
+    for n in windows:
+        features[f'runs_scored_last{n}'] = _trailing_mean(scored, start, n)
+        features[f'runs_allowed_last{n}'] = _trailing_mean(allowed, start, n)
+        features[f'run_diff_last{n}'] = _trailing_mean(run_diff, start, n)
+        features[f'win_pct_last{n}'] = _trailing_mean(won, start, n)
+        for name, values in (('venue_run_diff', run_diff), ('venue_win_pct', won)):
+            column = np.empty(len(rows))
+            column[venue_order] = _trailing_mean(values[venue_order], venue_start, n)
+            features[f'{name}_last{n}'] = column
+
+    # Days since the team's previous game this season (0 for a doubleheader nightcap)
+    dates = pd.to_datetime(rows['game_date_et']).to_numpy(dtype='datetime64[D]')
+    rest = np.full(len(rows), np.nan)
+    i = np.arange(len(rows))
+    has_prev = i > start
+    rest[has_prev] = (dates[has_prev] - dates[i[has_prev] - 1]).astype(float)
+    features['rest_days'] = rest
+
+    return pd.DataFrame(features, index=rows.index).reindex(master_df.index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling team form from the master dataset")
+    parser.add_argument("--season", type=int, help="Season to compute (default: latest)")
+    parser.add_argument("--windows", type=int, nargs="+", default=list(FORM_WINDOWS))
+    args = parser.parse_args()
+
+    season = args.season or master_seasons()[-1]
+    season_df = load_master(columns=FORM_INPUT_COLUMNS, seasons=season)
+
+    start = time.perf_counter()
+    form = team_form(season_df, args.windows)
+    elapsed = time.perf_counter() - start
+    print(f"📈 {season}: form for {len(season_df):,} team-games in {elapsed * 1000:.0f} ms")
+
+    # Each team's form entering its most recent game
+    latest = game_order(season_df).drop_duplicates('team_abbr', keep='last')
+    n = args.windows[0]
+    table = form.loc[latest.index, [f'win_pct_last{n}', f'run_diff_last{n}', f'venue_win_pct_last{n}', 'rest_days']]
+    table.index = latest['team_abbr']
+    print(table.sort_values(f'run_diff_last{n}', ascending=False).round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
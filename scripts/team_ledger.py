@@ -0,0 +1,181 @@
+# scripts/team_ledger.py
+# Point-in-time team ledger: for every (season, team), the state after each
+# game as sorted arrays of (first pitch, wins, losses, streak, runs for,
+# runs against). "State of team X as of time T" is then a binary search for
+# the last game that started before T — the record entering a game, with no
+# shifting inside groups and no way to pick up that game's own result.
+#
+#   data/master/team_ledger.npz   (rebuilt whenever the master's row count changes)
+#
+#   python scripts/team_ledger.py rebuild
+#   python scripts/team_ledger.py NYY "2025-07-04 19:05"
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from master_store import count_rows, load_master
+from standings import game_order, parse_start_times
+from storage import atomic_path
+
+LEDGER_FILE = "data/master/team_ledger.npz"
+LEDGER_COLUMNS = ['season', 'team_abbr', 'game_id', 'game_date_et', 'start_time_et',
+                  'is_home', 'home_score', 'away_score', 'Wins', 'Losses', 'team_streak']
+STATE_FIELDS = ['wins', 'losses', 'streak', 'runs_for', 'runs_against']
+
+# Lookup keys pack (group, seconds since epoch) into one int64; 2**34 s is ~500 years
+_TIME_BITS = 34
+
+
+def _seconds(times):
+    """Datetimes (naive ET) -> int64 seconds since the epoch."""
+    return pd.to_datetime(times).to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+
+class TeamLedger:
+    """Sorted per-(season, team) game states; see as_of() and as_of_join()."""
+
+    def __init__(self, seasons, teams, offsets, times, game_ids, master_rows, **state):
+        self.seasons = seasons
+        self.teams = teams
+        self.offsets = offsets
+        self.times = times
+        self.game_ids = game_ids
+        self.master_rows = int(master_rows)
+        self.state = {field: state[field] for field in STATE_FIELDS}
+        self._groups = pd.MultiIndex.from_arrays([seasons, teams])
+        self._group_of = {key: g for g, key in enumerate(zip(seasons.tolist(), teams.tolist()))}
+        group_ids = np.repeat(np.arange(len(seasons), dtype=np.int64), np.diff(offsets))
+        self._keys = (group_ids << _TIME_BITS) | times
+
+    @classmethod
+    def build(cls, master_df):
+        """Ledger from master rows (post-game Wins/Losses/team_streak per team-game)."""
+        rows = master_df[master_df['team_abbr'].notna()][LEDGER_COLUMNS]
+        rows = game_order(rows).sort_values(['season', 'team_abbr'], kind='stable')
+        # Games without a parseable first pitch are placed at midnight of their date
+        start = parse_start_times(rows['start_time_et']).fillna(pd.to_datetime(rows['game_date_et']))
+
+        group_keys = rows[['season', 'team_abbr']].drop_duplicates()
+        sizes = rows.groupby(['season', 'team_abbr'], sort=False).size().to_numpy()
+        is_home = rows['is_home'].astype(bool)
+        home, away = rows['home_score'].fillna(0), rows['away_score'].fillna(0)
+        by_group = [rows['season'], rows['team_abbr']]
+        runs_for = home.where(is_home, away).groupby(by_group, sort=False).cumsum()
+        runs_against = away.where(is_home, home).groupby(by_group, sort=False).cumsum()
+        return cls(
+            seasons=group_keys['season'].to_numpy(dtype=np.int16),
+            teams=group_keys['team_abbr'].to_numpy(dtype=str),
+            offsets=np.concatenate(([0], np.cumsum(sizes))).astype(np.int64),
+            times=_seconds(start),
+            game_ids=rows['game_id'].to_numpy(dtype=np.int64),
+            master_rows=len(master_df),
+            wins=rows['Wins'].to_numpy(dtype=np.int32),
+            losses=rows['Losses'].to_numpy(dtype=np.int32),
+            streak=rows['team_streak'].to_numpy(dtype=np.int32),
+            runs_for=runs_for.to_numpy(dtype=np.int32),
+            runs_against=runs_against.to_numpy(dtype=np.int32),
+        )
+
+    def as_of(self, team, when, season=None):
+        """
+        State of `team` entering time `when` (naive ET): its record after the last
+        game that started before `when`, in that season (default: when's year).
+        A team with no earlier game that season is 0-0.
+        """
+        when = pd.Timestamp(when)
+        g = self._group_of.get((season or when.year, team))
+        state = {field: 0 for field in STATE_FIELDS}
+        state['games'] = 0
+        if g is None:
+            return state
+        lo, hi = self.offsets[g], self.offsets[g + 1]
+        i = lo + np.searchsorted(self.times[lo:hi], np.datetime64(when, 's').astype(np.int64)) - 1
+        if i >= lo:
+            state = {field: int(self.state[field][i]) for field in STATE_FIELDS}
+            state['games'] = int(i - lo + 1)
+        return state
+
+    def as_of_join(self, slate, team_col='team_abbr', time_col='start_time_et', season_col=None, prefix='pre_'):
+        """
+        slate with the pre-game state of slate[team_col] as of slate[time_col]
+        added as {prefix}wins, {prefix}losses, {prefix}streak, {prefix}runs_for,
+        {prefix}runs_against, {prefix}games — one binary search for all rows.
+        Wide slates: call once per side (e.g. team_col='home_team_abbr', prefix='home_pre_').
+        """
+        times = slate[time_col]
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            parsed = parse_start_times(times)
+            missing = parsed.isna() & times.notna()
+            if missing.any():
+                parsed[missing] = pd.to_datetime(times[missing], format='mixed', errors='coerce')
+            times = parsed
+        seasons = slate[season_col].to_numpy() if season_col else times.dt.year.to_numpy()
+        g = self._groups.get_indexer(pd.MultiIndex.from_arrays([seasons, slate[team_col].to_numpy()]))
+        known = (g >= 0) & times.notna().to_numpy()
+        g_safe = np.where(known, g, 0).astype(np.int64)
+        seconds = np.where(known, _seconds(times.fillna(pd.Timestamp(0))), 0)
+        i = np.searchsorted(self._keys, (g_safe << _TIME_BITS) | seconds) - 1
+        hit = known & (i >= self.offsets[g_safe])
+
+        out = slate.copy()
+        for field in STATE_FIELDS:
+            values = self.state[field][np.maximum(i, 0)]
+            out[f'{prefix}{field}'] = np.where(hit, values, 0)
+        out[f'{prefix}games'] = np.where(hit, i - self.offsets[g_safe] + 1, 0)
+        return out
+
+    def save(self, path=LEDGER_FILE):
+        """Write via a temp file + rename so readers never see a half-written ledger."""
+        with atomic_path(path) as tmp, open(tmp, "wb") as f:
+            np.savez_compressed(f, seasons=self.seasons, teams=self.teams, offsets=self.offsets, times=self.times,
+                     game_ids=self.game_ids, master_rows=self.master_rows, **self.state)
+
+    @classmethod
+    def load(cls, path=LEDGER_FILE):
+        with np.load(path) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+
+def load_ledger(path=LEDGER_FILE):
+    """The saved ledger, rebuilt from the master first if missing or stale."""
+    master_rows = count_rows()
+    if os.path.exists(path):
+        try:
+            ledger = TeamLedger.load(path)
+            if ledger.master_rows == master_rows:
+                return ledger
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not read team ledger {path}: {e}")
+    print("🔁 Team ledger missing or stale — rebuilding from master")
+    return rebuild(path)
+
+
+def rebuild(path=LEDGER_FILE):
+    ledger = TeamLedger.build(load_master(columns=LEDGER_COLUMNS))
+    ledger.save(path)
+    print(f"💾 Rebuilt {path}: {len(ledger.seasons)} team-seasons, {len(ledger.times):,} games")
+    return ledger
+
+
+def invalidate(path=LEDGER_FILE):
+    """
+    Drop the saved ledger after master rows were rewritten in place: the row
+    count it is stamped with doesn't change then. The next load rebuilds it.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "rebuild":
+        rebuild()
+    elif len(sys.argv) == 3:
+        team, when = sys.argv[1], sys.argv[2]
+        state = load_ledger().as_of(team, when)
+        print(f"📒 {team} entering {when}: {state['wins']}-{state['losses']}, streak {state['streak']:+d}, "
+              f"runs {state['runs_for']}-{state['runs_against']} over {state['games']} games")
+    else:
+        print('Usage: python scripts/team_ledger.py rebuild | <TEAM> "<YYYY-MM-DD HH:MM>"')
@@ -1,5 +1,6 @@
 # scripts/update_master_data.py
 
+import copy
 import os
 import pandas as pd
 import numpy as np
@@ -7,6 +8,11 @@ import glob
 from datetime import datetime, timedelta
 import pytz
 
+from key_index import load_key_index, record_written_rows
+from master_store import append_master, count_rows, load_master, master_exists, replace_partitions
+from standings import MASTER_COLUMNS, STAT_COLUMNS, game_order, record_appended_rows, record_rewritten_rows, season_team_stats
+import team_ledger
+
 # === CHANGED: Dynamically set current season based on year ===
 CURRENT_SEASON = datetime.now().year
 
@@ -28,52 +34,16 @@ def load_team_mapping():
             'Texas Rangers': 'TEX', 'Toronto Blue Jays': 'TOR', 'Washington Nationals': 'WSH'
         }
 
-def get_team_stats_for_season(master_df, season):
+def get_team_stats_for_season(master_rows, season):
     """
     CHANGED: Build team stats for the current season only.
     If no games exist yet for this season (e.g. game 1 of the year),
     every team starts at 0-0 with clean streaks.
+    CHANGED: Read from the standings snapshot (standings.py) instead of
+    re-scanning the master per team; it orders doubleheaders by start time.
+    master_rows is the master's current row count (the snapshot's stamp).
     """
-    season_df = master_df[master_df['season'] == season].copy()
-
-    # === CHANGED: Get all known team abbreviations from the full master ===
-    # so we can initialize any team that hasn't played yet this season
-    all_teams = sorted(master_df['team_abbr'].dropna().unique())
-
-    team_stats = {}
-
-    # Initialize every team at 0-0 first
-    for team in all_teams:
-        team_stats[team] = {
-            'wins': 0,
-            'losses': 0,
-            'win_pct': 0.0,
-            'streak': 0,
-            'win_streak': 0,
-            'loss_streak': 0
-        }
-
-    # === CHANGED: Then overwrite with actual season stats if games exist ===
-    if len(season_df) > 0:
-        for team in season_df['team_abbr'].dropna().unique():
-            team_data = season_df[season_df['team_abbr'] == team].sort_values('game_date_et')
-            if len(team_data) > 0:
-                latest = team_data.iloc[-1]
-                streak = 0
-                try:
-                    streak = int(latest.get('team_streak', 0))
-                except:
-                    streak = 0
-                team_stats[team] = {
-                    'wins': int(latest['Wins']),
-                    'losses': int(latest['Losses']),
-                    'win_pct': float(latest['Win_Pct']),
-                    'streak': streak,
-                    'win_streak': int(latest.get('Win_Streak', 0)),
-                    'loss_streak': int(latest.get('Loss_Streak', 0))
-                }
-
-    return team_stats
+    return season_team_stats(master_rows, season)
 
 def map_team_name(team_name, team_mapping):
     if team_name in team_mapping:
@@ -84,91 +54,282 @@ def map_team_name(team_name, team_mapping):
     print(f"⚠️ Could not map team name: {team_name}")
     return None
 
-def update_team_stats_numeric(team_stats, team_abbr, won):
-    stats = team_stats[team_abbr]
-    if won:
-        stats['wins'] += 1
-        stats['loss_streak'] = 0
-        stats['win_streak'] += 1
-        stats['streak'] = stats['win_streak']
-    else:
-        stats['losses'] += 1
-        stats['win_streak'] = 0
-        stats['loss_streak'] += 1
-        stats['streak'] = -stats['loss_streak']
-    total_games = stats['wins'] + stats['losses']
-    stats['win_pct'] = stats['wins'] / total_games if total_games > 0 else 0.0
-
-def create_master_row(game, team_abbr, opponent_abbr, is_home, team_stats, template_row, date):
-    row = template_row.copy()
-
-    row['game_id'] = game.get('game_id', '')
-    row['game_date_et'] = pd.to_datetime(date)
-    row['start_time_et'] = game.get('start_time_et', '')
-    row['team_abbr'] = team_abbr
-    row['opponent_abbr'] = opponent_abbr
-    row['is_home'] = is_home
-
-    if is_home:
-        row['team'] = game.get('home_team', '')
-        row['opponent'] = game.get('away_team', '')
-    else:
-        row['team'] = game.get('away_team', '')
-        row['opponent'] = game.get('home_team', '')
+# === Master row layout: columns copied from the daily file onto both team rows ===
+# (master column, daily column, default when the daily file lacks the column)
+GAME_FIELDS = [
+    ('game_id', 'game_id', ''),
+    ('start_time_et', 'start_time_et', ''),
+    ('home_score', 'home_score', 0),
+    ('away_score', 'away_score', 0),
+] + [(f'{side}_{inning}', f'{side}_{inning}', 0) for inning in range(1, 10) for side in ('home', 'away')] + [
+    ('Total', 'total_line', ''),
+    ('Over_Price_odds', 'over_odds', ''),
+    ('Under_Price_odds', 'under_odds', ''),
+]
+
+# Columns that depend on perspective: (master column, home row source, away row source)
+PERSPECTIVE_FIELDS = [
+    ('team', 'home_team', 'away_team'),
+    ('opponent', 'away_team', 'home_team'),
+    ('h2h_own_odds', 'moneyline_home', 'moneyline_away'),
+    ('h2h_opp_odds', 'moneyline_away', 'moneyline_home'),
+]
+
+# === CHANGED: Legacy odds columns from old merge system are nulled out on new rows ===
+LEGACY_ODDS_COLS = ['is_home_odds', 'Run_Line_odds', 'Spread_Price_odds',
+                    'Opp_Spread_Price_odds', 'team_abbr_odds', 'opponent_abbr_odds',
+                    'game_id_odds', 'commence_time']
+
+def _daily_column(games, col, default):
+    return games[col].to_numpy(dtype=object) if col in games.columns else np.full(len(games), default, dtype=object)
+
+def _interleave(home_values, away_values):
+    """[h0, a0, h1, a1, ...] — each game's home row followed by its away row."""
+    return np.column_stack([home_values, away_values]).ravel()
+
+def scan_team_records(team_abbr, won, team_stats):
+    """
+    Post-game record after each result, for (team_abbr, won) rows in game order,
+    continuing from team_stats — the same numbers as applying each result in turn,
+    computed with per-team cumulative sums and run lengths. team_stats is moved
+    on to each team's final record. Returns arrays keyed like the team_stats dicts.
+    """
+    results = pd.DataFrame({'team': team_abbr, 'won': won})
+    start = pd.DataFrame.from_dict(team_stats, orient='index').loc[results['team']]
+    by_team = results.groupby('team', sort=False)['won']
+
+    wins = start['wins'].to_numpy() + by_team.cumsum().to_numpy().astype(int)
+    losses = start['losses'].to_numpy() + (~results['won']).groupby(results['team']).cumsum().to_numpy().astype(int)
+
+    # Streaks: a run starts at a team's first game in the batch or whenever its result flips;
+    # the first run carries on the streak the team brought into the batch
+    first_game = (by_team.cumcount() == 0).to_numpy()
+    new_run = first_game | (results['won'].to_numpy() != by_team.shift().to_numpy())
+    run_no = pd.Series(new_run).groupby(results['team']).cumsum().to_numpy()
+    run_length = results.groupby([results['team'], run_no]).cumcount().to_numpy() + 1
+    carried = np.where(won, start['win_streak'].to_numpy(), start['loss_streak'].to_numpy())
+    streak_length = run_length + np.where(run_no == 1, carried, 0)
+
+    records = {
+        'wins': wins,
+        'losses': losses,
+        'win_pct': wins / (wins + losses),
+        'win_streak': np.where(won, streak_length, 0),
+        'loss_streak': np.where(won, 0, streak_length),
+    }
+    records['streak'] = np.where(won, records['win_streak'], -records['loss_streak'])
+
+    last = results.drop_duplicates('team', keep='last').index
+    for i in last:
+        team_stats[results.at[i, 'team']] = {k: v[i].item() for k, v in records.items()}
+    return records
+
+def build_master_rows(finished_games, team_mapping, team_stats, template_row, date):
+    """
+    Master rows (home row then away row per game, in file order) for a slate of
+    finished games, built column-wise. Moves team_stats on past these games.
+    `date` is the file date, or one date per game for a multi-day batch.
+    Returns (new_df, games_processed).
+    """
+    games = finished_games.reset_index(drop=True)
+    game_dates = pd.Series(pd.to_datetime(date), index=games.index)
+    name_map = {name: map_team_name(name, team_mapping) for name in pd.unique(pd.concat([games['home_team'], games['away_team']]))}
+    home_abbr = games['home_team'].map(name_map)
+    away_abbr = games['away_team'].map(name_map)
+    keep = (home_abbr.notna() & away_abbr.notna()).to_numpy().copy()
+
+    # === CHANGED: Guard against teams not in stats dict (e.g. expansion/rename edge cases) ===
+    unknown = keep & ~(home_abbr.isin(list(team_stats)) & away_abbr.isin(list(team_stats))).to_numpy()
+    for i in np.flatnonzero(unknown):
+        print(f"⚠️ Skipping game — unknown team: {home_abbr[i]} vs {away_abbr[i]}")
+    keep &= ~unknown
+
+    # Scores that can't be read as numbers skip the game (missing ones stay NaN)
+    scores = {}
+    for col in ('home_score', 'away_score'):
+        raw = pd.Series(_daily_column(games, col, 0))
+        scores[col] = pd.to_numeric(raw, errors='coerce').astype(float).to_numpy()
+        keep &= ~(np.isnan(scores[col]) & raw.notna().to_numpy())
+
+    games = games[keep].reset_index(drop=True)
+    if games.empty:
+        return None, 0
+    home_abbr, away_abbr = home_abbr[keep].to_numpy(), away_abbr[keep].to_numpy()
+    game_dates = game_dates[keep].to_numpy()
+    home_score, away_score = scores['home_score'][keep], scores['away_score'][keep]
+    home_won = home_score > away_score
 
     # Team statistics (POST-GAME — these reflect record AFTER this game)
-    row['Wins'] = team_stats['wins']
-    row['Losses'] = team_stats['losses']
-    row['Win_Pct'] = round(team_stats['win_pct'], 3)
-    row['team_streak'] = team_stats['streak']
-    row['Win_Streak'] = team_stats['win_streak']
-    row['Loss_Streak'] = team_stats['loss_streak']
-
-    # Game scores
-    row['home_score'] = game.get('home_score', 0)
-    row['away_score'] = game.get('away_score', 0)
-
-    # Inning scores
-    for inning in range(1, 10):
-        row[f'home_{inning}'] = game.get(f'home_{inning}', 0)
-        row[f'away_{inning}'] = game.get(f'away_{inning}', 0)
-
-    # Betting data
-    if is_home:
-        row['h2h_own_odds'] = game.get('moneyline_home', '')
-        row['h2h_opp_odds'] = game.get('moneyline_away', '')
-    else:
-        row['h2h_own_odds'] = game.get('moneyline_away', '')
-        row['h2h_opp_odds'] = game.get('moneyline_home', '')
-
-    row['Total'] = game.get('total_line', '')
-    row['Over_Price_odds'] = game.get('over_odds', '')
-    row['Under_Price_odds'] = game.get('under_odds', '')
-
-    # === CHANGED: Use CURRENT_SEASON instead of hardcoded 2025 ===
-    row['season'] = CURRENT_SEASON
-    row['merge_key'] = f"{game.get('game_id', '')}_{team_abbr}"
-
-    # === CHANGED: Set team_won correctly based on perspective ===
-    try:
-        home_score = float(game.get('home_score', 0) or 0)
-        away_score = float(game.get('away_score', 0) or 0)
-        if is_home:
-            row['team_won'] = home_score > away_score
-        else:
-            row['team_won'] = away_score > home_score
-    except (ValueError, TypeError):
-        row['team_won'] = None
-
-    # === CHANGED: Null out legacy odds columns from old merge system ===
-    legacy_cols = ['is_home_odds', 'Run_Line_odds', 'Spread_Price_odds',
-                   'Opp_Spread_Price_odds', 'team_abbr_odds', 'opponent_abbr_odds',
-                   'game_id_odds', 'commence_time']
-    for col in legacy_cols:
-        if col in row.index:
-            row[col] = None
-
-    return row
+    team_abbr = _interleave(home_abbr, away_abbr)
+    records = scan_team_records(team_abbr, _interleave(home_won, ~home_won), team_stats)
+
+    columns = {
+        'game_date_et': np.repeat(game_dates, 2),
+        'team_abbr': team_abbr,
+        'opponent_abbr': _interleave(away_abbr, home_abbr),
+        'is_home': np.tile([True, False], len(games)),
+        'Wins': records['wins'],
+        'Losses': records['losses'],
+        'Win_Pct': [round(v, 3) for v in records['win_pct'].tolist()],
+        'team_streak': records['streak'],
+        'Win_Streak': records['win_streak'],
+        'Loss_Streak': records['loss_streak'],
+        # === CHANGED: Use CURRENT_SEASON instead of hardcoded 2025 ===
+        'season': CURRENT_SEASON,
+        # === CHANGED: Set team_won correctly based on perspective ===
+        'team_won': _interleave(home_score > away_score, away_score > home_score),
+    }
+    for master_col, daily_col, default in GAME_FIELDS:
+        columns[master_col] = np.repeat(_daily_column(games, daily_col, default), 2)
+    for master_col, home_col, away_col in PERSPECTIVE_FIELDS:
+        columns[master_col] = _interleave(_daily_column(games, home_col, ''), _daily_column(games, away_col, ''))
+    columns['merge_key'] = [f"{game_id}_{abbr}" for game_id, abbr in zip(columns['game_id'], team_abbr)]
+    for col in LEGACY_ODDS_COLS:
+        if col in template_row.index:
+            columns[col] = None
+
+    # Any other master column keeps the template row's value
+    new_df = pd.DataFrame({col: columns[col] if col in columns else template_row[col] for col in template_row.index},
+                          index=range(2 * len(games)))
+    # Same per-column dtypes a frame built from row Series would get
+    return new_df.infer_objects(), len(games)
+
+def pending_daily_files(after_date, through_date):
+    """
+    {date: path} for every daily or archived results file dated after the
+    master's latest date, through yesterday, in the current season. A file
+    still in data/daily wins over an archived copy of the same date.
+    """
+    pattern = "MLB_Combined_Odds_Results_*.csv"
+    paths = sorted(glob.glob(os.path.join("data", "archive", "MLB", str(CURRENT_SEASON), pattern))) + \
+        sorted(glob.glob(os.path.join("data", "daily", pattern)))
+    pending = {}
+    for path in paths:
+        try:
+            file_date = datetime.strptime(os.path.basename(path).split("_")[-1].replace(".csv", ""), "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        if after_date < file_date <= through_date and file_date.year == CURRENT_SEASON:
+            pending[file_date] = path
+    return dict(sorted(pending.items()))
+
+def load_catch_up_games(pending):
+    """
+    Finished games from every pending file as one slate, in chronological and
+    first-pitch order (doubleheaders included). Returns (games, file dates per game).
+    """
+    slates = []
+    for file_date, path in pending.items():
+        print(f"⚾ Processing file: {path}")
+        daily_df = pd.read_csv(path)
+        finished = daily_df[daily_df['status'] == 'Finished'] if 'status' in daily_df.columns else daily_df
+        print(f"   🎮 {len(finished)} finished games")
+        slates.append(finished.assign(_file_date=pd.Timestamp(file_date)))
+    games = pd.concat(slates, ignore_index=True)
+    if games.empty:
+        return games, games['_file_date']
+
+    start = pd.to_datetime(games['start_time_et'], format='%Y-%m-%d %H:%M:%S', errors='coerce') if 'start_time_et' in games.columns \
+        else pd.Series(pd.NaT, index=games.index)
+    order_cols = ['_file_date', '_start'] + (['game_id'] if 'game_id' in games.columns else [])
+    games = games.assign(_start=start).sort_values(order_cols, kind='stable')
+
+    # === CHANGED: A game_id finished in two files (suspended/resumed) is only counted once per batch ===
+    # Its latest result wins; the game keeps the date and first pitch it was first listed with
+    if 'game_id' in games.columns:
+        first_listed = games.drop_duplicates('game_id', keep='first').set_index('game_id')
+        for game_id in games.loc[games['game_id'].duplicated(), 'game_id'].unique():
+            print(f"🔁 RE-FINISHED GAME: game_id {game_id} appears in more than one file — keeping its latest result")
+        games = games.drop_duplicates('game_id', keep='last')
+        for col in [c for c in ('_file_date', '_start', 'start_time_et') if c in games.columns]:
+            games[col] = games['game_id'].map(first_listed[col]).to_numpy()
+        games = games.sort_values(order_cols, kind='stable')
+    games = games.drop(columns=['_start'])
+    games = games.reset_index(drop=True)
+    return games.drop(columns=['_file_date']), games['_file_date'].to_numpy()
+
+# Columns needed to recompute a team's records: standings' columns plus each result
+RECORD_COLUMNS = MASTER_COLUMNS + ['team_won']
+
+def recompute_records(team_rows, game_ids):
+    """
+    Redo Wins/Losses/Win_Pct/streaks in team_rows (one season's rows for some
+    teams, in game order) from each team's first game in game_ids forward,
+    continuing from the record it had before that game. Returns the recomputed rows.
+    """
+    from_game = team_rows['game_id'].isin(game_ids).astype(int).groupby(team_rows['team_abbr']).cummax().astype(bool)
+    seeds = {team: {'wins': 0, 'losses': 0, 'win_pct': 0.0, 'streak': 0, 'win_streak': 0, 'loss_streak': 0}
+             for team in team_rows['team_abbr'].unique()}
+    for row in team_rows[~from_game].drop_duplicates('team_abbr', keep='last').itertuples(index=False):
+        seeds[row.team_abbr].update(wins=int(row.Wins), losses=int(row.Losses),
+                                    win_streak=int(row.Win_Streak), loss_streak=int(row.Loss_Streak))
+
+    tail = team_rows[from_game]
+    records = scan_team_records(tail['team_abbr'].to_numpy(), tail['team_won'].to_numpy(dtype=bool), seeds)
+    records['win_pct'] = records['win_pct'].round(3)
+    for key, col in STAT_COLUMNS.items():
+        team_rows.loc[from_game, col] = records[key]
+    return team_rows[from_game]
+
+def upsert_finished_games(finished_games, game_dates, team_mapping, team_stats, template_row, index, master_rows):
+    """
+    Games already in the master that finished again (a suspended game completed
+    later, or a corrected final): their rows are replaced — keeping the original
+    game date, first pitch and season — and both teams' records are recomputed
+    from that game forward. Only the (season, month) partitions from the
+    earliest replaced game on are rewritten; the standings snapshot and key
+    index are updated to match. Returns (games replaced, master row count after).
+    """
+    # team_stats only supplies the known teams here; records come from recompute_records
+    new_rows, games_replaced = build_master_rows(
+        finished_games, team_mapping, copy.deepcopy(team_stats), template_row, game_dates)
+    if new_rows is None:
+        return 0, master_rows
+    new_rows['game_id'] = pd.to_numeric(new_rows['game_id']).astype('int64')
+    original = index.rows_for(new_rows['game_id'])
+    first = original.drop_duplicates('game_id').set_index('game_id')
+    new_rows['season'] = new_rows['game_id'].map(first['season']).to_numpy()
+    new_rows['game_date_et'] = new_rows['game_id'].map(first['game_date_et']).to_numpy()
+
+    written, removed, team_frames = [], 0, []
+    for season, replacements in new_rows.groupby('season', sort=True):
+        game_ids = replacements['game_id'].unique()
+        teams = sorted(set(replacements['team_abbr']) | set(original.loc[original['game_id'].isin(game_ids), 'team_abbr']))
+        month_start = replacements['game_date_et'].min().replace(day=1)
+
+        # Every row of the partitions from the earliest replaced game's month on
+        partitions = load_master(seasons=int(season), date_range=(month_start, None))
+        old = partitions['game_id'].isin(game_ids)
+        start_times = partitions[old].drop_duplicates('game_id').set_index('game_id')['start_time_et']
+        replacements = replacements.assign(
+            start_time_et=replacements['game_id'].map(start_times).fillna(replacements['start_time_et']))
+
+        team_rows = load_master(columns=RECORD_COLUMNS, seasons=int(season), teams=teams)
+        team_rows = pd.concat([team_rows[~team_rows['game_id'].isin(game_ids)], replacements[RECORD_COLUMNS]],
+                              ignore_index=True).astype({'team_abbr': str})
+        team_rows = game_order(team_rows).reset_index(drop=True)
+        recomputed = recompute_records(team_rows, game_ids).set_index(['game_id', 'team_abbr'])
+
+        partitions = pd.concat([partitions[~old], replacements.reindex(columns=partitions.columns)], ignore_index=True)
+        keys = pd.MultiIndex.from_arrays([partitions['game_id'].astype('int64'), partitions['team_abbr'].astype(str)])
+        hit = keys.isin(recomputed.index)
+        for col in STAT_COLUMNS.values():
+            partitions.loc[hit, col] = recomputed[col].reindex(keys[hit]).to_numpy()
+        rewritten = replace_partitions(partitions)
+        print(f"♻️  Season {season}: replaced {len(game_ids)} game(s), {len(recomputed)} team-game record(s) "
+              f"recomputed for {', '.join(teams)} — rewrote {len(rewritten)} partition(s)")
+
+        removed += int(old.sum())
+        written.append(replacements.assign(game_date_et=pd.to_datetime(replacements['game_date_et'])))
+        team_frames.append(team_rows)
+
+    previous_rows = master_rows
+    master_rows = previous_rows - removed + sum(len(w) for w in written)
+    record_rewritten_rows(pd.concat(team_frames, ignore_index=True), master_rows, previous_rows)
+    record_written_rows(pd.concat(written, ignore_index=True), master_rows, previous_rows)
+    # The ledger is stamped with the row count, which an upsert usually leaves unchanged
+    team_ledger.invalidate()
+    return games_replaced, master_rows
 
 def process_daily_update():
     print("🔄 Starting daily master data update...")
@@ -179,20 +340,20 @@ def process_daily_update():
     yesterday = (datetime.now(eastern) - timedelta(days=1)).strftime("%Y-%m-%d")
     print(f"📅 Target date: {yesterday}")
 
-    # Load master parquet
-    master_parquet = "data/master/master_template.parquet"
-    if not os.path.exists(master_parquet):
-        print("❌ Master parquet file not found!")
+    # Load master dataset
+    if not master_exists():
+        print("❌ Master dataset not found!")
         return False
 
     try:
-        master_df = pd.read_parquet(master_parquet)
-        master_df['game_date_et'] = pd.to_datetime(master_df['game_date_et'])
+        # CHANGED: The latest date and the known game_ids come from the key index, not a master scan
+        master_rows = count_rows()
+        index = load_key_index(master_rows=master_rows)
     except Exception as e:
         print(f"❌ Error loading master file: {e}")
         return False
 
-    latest_date = master_df['game_date_et'].max().date()
+    latest_date = index.latest_date().date()
     print(f"📅 Latest date in master data: {latest_date}")
 
     yesterday_date = datetime.strptime(yesterday, "%Y-%m-%d").date()
@@ -204,7 +365,7 @@ def process_daily_update():
     team_mapping = load_team_mapping()
 
     # === CHANGED: Build stats from current season only (resets to 0-0 for new season) ===
-    team_stats = get_team_stats_for_season(master_df, CURRENT_SEASON)
+    team_stats = get_team_stats_for_season(master_rows, CURRENT_SEASON)
     print(f"📊 Loaded stats for {len(team_stats)} teams (season {CURRENT_SEASON})")
 
     # Log a few teams so we can verify the reset in Actions logs
@@ -214,95 +375,79 @@ def process_daily_update():
             s = team_stats[t]
             print(f"   {t}: {s['wins']}-{s['losses']} streak={s['streak']}")
 
-    # Load yesterday's daily file
-    yesterday_file = f"data/daily/MLB_Combined_Odds_Results_{yesterday}.csv"
-    if not os.path.exists(yesterday_file):
-        print(f"📁 No file found for {yesterday}")
+    # === CHANGED: Catch up every day since the master's latest date, not just yesterday ===
+    pending = pending_daily_files(latest_date, yesterday_date)
+    if not pending:
+        print(f"📁 No daily files found between {latest_date} and {yesterday}")
         return True
-
-    print(f"⚾ Processing file: {yesterday_file}")
+    print(f"📆 Catching up {len(pending)} day(s): {', '.join(str(d) for d in pending)}")
 
     try:
-        daily_df = pd.read_csv(yesterday_file)
+        finished_games, game_dates = load_catch_up_games(pending)
     except Exception as e:
-        print(f"❌ Error reading {yesterday_file}: {e}")
+        print(f"❌ Error reading daily files: {e}")
         return False
 
-    finished_games = daily_df[daily_df['status'] == 'Finished'].copy() if 'status' in daily_df.columns else daily_df.copy()
-
     if len(finished_games) == 0:
-        print(f"⏳ No finished games found in {yesterday_file}")
+        print(f"⏳ No finished games found in {len(pending)} file(s)")
         return True
 
     print(f"🎮 Found {len(finished_games)} finished games")
 
-    new_rows = []
-    games_processed = 0
-    suspended_game_flags = []  # CHANGED: track game_ids already in master (likely suspended/resumed)
-    template_row = master_df.iloc[0].copy()
-    existing_game_ids = set(master_df['game_id'].unique())  # CHANGED: for duplicate/suspended-game detection
-
-    for _, game in finished_games.iterrows():
-        home_team = map_team_name(game['home_team'], team_mapping)
-        away_team = map_team_name(game['away_team'], team_mapping)
-
-        if not home_team or not away_team:
-            continue
-
-        # === CHANGED: Guard against suspended games being double-counted ===
-        # If this game_id already exists in master, the API likely marked an
-        # earlier suspension point as "Finished" and this is the real completion
-        # (or vice versa). Flag loudly and skip — requires manual review, since
-        # blindly appending would double-count both teams' records.
-        game_id_check = game.get('game_id')
-        if game_id_check in existing_game_ids:
-            print(f"🚨 SUSPENDED GAME ALERT: game_id {game_id_check} ({home_team} vs {away_team}) "
-                  f"already exists in master. Skipping to avoid duplicate. Needs manual review.")
-            suspended_game_flags.append(game_id_check)
-            continue
-
-        # === CHANGED: Guard against teams not in stats dict (e.g. expansion/rename edge cases) ===
-        if home_team not in team_stats or away_team not in team_stats:
-            print(f"⚠️ Skipping game — unknown team: {home_team} vs {away_team}")
-            continue
-
+    # CHANGED: Column layout comes from one day of full rows rather than the whole master
+    template_row = load_master(date_range=(latest_date, latest_date)).iloc[0].copy()
+
+    # CHANGED: Games already in the master (suspended/resumed, corrected finals) replace their
+    # rows instead of being skipped; the rest are appended below
+    in_master = index.has_games(finished_games['game_id']) if 'game_id' in finished_games.columns \
+        else np.zeros(len(finished_games), dtype=bool)
+    games_replaced = 0
+    if in_master.any():
+        print(f"🔁 {int(in_master.sum())} game(s) already in master — replacing their rows: "
+              f"{finished_games.loc[in_master, 'game_id'].tolist()}")
         try:
-            home_score = float(game.get('home_score', 0))
-            away_score = float(game.get('away_score', 0))
-        except (ValueError, TypeError):
-            continue
-
-        home_won = home_score > away_score
-
-        update_team_stats_numeric(team_stats, home_team, home_won)
-        update_team_stats_numeric(team_stats, away_team, not home_won)
-
-        home_row = create_master_row(game, home_team, away_team, True, team_stats[home_team], template_row, yesterday)
-        away_row = create_master_row(game, away_team, home_team, False, team_stats[away_team], template_row, yesterday)
-
-        new_rows.extend([home_row, away_row])
-        games_processed += 1
-
-    if not new_rows:
-        print("✅ No new games to add")
+            games_replaced, master_rows = upsert_finished_games(
+                finished_games[in_master], game_dates[in_master], team_mapping, team_stats,
+                template_row, index, master_rows)
+        except Exception as e:
+            print(f"❌ Error replacing re-finished games: {e}")
+            return False
+        if games_replaced:
+            # Replaced results can change this season's records — read them back
+            team_stats = get_team_stats_for_season(master_rows, CURRENT_SEASON)
+        finished_games, game_dates = finished_games[~in_master], game_dates[~in_master]
+
+    # CHANGED: Build the whole slate column-wise instead of one template copy per team row
+    new_df, games_processed = build_master_rows(
+        finished_games, team_mapping, team_stats, template_row, game_dates)
+
+    if new_df is None:
+        print(f"✅ No new games to add ({games_replaced} replaced)")
         return True
 
-    new_df = pd.DataFrame(new_rows)
     new_df['game_date_et'] = pd.to_datetime(new_df['game_date_et'])
 
-    updated_master = pd.concat([master_df, new_df], ignore_index=True)
-    updated_master = updated_master.sort_values(['season', 'team_abbr', 'game_date_et']).reset_index(drop=True)
-
+    # CHANGED: Duplicate check against the key index — O(new rows), no master scan
+    duplicate = index.has_keys(new_df['merge_key'])
+    if duplicate.any():
+        print(f"🚨 {int(duplicate.sum())} row(s) already in master by merge_key — not appended: "
+              f"{new_df.loc[duplicate, 'merge_key'].tolist()}")
+        new_df = new_df[~duplicate].reset_index(drop=True)
+        if new_df.empty:
+            return True
+
+    # CHANGED: Append a new fragment to the partitioned master instead of rewriting the whole file
+    # (one write for the whole catch-up batch)
     try:
-        updated_master.to_parquet(master_parquet, index=False)
-        print(f"💾 Saved parquet: {len(updated_master):,} total rows")
-        print(f"✅ Added {games_processed} games ({games_processed * 2} rows) from {yesterday}")
-        # CHANGED: Surface any suspended-game flags clearly at the end, not just buried mid-log
-        if suspended_game_flags:
-            print(f"🚨 {len(suspended_game_flags)} suspected suspended game(s) were SKIPPED and need manual review: {suspended_game_flags}")
+        fragments = append_master(new_df)
+        print(f"💾 Appended {len(new_df)} rows in {len(fragments)} fragment(s): {master_rows + len(new_df):,} total rows")
+        record_appended_rows(new_df, master_rows + len(new_df))
+        record_written_rows(new_df, master_rows + len(new_df), master_rows)
+        print(f"✅ Added {games_processed} games ({games_processed * 2} rows) from {len(pending)} day(s) through {max(pending)}"
+              + (f", replaced {games_replaced}" if games_replaced else ""))
         return True
     except Exception as e:
-        print(f"❌ Error saving parquet: {e}")
+        print(f"❌ Error saving master fragment: {e}")
         return False
 
 if __name__ == "__main__":
@@ -1,68 +1,144 @@
 #!/usr/bin/env python3
 # scripts/update_signal_results.py
 # Runs after the daily pipeline + lock (e.g. 9:30 UTC) — backfills W/L results
-# into past signal lock files by joining game_id + signal_team against the
-# master parquet's team_won field. Idempotent: re-running just overwrites
-# results with the latest data, safe to run every day.
+# into the signal store by joining game_id + signal_team against the master
+# dataset's team_won field, then re-exports the per-day JSON of any day that
+# changed. Idempotent: re-running just overwrites results with the latest
+# data, safe to run every day.
+#
+# data/signals/results_manifest.json records which lock files are final (every
+# signal settled, or given up on), so a run only checks the days that still
+# have pending results and the daily cost stays flat as the season's signals
+# pile up. lock_signals.py marks a day pending whenever it (re)locks it.
+#
+#   python scripts/update_signal_results.py [--full]   # --full re-checks every day
 
-import os
+import argparse
 import json
-import glob
+import os
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
+import pytz
 
-SIGNALS_DIR = "data/signals"
-MASTER_PARQUET = "data/master/master_template.parquet"
+from master_store import load_master, master_exists
+from signal_store import SIGNALS_DATASET, SIGNALS_DIR, export_json, json_path, load_signals, upsert_signals
+from storage import locked, write_json
 
-def main():
-    if not os.path.exists(MASTER_PARQUET):
-        print(f"❌ Master parquet not found at {MASTER_PARQUET}")
-        return False
+MANIFEST_FILE = os.path.join(SIGNALS_DIR, "results_manifest.json")
+
+# Signals still unsettled this many days after their lock date (postponed /
+# cancelled games) stop being re-checked
+SETTLE_WINDOW_DAYS = 14
 
-    master_df = pd.read_parquet(MASTER_PARQUET)
-    # Index for fast lookup: (game_id, team_abbr) -> team_won
-    lookup = {}
-    for _, row in master_df[['game_id', 'team_abbr', 'team_won']].iterrows():
-        lookup[(int(row['game_id']), row['team_abbr'])] = bool(row['team_won'])
 
-    signal_files = sorted(glob.glob(os.path.join(SIGNALS_DIR, "signals_*.json")))
-    print(f"Found {len(signal_files)} signal lock files to check")
+def _as_game_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
-    updated_files = 0
-    total_filled = 0
 
-    for path in signal_files:
+def load_manifest(path=MANIFEST_FILE):
+    """{'final': {file: signals settled}, 'pending': [files]} — files in neither are new."""
+    if not os.path.exists(path):
+        return {'final': {}, 'pending': []}
+    try:
         with open(path) as f:
-            data = json.load(f)
-
-        changed = False
-        for sig in data.get("signals", []):
-            game_id = sig.get("game_id")
-            team = sig.get("signal_team")
-            try:
-                game_id_int = int(game_id)
-            except (TypeError, ValueError):
-                continue
-
-            key = (game_id_int, team)
-            if key in lookup:
-                new_result = "W" if lookup[key] else "L"
-                if sig.get("result") != new_result:
-                    sig["result"] = new_result
-                    changed = True
-                    total_filled += 1
-            else:
-                # Game not finished yet, or not in master — leave as-is (pending)
-                if "result" not in sig:
-                    sig["result"] = None
-
-        if changed:
-            with open(path, "w") as f:
-                json.dump(data, f, indent=2)
-            updated_files += 1
+            manifest = json.load(f)
+        return {'final': manifest.get('final', {}), 'pending': manifest.get('pending', [])}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read {path} ({e}) — re-checking every signal file")
+        return {'final': {}, 'pending': []}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    manifest = dict(manifest, updated_at=datetime.now(pytz.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+    write_json(manifest, path, dataset=SIGNALS_DATASET, indent=2, sort_keys=True)
+
+
+def mark_pending(filename, path=MANIFEST_FILE):
+    """Put a (re)written lock file back on the backfill's to-do list."""
+    with locked(SIGNALS_DATASET):
+        manifest = load_manifest(path)
+        manifest['final'].pop(filename, None)
+        manifest['pending'] = sorted(set(manifest['pending']) | {filename})
+        save_manifest(manifest, path)
+
+
+def result_lookup(master_df):
+    """team_won indexed by (game_id, team_abbr); the later master row wins on duplicates."""
+    rows = master_df.drop_duplicates(['game_id', 'team_abbr'], keep='last')
+    index = pd.MultiIndex.from_arrays([rows['game_id'].astype('int64'), rows['team_abbr'].astype(str)])
+    return pd.Series(rows['team_won'].to_numpy(dtype=bool), index=index)
+
+
+def main(full=False):
+    if not master_exists():
+        print("❌ Master dataset not found")
+        return False
+
+    signals = load_signals()
+    manifest = load_manifest()
+    files = signals['date'].map(lambda d: os.path.basename(json_path(d)))
+    todo = signals if full else signals[~files.isin(list(manifest['final']))]
+    print(f"Found {len(signals)} locked signals over {signals['date'].nunique()} days, "
+          f"{len(todo)} over {todo['date'].nunique()} days to check")
+    if todo.empty:
+        print("\nDone. 0 file(s) updated, 0 result(s) filled/changed.")
+        return True
+
+    # Only games on or after the earliest lock date being checked can settle a signal
+    master_df = load_master(columns=['game_id', 'team_abbr', 'team_won', 'game_date_et'],
+                            date_range=(todo['date'].min(), None))
+    lookup = result_lookup(master_df)
+    latest_game = master_df['game_date_et'].max()
+
+    # One index lookup for every signal being checked
+    game_ids = todo['game_id'].map(_as_game_id)
+    keys = pd.MultiIndex.from_arrays([game_ids.fillna(-1).astype('int64'), todo['signal_team'].astype(str)])
+    positions = lookup.index.get_indexer(keys)
+    found = positions >= 0
+    won = np.zeros(len(todo), dtype=bool)
+    won[found] = lookup.to_numpy()[positions[found]]
+
+    # Games not finished yet, or not in master, keep their current result (pending)
+    old = todo['result']
+    new = old.where(~found, np.where(won, "W", "L"))
+    filled = found & (old != new).to_numpy()
+    unsettled = game_ids.notna().to_numpy() & ~found
+    expired = pd.notna(latest_game) and \
+        (pd.to_datetime(todo['date']) < latest_game - pd.Timedelta(days=SETTLE_WINDOW_DAYS)).to_numpy()
+    expired = unsettled & expired
+    for date, count in todo[expired].groupby('date').size().items():
+        print(f"⚠️ {date}: {count} signal(s) unsettled after {SETTLE_WINDOW_DAYS} days — no longer checked")
+
+    # A day is final once none of its signals is still waiting on a game
+    checked = todo.assign(result=new)
+    waiting = pd.Series(unsettled & ~expired, index=todo.index).groupby(todo['date']).any()
+    settled = pd.Series(~unsettled, index=todo.index).groupby(todo['date']).sum()
+    for date, pending_day in waiting.items():
+        name = os.path.basename(json_path(date))
+        if pending_day:
+            manifest['final'].pop(name, None)
+            manifest['pending'] = sorted(set(manifest['pending']) | {name})
+        else:
+            manifest['final'][name] = int(settled[date])
+            manifest['pending'] = [p for p in manifest['pending'] if p != name]
+    with locked(SIGNALS_DATASET):
+        if filled.any():
+            upsert_signals(checked[filled])
+        for path in export_json(checked.loc[filled, 'date'].unique()):
             print(f"✅ Updated {os.path.basename(path)}")
+        save_manifest(manifest)
 
-    print(f"\nDone. {updated_files} file(s) updated, {total_filled} result(s) filled/changed.")
+    pending = len(manifest['pending'])
+    print(f"\nDone. {checked.loc[filled, 'date'].nunique()} file(s) updated, {int(filled.sum())} result(s) "
+          f"filled/changed, {pending} file(s) still pending.")
     return True
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Backfill W/L results into the signal store")
+    parser.add_argument("--full", action="store_true", help="Re-check every day, including final ones")
+    main(full=parser.parse_args().full)